@@ -0,0 +1,95 @@
+# asset_cache.py
+# 画像アセットを最初に使うときに1度だけ読み込み・リサイズ・合成して、プロセス内で共有する
+# 合計サイズが ASSET_CACHE_MAX_BYTES を超えたら、長く使われていないものから捨てる
+import os
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+import cv2
+import numpy as np
+
+from config import WIN_W, WIN_H, ASSET_CACHE_MAX_BYTES
+
+LOGO_PATHS = [os.path.join("assets", "logo.png"), os.path.join("assets", "logo.jpg")]
+
+
+def _nbytes(value) -> int:
+    """キャッシュする値のおおよそのメモリ量"""
+    if value is None:
+        return 0
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (list, tuple)):
+        return sum(_nbytes(v) for v in value)
+    return sum(v.nbytes for v in vars(value).values() if isinstance(v, np.ndarray))
+
+
+class AssetCache:
+    def __init__(self, max_bytes: int = ASSET_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[Hashable, tuple]" = OrderedDict()   # key -> (値, バイト数)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, loader: Callable[[], object]):
+        """key が無ければ loader() で作って入れる。値は共有されるので書き換えないこと"""
+        item = self._items.get(key)
+        if item is not None:
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+        self.misses += 1
+        value = loader()
+        size = _nbytes(value)
+        self._items[key] = (value, size)
+        self.bytes += size
+        # 今入れたもの以外を古い順に捨てる
+        while self.bytes > self.max_bytes and len(self._items) > 1:
+            _, (_, old) = self._items.popitem(last=False)
+            self.bytes -= old
+        return value
+
+    def clear(self):
+        self._items.clear()
+        self.bytes = 0
+
+
+_cache = AssetCache()
+
+
+def get_asset(key: Hashable, loader: Callable[[], object]):
+    return _cache.get(key, loader)
+
+
+def asset_cache() -> AssetCache:
+    return _cache
+
+
+def _load_logo() -> Optional[np.ndarray]:
+    path = next((p for p in LOGO_PATHS if os.path.exists(p)), None)
+    if path is None:
+        return None
+    logo = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+    if logo is None:
+        return None
+    return cv2.resize(logo, (WIN_W, WIN_H), interpolation=cv2.INTER_AREA)
+
+
+def menu_background(fill: int) -> np.ndarray:
+    """
+    メニューの背景（WIN_W x WIN_H の BGR）。ロゴが無ければ fill 一色。
+    アルファ付きロゴは fill の上にあらかじめ合成しておく
+    """
+    logo = get_asset(("logo", WIN_W, WIN_H), _load_logo)
+    if logo is not None and logo.ndim == 3 and logo.shape[2] == 3:
+        return logo
+
+    def blend():
+        if logo is None:
+            return np.full((WIN_H, WIN_W, 3), fill, dtype=np.uint8)
+        if logo.ndim == 2:
+            return cv2.cvtColor(logo, cv2.COLOR_GRAY2BGR)
+        a = logo[:, :, 3:4].astype(np.float32) / 255.0
+        return (logo[:, :, :3] * a + fill * (1.0 - a) + 0.5).astype(np.uint8)
+    return get_asset(("menu_background", fill, WIN_W, WIN_H), blend)
@@ -0,0 +1,79 @@
+# async_detector.py
+import threading
+import time
+from typing import Optional
+
+from camera_capture import CapturedFrame
+from detector_facemesh import FaceInputDetector
+from face_features import FaceResult
+from frame_prep import FramePreprocessor
+
+
+class AsyncFaceInputDetector:
+    """
+    FaceInputDetector をワーカースレッドで回し、最新フレームだけを推論する。
+    結果は1枠のメールボックスに置かれ、描画ループは latest() で待たずに読む。
+    """
+    def __init__(self, detector: Optional[FaceInputDetector] = None):
+        self.detector = detector if detector is not None else FaceInputDetector(draw_mesh=False)
+        # detector.prepare は描画ループ側も使うので、ワーカーは自分のバッファで前処理する
+        self._prep = FramePreprocessor()
+        self._cond = threading.Condition()
+        self._pending: Optional[CapturedFrame] = None
+        self._result = FaceResult()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # 統計
+        self.frames_submitted = 0
+        self.frames_inferred = 0
+        self.frames_skipped = 0   # 推論される前に新しいフレームで上書きされた数
+
+    def start(self) -> "AsyncFaceInputDetector":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="facemesh-worker", daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, frame: CapturedFrame):
+        with self._cond:
+            if self._pending is not None:
+                self.frames_skipped += 1
+            self._pending = frame
+            self.frames_submitted += 1
+            self._cond.notify()
+
+    def latest(self) -> FaceResult:
+        with self._cond:
+            return self._result
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stop.is_set():
+                    self._cond.wait(0.1)
+                if self._stop.is_set():
+                    return
+                frame = self._pending
+                self._pending = None
+
+            t0 = time.time()
+            vis = self._prep(frame.image)
+            mouth_open, eyes_closed, mar, ear = self.detector.infer(vis)
+            t1 = time.time()
+
+            result = FaceResult(mouth_open=mouth_open, eyes_closed=eyes_closed, mar=mar, ear=ear,
+                                timestamp=t1, t_capture=frame.t_capture, seq=frame.seq,
+                                infer_s=t1 - t0)
+            with self._cond:
+                self._result = result
+                self.frames_inferred += 1
+
+    def close(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        self.detector.close()
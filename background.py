@@ -6,6 +6,8 @@ from config import WIN_W, WIN_H, SCROLL_SPEED
 class GroundScroller:
     """
     画面下にストライプ模様の床を描き、左に流す。
+    ストライプは画面より1周期（stripe_w）だけ広い帯として最初に1度だけ描いておき、
+    毎フレームはオフセット分ずらした部分を床の帯にだけ合成する。
     """
     def __init__(self, height: int = 90, stripe_w: int = 40, alpha: float = 0.7):
         self.height = height
@@ -16,10 +18,33 @@ class GroundScroller:
         self.c1 = (60, 60, 60)
         self.c2 = (90, 90, 90)
 
+        strip_w = WIN_W + stripe_w
+        self._strip = np.zeros((height, strip_w, 3), dtype=np.uint8)
+        self._runs = []   # ストライプが掛かる列の区間（隙間は元の画像のまま）
+        for i, x in enumerate(range(0, strip_w, stripe_w)):
+            color = self.c1 if (i % 2 == 0) else self.c2
+            cv2.rectangle(self._strip, (x, 0), (x + stripe_w - 6, height), color, -1)
+            self._runs.append((x, min(x + stripe_w - 5, strip_w)))
+        self._blend = np.empty((height, WIN_W, 3), dtype=np.uint8)
+
     def update(self, dt: float):
         self.offset = (self.offset + SCROLL_SPEED * dt) % self.stripe_w
 
     def draw(self, frame):
+        y1 = WIN_H - self.height
+        o = int(self.offset)
+        band = frame[y1:WIN_H, :WIN_W]
+        cv2.addWeighted(self._strip[:, o:o + WIN_W], self.alpha, band, 1 - self.alpha, 0, dst=self._blend)
+        # ストライプの列だけ書き戻す（np.copyto(where=) より列スライスの方が速い）
+        for s0, s1 in self._runs:
+            a, b = max(s0 - o, 0), min(s1 - o, WIN_W)
+            if b > a:
+                band[:, a:b] = self._blend[:, a:b]
+        # 境界線
+        cv2.line(frame, (0, y1), (WIN_W, y1), (120, 120, 120), 2, cv2.LINE_AA)
+
+    def draw_reference(self, frame):
+        """旧実装（フレーム全体をコピーして合成）。比較用"""
         y1 = WIN_H - self.height
         overlay = frame.copy()
         start_x = -int(self.offset)
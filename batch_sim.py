@@ -0,0 +1,294 @@
+# batch_sim.py
+# DIFFICULTY_PRESETS 調整用の一括シミュレーション。
+# 多数のゲームを NumPy の配列（1ゲーム=1要素）で同時に進める。
+# 物理・パイプ出現・当たり判定・ライフゲージは GameState.step と同じ規則。
+import argparse
+import itertools
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config import (WIN_W, WIN_H, RADIUS, PLAYER_X, PIPE_WIDTH, PIPE_GAP_MIN_Y, PIPE_GAP_MAX_Y,
+                    INVINCIBLE_S, LIFE_MAX, LIFE_GAUGE_UNIT, LIFE_GAUGE_COOLDOWN, DIFFICULTY_PRESETS)
+from game_state import START_LIVES
+from obstacles import collide_pipes_np
+
+
+@dataclass
+class BatchState:
+    t: float
+    y: np.ndarray                 # (N,)
+    vy: np.ndarray
+    lives: np.ndarray
+    score: np.ndarray
+    death_t: np.ndarray           # ライフが0になった時刻（生存中は nan）
+    time_from_spawn: np.ndarray
+    next_spawn: np.ndarray
+    invincible_until: np.ndarray
+    gauge: np.ndarray
+    cooldown_until: np.ndarray
+    pipe_x: np.ndarray            # (N, K)
+    pipe_gap_y: np.ndarray
+    pipe_passed: np.ndarray
+    pipe_active: np.ndarray
+
+    @property
+    def n(self) -> int:
+        return self.y.shape[0]
+
+
+def _pipe_capacity(params) -> int:
+    """1ゲームで同時に画面にあり得るパイプの最大数"""
+    life = (WIN_W + 20 + PIPE_WIDTH) / params["scroll_speed"]
+    return int(math.ceil(life / params["spawn_interval_min"])) + 2
+
+
+def init_state(n: int, params, rng: np.random.Generator) -> BatchState:
+    k = _pipe_capacity(params)
+    return BatchState(
+        t=0.0,
+        y=np.full(n, WIN_H * 0.5),
+        vy=np.zeros(n),
+        lives=np.full(n, START_LIVES, dtype=np.int32),
+        score=np.zeros(n, dtype=np.int32),
+        death_t=np.full(n, np.nan),
+        time_from_spawn=np.zeros(n),
+        next_spawn=rng.uniform(params["spawn_interval_min"], params["spawn_interval_max"], n),
+        invincible_until=np.zeros(n),
+        gauge=np.zeros(n),
+        cooldown_until=np.zeros(n),
+        pipe_x=np.zeros((n, k)),
+        pipe_gap_y=np.zeros((n, k)),
+        pipe_passed=np.zeros((n, k), dtype=bool),
+        pipe_active=np.zeros((n, k), dtype=bool),
+    )
+
+
+def step(s: BatchState, mouth_open: np.ndarray, eyes_closed: np.ndarray, dt: float, params,
+         rng: np.random.Generator):
+    """全ゲームを dt 秒進める（ライフ0のゲームは止まったまま）"""
+    s.t += dt
+    now = s.t
+    live = s.lives > 0
+    inv = now < s.invincible_until
+
+    # 物理更新
+    ay = np.where(mouth_open, -params["thrust"], params["gravity"])
+    vy = s.vy + ay * dt
+    y = s.y + vy * dt
+    low, high = y < RADIUS, y > WIN_H - RADIUS
+    y = np.clip(y, RADIUS, WIN_H - RADIUS)
+    vy[low | high] = 0.0
+    s.y = np.where(live, y, s.y)
+    s.vy = np.where(live, vy, s.vy)
+
+    # パイプ生成
+    s.time_from_spawn[live] += dt
+    need = live & (s.time_from_spawn >= s.next_spawn)
+    while need.any():
+        idx = np.flatnonzero(need)
+        slot = np.argmin(s.pipe_active[idx], axis=1)   # 最初の空き
+        s.pipe_x[idx, slot] = WIN_W + 20
+        s.pipe_gap_y[idx, slot] = rng.integers(PIPE_GAP_MIN_Y, PIPE_GAP_MAX_Y + 1, idx.size)
+        s.pipe_passed[idx, slot] = False
+        s.pipe_active[idx, slot] = True
+        s.time_from_spawn[idx] -= s.next_spawn[idx]
+        s.next_spawn[idx] = rng.uniform(params["spawn_interval_min"], params["spawn_interval_max"], idx.size)
+        need = live & (s.time_from_spawn >= s.next_spawn)
+
+    # パイプ移動・画面外を消す
+    moving = s.pipe_active & live[:, None]
+    s.pipe_x[moving] -= params["scroll_speed"] * dt
+    s.pipe_active &= ~(s.pipe_x + PIPE_WIDTH < 0)
+
+    # スコア・衝突判定（x方向で鳥と重なり得るパイプだけ詳しく判定する）
+    active = s.pipe_active & live[:, None]
+    near = active & (s.pipe_x - 1 <= PLAYER_X + RADIUS) & (s.pipe_x + PIPE_WIDTH + 1 >= PLAYER_X - RADIUS)
+    ri, ci = np.nonzero(near)
+    hit = np.zeros(s.n, dtype=bool)
+    if ri.size:
+        h = collide_pipes_np(PLAYER_X, np.trunc(s.y[ri]), RADIUS, s.pipe_x[ri, ci],
+                             s.pipe_gap_y[ri, ci], params["pipe_gap_h"])
+        hit[ri[h]] = True
+    passing = active & ~s.pipe_passed & (s.pipe_x + PIPE_WIDTH < PLAYER_X)
+    s.pipe_passed |= passing
+    s.score += passing.sum(axis=1, dtype=np.int32)
+
+    damaged = live & hit & ~inv
+    s.lives -= damaged
+    s.invincible_until[damaged] = now + INVINCIBLE_S
+
+    # ライフゲージ（LifeGauge.update と同じ）
+    fill = live & eyes_closed & (now >= s.cooldown_until)
+    s.gauge[fill] += params["life_gauge_rate"] * dt
+    gained = np.minimum(np.floor(s.gauge / LIFE_GAUGE_UNIT), np.maximum(0, LIFE_MAX - s.lives))
+    gained = np.where(fill, gained, 0).astype(np.int32)
+    if LIFE_GAUGE_COOLDOWN > 0:
+        gained = np.minimum(gained, 1)
+        s.cooldown_until[gained > 0] = now + LIFE_GAUGE_COOLDOWN
+    s.gauge -= gained * LIFE_GAUGE_UNIT
+    s.lives += gained
+
+    s.death_t[live & (s.lives <= 0)] = now
+
+
+# --- 入力ポリシー ---
+# policy(state, rng) -> (mouth_open[N], eyes_closed[N])
+
+class FollowGapPolicy:
+    """
+    次のパイプのギャップを狙う（GameState の follow_gap_policy の配列版）。
+    狙いのずれはプレイヤーごとに固定。ライフが減ると確率で目を閉じて回復を狙い、
+    目を閉じている間は口の入力が直前のまま固まる（見えていないので）。
+    """
+    def __init__(self, n: int, rng: np.random.Generator, aim_noise: float = 25.0,
+                 p_close: float = 0.01, p_open: float = 0.05):
+        self.offset = rng.normal(0.0, aim_noise, n)
+        self.p_close = p_close
+        self.p_open = p_open
+        self.mouth = np.zeros(n, dtype=bool)
+        self.eyes = np.zeros(n, dtype=bool)
+
+    def __call__(self, s: BatchState, rng: np.random.Generator):
+        rows = np.arange(s.n)
+        xs = np.where(s.pipe_active & (s.pipe_x + PIPE_WIDTH >= PLAYER_X - RADIUS), s.pipe_x, np.inf)
+        k = xs.argmin(axis=1)
+        has = np.isfinite(xs[rows, k])
+        target = np.where(has, s.pipe_gap_y[rows, k], WIN_H * 0.5) + self.offset
+
+        u = rng.random(s.n)
+        want_heal = s.lives < LIFE_MAX
+        self.eyes = np.where(self.eyes, u >= self.p_open, want_heal & (u < self.p_close))
+        steer = (s.y > target + 10) & (s.vy > -150)
+        self.mouth = np.where(self.eyes, self.mouth, steer)
+        return self.mouth, self.eyes
+
+
+class RandomPolicy:
+    """口・目をそれぞれ一定確率で切り替えるだけの入力（マルコフ連鎖）"""
+    def __init__(self, n: int, rng: np.random.Generator, p_mouth: float = 0.08, p_eyes: float = 0.01):
+        self.p_mouth = p_mouth
+        self.p_eyes = p_eyes
+        self.mouth = rng.random(n) < 0.5
+        self.eyes = np.zeros(n, dtype=bool)
+
+    def __call__(self, s: BatchState, rng: np.random.Generator):
+        self.mouth ^= rng.random(s.n) < self.p_mouth
+        self.eyes ^= rng.random(s.n) < self.p_eyes
+        return self.mouth, self.eyes
+
+
+POLICIES = {"follow_gap": FollowGapPolicy, "random": RandomPolicy}
+
+
+def run_batch(params, n: int = 10000, policy: str = "follow_gap", seed: int = 0,
+              dt: float = 1 / 60, max_t: float = 60.0) -> Dict[str, np.ndarray]:
+    """n ゲームを同時に max_t 秒（または全員ゲームオーバー）まで進める"""
+    rng = np.random.default_rng(seed)
+    s = init_state(n, params, rng)
+    pol = POLICIES[policy](n, rng)
+    while s.t < max_t and (s.lives > 0).any():
+        mouth, eyes = pol(s, rng)
+        step(s, mouth, eyes, dt, params, rng)
+    survival = np.where(np.isnan(s.death_t), s.t, s.death_t)
+    return {"survival_t": survival, "score": s.score.copy()}
+
+
+def summarize(result: Dict[str, np.ndarray], max_t: float) -> Dict[str, float]:
+    sv, sc = result["survival_t"], result["score"]
+    out = {"n": int(sv.size), "survived_frac": float(np.mean(sv >= max_t - 1e-9))}
+    for name, v in (("survival_t", sv), ("score", sc)):
+        out[f"{name}_mean"] = float(v.mean())
+        for q in (10, 50, 90):
+            out[f"{name}_p{q}"] = float(np.percentile(v, q))
+    return out
+
+
+def _run_preset(args):
+    name, params, n, policy, seed, dt, max_t = args
+    t0 = time.perf_counter()
+    res = run_batch(params, n=n, policy=policy, seed=seed, dt=dt, max_t=max_t)
+    summary = summarize(res, max_t)
+    summary["elapsed_s"] = time.perf_counter() - t0
+    return name, summary, res
+
+
+def sweep(presets: Dict[str, dict], n: int = 10000, policy: str = "follow_gap", seed: int = 0,
+          dt: float = 1 / 60, max_t: float = 60.0, workers: Optional[int] = None):
+    """プリセットごとに run_batch をプロセスプールで並列に回す。{name: (summary, result)}"""
+    jobs = [(name, params, n, policy, seed, dt, max_t) for name, params in presets.items()]
+    out = {}
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        for name, summary, res in ex.map(_run_preset, jobs):
+            out[name] = (summary, res)
+    return out
+
+
+def preset_grid(base: str, grid: Dict[str, List[float]]) -> Dict[str, dict]:
+    """base プリセットの一部の値を grid の全組み合わせで置き換えたプリセット群"""
+    keys = list(grid)
+    presets = {}
+    for values in itertools.product(*(grid[k] for k in keys)):
+        params = dict(DIFFICULTY_PRESETS[base])
+        params.update(zip(keys, values))
+        label = ",".join(f"{k}={v:g}" for k, v in zip(keys, values))
+        presets[f"{base}[{label}]" if keys else base] = params
+    return presets
+
+
+def _parse_grid(items: List[str]) -> Dict[str, List[float]]:
+    grid = {}
+    for item in items:
+        key, values = item.split("=", 1)
+        if key not in DIFFICULTY_PRESETS["NORMAL"]:
+            raise SystemExit(f"unknown preset key: {key}")
+        grid[key] = [float(v) for v in values.split(",")]
+    return grid
+
+
+def main():
+    ap = argparse.ArgumentParser(description="DIFFICULTY_PRESETS batch simulator")
+    ap.add_argument("--presets", nargs="*", default=list(DIFFICULTY_PRESETS),
+                    help="base presets (default: all)")
+    ap.add_argument("--grid", nargs="*", default=[], metavar="KEY=V1,V2",
+                    help="sweep preset values, e.g. gravity=400,500 pipe_gap_h=150,170")
+    ap.add_argument("--n", type=int, default=10000, help="games per preset")
+    ap.add_argument("--policy", choices=sorted(POLICIES), default="follow_gap")
+    ap.add_argument("--max-t", type=float, default=60.0)
+    ap.add_argument("--dt", type=float, default=1 / 60)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--out", default=None, help="save per-game results to this .npz")
+    args = ap.parse_args()
+
+    grid = _parse_grid(args.grid)
+    presets = {}
+    for base in args.presets:
+        presets.update(preset_grid(base, grid))
+
+    t0 = time.perf_counter()
+    results = sweep(presets, n=args.n, policy=args.policy, seed=args.seed, dt=args.dt,
+                    max_t=args.max_t, workers=args.workers)
+    elapsed = time.perf_counter() - t0
+
+    print(f"{'preset':40s} {'surv_mean':>9s} {'surv_p50':>9s} {'score_mean':>10s} {'score_p90':>9s} {'alive':>6s}")
+    for name, (sm, _) in results.items():
+        print(f"{name:40s} {sm['survival_t_mean']:9.1f} {sm['survival_t_p50']:9.1f} "
+              f"{sm['score_mean']:10.2f} {sm['score_p90']:9.1f} {sm['survived_frac']:6.2f}")
+    total = args.n * len(presets)
+    print(f"{total} games in {elapsed:.1f}s")
+
+    if args.out:
+        arrays = {}
+        for name, (_, res) in results.items():
+            for k, v in res.items():
+                arrays[f"{name}/{k}"] = v
+        np.savez_compressed(args.out, **arrays)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# bench_event_server.py
+# イベントの遅れ（publish してから別プロセスのクライアントが受け取るまで）をループバックで測る。
+#   pipe:   今までの print(..., flush=True) → 標準出力のパイプ（受け手は1つだけ）
+#   server: EventServer（Unix ソケット / TCP）→ EventClient を N 個
+#   stalled: 読まないクライアントが1つ混ざっても、他のクライアントと publish() が待たされないか
+import argparse
+import multiprocessing as mp
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from bench_utils import time_call
+from event_server import EventClient, EventServer, HAS_UNIX
+
+SOCK = "/tmp/bench_event_server.sock"
+
+
+def _pace(i: int, t0: float, rate: float):
+    delay = t0 + i / rate - time.time()
+    if delay > 0:
+        time.sleep(delay)
+
+
+def _pipe_child(n: int, rate: float):
+    """パイプの送り手：送った時刻を1行ずつ print する"""
+    t0 = time.time()
+    for i in range(n):
+        _pace(i, t0, rate)
+        print(f"2 {time.time()!r}", flush=True)
+
+
+def bench_pipe(n: int, rate: float) -> np.ndarray:
+    proc = subprocess.Popen([sys.executable, __file__, "--pipe-child", str(n), "--rate", str(rate)],
+                            stdout=subprocess.PIPE)
+    lat = []
+    for line in proc.stdout:
+        lat.append(time.time() - float(line.split()[1]))
+    proc.wait()
+    return np.asarray(lat)
+
+
+def _client(path, port, ready, out, stall: bool):
+    client = EventClient(path=path, port=port)
+    ready.put(True)
+    if stall:
+        time.sleep(3600)   # つないだまま読まない（切られるまで）
+        return
+    lat = []
+    for ev in client:
+        lat.append(time.time() - ev["t_sent"])
+    client.close()
+    out.put(lat)
+
+
+def bench_server(n: int, rate: float, clients: int, stalled: int, tcp: bool):
+    server = EventServer(path=None if tcp else SOCK, port=0).start()
+    ctx = mp.get_context("spawn")
+    ready, out = ctx.Queue(), ctx.Queue()
+    path, port = (None, server.port) if tcp else (SOCK, 0)
+    procs = [ctx.Process(target=_client, args=(path, port, ready, out, i < stalled), daemon=True)
+             for i in range(clients + stalled)]
+    for p in procs:
+        p.start()
+    for _ in procs:
+        ready.get(timeout=30)
+    while server.n_clients < len(procs):
+        time.sleep(0.01)
+
+    cost = []
+    t0 = time.time()
+    for i in range(n):
+        _pace(i, t0, rate)
+        c0 = time.perf_counter()
+        server.publish("mouth", time.time(), 0.3, 0.3, i)
+        cost.append(time.perf_counter() - c0)
+    time.sleep(0.2)
+    dropped = server.clients_dropped
+    server.close()
+    lat = np.concatenate([np.asarray(out.get(timeout=30)) for _ in range(clients)])
+    for p in procs:
+        p.terminate()
+        p.join()
+    return lat, np.asarray(cost), dropped
+
+
+def _publish_cost(cost: np.ndarray) -> str:
+    return f"publish p50 {np.percentile(cost, 50) * 1e6:.1f} us p99 {np.percentile(cost, 99) * 1e6:.1f} us"
+
+
+def _row(name: str, lat: np.ndarray, n_expected: int, extra: str = ""):
+    ms = lat * 1000.0
+    print(f"{name:28s} {len(lat):6d}/{n_expected:<6d} p50 {np.percentile(ms, 50):6.3f} ms  "
+          f"p99 {np.percentile(ms, 99):6.3f} ms  max {ms.max():7.3f} ms  {extra}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Loopback latency of the event server vs a stdout pipe")
+    ap.add_argument("--n", type=int, default=3000, help="events per run")
+    ap.add_argument("--rate", type=float, default=300.0, help="events per second")
+    ap.add_argument("--clients", type=int, default=4)
+    ap.add_argument("--pipe-child", type=int, default=None, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.pipe_child is not None:
+        _pipe_child(args.pipe_child, args.rate)
+        return
+
+    print(f"{args.n} events at {args.rate:.0f}/s, latency = publish -> received in another process")
+    _row("stdout pipe, 1 reader", bench_pipe(args.n, args.rate), args.n)
+    transports = [("unix", False), ("tcp", True)] if HAS_UNIX else [("tcp", True)]
+    for name, tcp in transports:
+        for clients in (1, args.clients):
+            lat, cost, _ = bench_server(args.n, args.rate, clients, 0, tcp)
+            _row(f"{name} socket, {clients} client(s)", lat, args.n * clients,
+                 _publish_cost(cost))
+        lat, cost, dropped = bench_server(args.n, args.rate, args.clients, 1, tcp)
+        _row(f"{name}, {args.clients} + 1 stalled", lat, args.n * args.clients,
+             f"{_publish_cost(cost)}, stalled client dropped: {dropped}")
+
+    # 購読者がいないときの publish の負担
+    server = EventServer(path=None if not HAS_UNIX else SOCK, port=0).start()
+    idle = time_call(lambda: server.publish("mouth", 0.0, 0.3, 0.3), n=20000)
+    server.close()
+    print(f"publish() with no subscribers: {idle['mean_us']:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
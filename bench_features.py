@@ -0,0 +1,52 @@
+# bench_features.py
+# 目・口特徴量（EAR/MAR）の1フレームあたりのコスト比較
+#   before: 478点すべてをリスト内包で配列化 → np.linalg.norm を6回ずつ
+#   after : face_features で18点だけ取り出し、1回のベクトル演算
+from types import SimpleNamespace
+
+import numpy as np
+
+from bench_utils import time_call, print_compare
+from face_features import R_EYE, L_EYE, MOUTH, gather_points, ear_mar, ear_mar_batch
+
+W, H = 960, 540
+
+
+def _dist(a, b): return float(np.linalg.norm(a - b))
+
+def _ratio_legacy(pts, idxs, mouth=False):
+    if mouth:
+        left, up1, up2, low1, low2, right = [pts[i] for i in idxs]
+    else:
+        left, up1, up2, right, low1, low2 = [pts[i] for i in idxs]
+    horiz = _dist(left, right)
+    vert  = (_dist(up1, low1) + _dist(up2, low2)) / 2.0
+    return 0.0 if horiz < 1e-6 else vert / horiz
+
+def legacy_ear_mar(landmarks, w, h):
+    pts = np.array([(lm.x * w, lm.y * h) for lm in landmarks], dtype=np.float32)
+    mar = _ratio_legacy(pts, MOUTH, mouth=True)
+    ear = (_ratio_legacy(pts, R_EYE) + _ratio_legacy(pts, L_EYE)) / 2.0
+    return ear, mar
+
+
+def main():
+    rng = np.random.default_rng(0)
+    xy = rng.uniform(0.2, 0.8, size=(478, 2))
+    landmarks = [SimpleNamespace(x=float(x), y=float(y)) for x, y in xy]
+
+    ear0, mar0 = legacy_ear_mar(landmarks, W, H)
+    ear1, mar1 = ear_mar(gather_points(landmarks, W, H))
+    assert abs(ear0 - ear1) < 1e-4 and abs(mar0 - mar1) < 1e-4, (ear0, ear1, mar0, mar1)
+
+    before = time_call(lambda: legacy_ear_mar(landmarks, W, H), n=2000)
+    after = time_call(lambda: ear_mar(gather_points(landmarks, W, H)), n=2000)
+    print_compare("EAR/MAR per frame (1 face)", before, after)
+
+    batch = (rng.uniform(0.2, 0.8, size=(10000, 478, 2)) * (W, H)).astype(np.float32)
+    stats = time_call(lambda: ear_mar_batch(batch), n=20, warmup=2)
+    print(f"batch (10000, 478, 2): {stats['mean_us'] / 10000:.3f} µs/frame")
+
+
+if __name__ == "__main__":
+    main()
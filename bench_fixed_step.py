@@ -0,0 +1,58 @@
+# bench_fixed_step.py
+# 描画のフレームレートを変えたときの進み方：フレームの dt で進める旧方式（hz=0）と固定刻み（StepRunner）の比較。
+# follow_gap_policy で毎フレーム入力を決め、壁時計で duration 秒ぶん遊ぶ（ライフは減っても続ける）
+#   speed: 壁時計1秒あたりに進むゲーム内時間（1.0 なら遅い機械でもスローにならない）
+#   pipes/min, hits/min: 壁時計1分あたりに通ったパイプ・当たった回数（遊んだ感触が機械の速さで変わるか）
+#   update us p99: 1フレームの更新時間。刻みの数は FIXED_MAX_STEPS で頭打ちになる
+import argparse
+import time
+
+import numpy as np
+
+from config import FIXED_STEP_HZ, FIXED_MAX_STEPS
+from game_state import GameState, StepRunner, follow_gap_policy
+
+
+def run(fps: float, hz: float, duration: float, jitter: float, seed: int):
+    rng = np.random.default_rng(seed)
+    state = GameState(seed=seed)
+    state.lives = 10**6   # 当たっても最後まで動かす
+    runner = StepRunner(state, hz=hz, max_steps=FIXED_MAX_STEPS)
+    wall = 0.0
+    hits = 0
+    cost = []
+    while wall < duration:
+        frame_dt = (1.0 / fps) * (1.0 + jitter * rng.uniform(-1.0, 1.0))
+        wall += frame_dt
+        t0 = time.perf_counter()
+        ev = runner.advance([follow_gap_policy(state)], frame_dt)[0]
+        cost.append(time.perf_counter() - t0)
+        hits += ev.hit
+    return {"speed": state.t / wall, "pipes": state.score, "hits": hits, "wall": wall,
+            "steps": runner.steps / len(cost), "cost": cost}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Variable dt vs fixed timestep at different render rates")
+    ap.add_argument("--duration", type=float, default=60.0, help="wall-clock seconds per game")
+    ap.add_argument("--seeds", type=int, default=5)
+    ap.add_argument("--jitter", type=float, default=0.3, help="random frame-time jitter (fraction)")
+    ap.add_argument("--fps", type=float, nargs="+", default=[144, 60, 30, 20, 12, 8])
+    args = ap.parse_args()
+
+    print(f"{args.seeds} games x {args.duration:.0f} s wall clock per row, frame times jittered "
+          f"+-{args.jitter * 100:.0f}%")
+    print(f"{'mode':>10} {'fps':>5} {'speed':>6} {'pipes/min':>10} {'hits/min':>9} "
+          f"{'steps/frame':>12} {'update us p99':>14}")
+    for hz, name in ((0, "variable"), (FIXED_STEP_HZ, f"fixed {FIXED_STEP_HZ}")):
+        for fps in args.fps:
+            rs = [run(fps, hz, args.duration, args.jitter, seed) for seed in range(args.seeds)]
+            minutes = sum(r["wall"] for r in rs) / 60.0
+            cost = np.concatenate([r["cost"] for r in rs])
+            print(f"{name:>10} {fps:5.0f} {np.mean([r['speed'] for r in rs]):6.2f} "
+                  f"{sum(r['pipes'] for r in rs) / minutes:10.1f} {sum(r['hits'] for r in rs) / minutes:9.1f} "
+                  f"{np.mean([r['steps'] for r in rs]):12.2f} {np.percentile(cost, 99) * 1e6:14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# bench_frame.py
+# 1フレームの処理を段階ごとに計測する（カメラ・ウィンドウ不要）
+#   python bench_frame.py                          # 合成フレームで計測
+#   python bench_frame.py --video data/sessions/a.mp4 --save data/perf/base.json
+#   python bench_frame.py --compare data/perf/base.json --threshold 0.15
+# --compare で基準より p50 が threshold を超えて遅くなった段階があれば終了コード1
+import argparse
+import json
+import platform
+import sys
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from bench_utils import time_call, alloc_call
+from config import WIN_W, WIN_H, PLAYER_X, PIPE_GAP_H
+from face_features import gather_points, ear_mar
+from pipe_render import draw_pipe
+from background import GroundScroller
+from bird_anim import BirdAnimator, overlay_image_alpha
+from hud import HudCompositor
+
+CAMERA_W, CAMERA_H = 640, 480
+
+
+def load_frames(video: Optional[str], image: Optional[str], count: int = 60) -> List[np.ndarray]:
+    """計測に使うカメラ相当のフレーム。動画 → 画像 → 乱数の順に使う"""
+    if video:
+        cap = cv2.VideoCapture(video)
+        frames = []
+        while len(frames) < count:
+            ok, img = cap.read()
+            if not ok:
+                break
+            frames.append(img)
+        cap.release()
+        if not frames:
+            raise SystemExit(f"could not read frames from {video}")
+        return frames
+    if image:
+        img = cv2.imread(image)
+        if img is None:
+            raise SystemExit(f"could not read {image}")
+        return [cv2.resize(img, (CAMERA_W, CAMERA_H))]
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, size=(CAMERA_H, CAMERA_W, 3), dtype=np.uint8)]
+
+
+class _Cycle:
+    """呼ぶたびに次のフレームを返す"""
+    def __init__(self, frames):
+        self.frames = frames
+        self.i = 0
+
+    def __call__(self):
+        f = self.frames[self.i]
+        self.i = (self.i + 1) % len(self.frames)
+        return f
+
+
+def build_stages(frames: List[np.ndarray], with_facemesh: bool = True) -> Dict[str, Callable[[], object]]:
+    stages: Dict[str, Callable[[], object]] = {}
+    raw = _Cycle(frames)
+    vis = cv2.resize(cv2.flip(frames[0], 1), (WIN_W, WIN_H))
+    frame = vis.copy()
+
+    detector = None
+    if with_facemesh:
+        try:
+            from detector_facemesh import FaceInputDetector
+            detector = FaceInputDetector(draw_mesh=False, adaptive=False)
+        except ImportError as e:
+            print(f"skip preprocess/facemesh: {e}")
+
+    if detector is not None:
+        prepared = [detector.prepare(f).copy() for f in frames]
+        vis = prepared[0]
+        frame = vis.copy()
+        stages["preprocess"] = lambda: detector.to_infer_rgb(detector.prepare(raw()))
+        stages["facemesh"] = lambda: detector.infer(prepared[raw.i % len(prepared)].copy())
+
+    # EAR/MAR：478点の擬似landmarkから18点を集めて計算
+    rng = np.random.default_rng(1)
+    lms = [SimpleNamespace(x=float(x), y=float(y)) for x, y in rng.random((478, 2))]
+    stages["ear_mar"] = lambda: ear_mar(gather_points(lms, WIN_W, WIN_H))
+
+    pipes = [(-40.5, 200), (220.3, 300), (480.0, 380), (740.7, 160)]
+
+    def pipes_draw():
+        for x, gy in pipes:
+            draw_pipe(frame, x, gy, gap_h=PIPE_GAP_H)
+    stages["draw_pipe"] = pipes_draw
+
+    ground = GroundScroller()
+    stages["ground"] = lambda: ground.draw(frame)
+
+    bird = BirdAnimator(difficulty="NORMAL")
+    bird_img = bird.get_frame()
+    stages["overlay"] = lambda: overlay_image_alpha(frame, bird_img, PLAYER_X - 80, 200)
+
+    try:
+        from mouthy_bird_game import draw_life_gauge
+        stages["life_gauge"] = lambda: draw_life_gauge(frame, 0.4, 3)
+    except ImportError as e:
+        print(f"skip life_gauge: {e}")
+
+    hud = HudCompositor()
+
+    def hud_text():
+        # draw_game のスコア表示と draw_debug の数値表示（タイルの合成。描き直しは bench_hud.py）
+        hud.text(frame, "Score: 12", (16, 36), 0.9, (255, 255, 255), 2)
+        hud.text(frame, "Invincible: 0.8s", (16, 132), 0.8, (80, 220, 255), 2)
+        x = hud.text(frame, "MAR:0.12", (16, 150), 0.7, (255, 255, 255), 2, cv2.LINE_AA)
+        hud.text(frame, "EAR:0.31", (x, 150), 0.7, (255, 255, 255), 2, cv2.LINE_AA)
+    stages["hud_text"] = hud_text
+    return stages
+
+
+def run(stages: Dict[str, Callable[[], object]], n: int, only: Optional[List[str]] = None) -> Dict[str, dict]:
+    results = {}
+    for name, fn in stages.items():
+        if only and name not in only:
+            continue
+        k = max(20, n // 10) if name == "facemesh" else n
+        st = time_call(fn, n=k, warmup=min(50, k))
+        st.update(alloc_call(fn, n=min(20, k)))
+        results[name] = st
+        print(f"{name:12s} mean {st['mean_us']:9.1f} µs  p95 {st['p95_us']:9.1f}  p99 {st['p99_us']:9.1f}"
+              f"  peak alloc {st['peak_bytes'] / 1024:8.1f} KiB")
+    total = sum(r["mean_us"] for r in results.values())
+    print(f"{'total':12s} mean {total:9.1f} µs")
+    return results
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float,
+            metric: str = "p50_us") -> List[str]:
+    """基準より threshold（割合）を超えて遅くなった段階名を返す"""
+    regressions = []
+    for name, st in results.items():
+        base = baseline.get(name)
+        if base is None or base.get(metric, 0) <= 0:
+            continue
+        ratio = st[metric] / base[metric]
+        flag = "REGRESSION" if ratio > 1.0 + threshold else ""
+        print(f"{name:12s} {metric} {base[metric]:9.1f} -> {st[metric]:9.1f} µs  x{ratio:.2f} {flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="per-stage frame time benchmark (headless)")
+    ap.add_argument("--video", help="recorded video to use as camera frames")
+    ap.add_argument("--image", help="still image to use as the camera frame")
+    ap.add_argument("--n", type=int, default=500, help="calls per stage")
+    ap.add_argument("--stages", nargs="*", help="run only these stages")
+    ap.add_argument("--no-facemesh", action="store_true", help="skip MediaPipe stages")
+    ap.add_argument("--save", metavar="JSON", help="write results as a baseline")
+    ap.add_argument("--compare", metavar="JSON", help="compare against a saved baseline")
+    ap.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown (0.15 = +15%%)")
+    ap.add_argument("--metric", default="p50_us", choices=["mean_us", "p50_us", "p95_us", "p99_us"])
+    args = ap.parse_args(argv)
+
+    frames = load_frames(args.video, args.image)
+    stages = build_stages(frames, with_facemesh=not args.no_facemesh)
+    results = run(stages, args.n, args.stages)
+
+    if args.save:
+        meta = {"python": platform.python_version(), "numpy": np.__version__, "cv2": cv2.__version__,
+                "machine": platform.machine(), "frames": args.video or args.image or "synthetic"}
+        with open(args.save, "w") as f:
+            json.dump({"meta": meta, "stages": results}, f, indent=2)
+        print(f"saved baseline: {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["stages"]
+        regressions = compare(results, baseline, args.threshold, args.metric)
+        if regressions:
+            print(f"regressed past {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+# bench_ground.py
+# 床のストライプ描画：旧実装（全体コピー＋全体合成）と帯だけ合成する実装の比較
+import numpy as np
+
+from bench_utils import time_call, print_compare
+from background import GroundScroller
+from config import WIN_W, WIN_H
+
+
+def check_equivalence(g: GroundScroller, bg: np.ndarray) -> int:
+    """いろいろなオフセットで両実装の出力を比べ、最大の差を返す"""
+    worst = 0
+    for step in range(3 * g.stripe_w):
+        g.offset = (step * 0.37) % g.stripe_w
+        a = bg.copy(); g.draw_reference(a)
+        b = bg.copy(); g.draw(b)
+        worst = max(worst, int(np.abs(a.astype(np.int16) - b.astype(np.int16)).max()))
+    return worst
+
+
+def main():
+    rng = np.random.default_rng(0)
+    bg = rng.integers(0, 256, size=(WIN_H, WIN_W, 3), dtype=np.uint8)
+    g = GroundScroller()
+
+    worst = check_equivalence(g, bg)
+    print(f"max abs difference vs reference: {worst}")
+    assert worst <= 1, worst
+
+    frame = bg.copy()
+    before = time_call(lambda: g.draw_reference(frame), n=500)
+    after = time_call(lambda: g.draw(frame), n=500)
+    print_compare("GroundScroller.draw", before, after)
+
+
+if __name__ == "__main__":
+    main()
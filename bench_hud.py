@@ -0,0 +1,76 @@
+# bench_hud.py
+# HUD の描画：毎フレーム cv2.putText / rectangle で描く旧実装と、HudCompositor（タイルを使い回して合成）の比較
+import cv2
+import numpy as np
+
+from bench_utils import time_call, print_compare
+from config import WIN_W, WIN_H
+from hud import HudCompositor
+from mouthy_bird_game import draw_life_gauge
+
+
+def hud_before(vis, score, ratio, lives, remain, mar, ear):
+    cv2.putText(vis, f"Score: {score}", (16, 36), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (255,255,255), 2)
+    x, y, w, h = 16, 100, 180, 14
+    cv2.rectangle(vis, (x, y), (x+w, y+h), (60, 60, 60), 2, cv2.LINE_AA)
+    fill_w = int(w * max(0.0, min(1.0, ratio)))
+    cv2.rectangle(vis, (x+1, y+1), (x+1+fill_w, y+h-1), (90, 230, 90), -1, cv2.LINE_AA)
+    cv2.putText(vis, f"Lives: {lives}", (x, y-25), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2, cv2.LINE_AA)
+    cv2.putText(vis, "Heal", (x+w+8, y+h-19), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (180, 255, 180), 1, cv2.LINE_AA)
+    cv2.putText(vis, f"Invincible: {remain:.1f}s", (16, 132), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (80, 220, 255), 2)
+    cv2.putText(vis, f"MAR:{mar:.2f} EAR:{ear:.2f}", (16, 150),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255,255,255), 2, cv2.LINE_AA)
+
+
+def hud_after(hud, vis, score, ratio, lives, remain, mar, ear):
+    hud.text(vis, f"Score: {score}", (16, 36), 0.9, (255,255,255), 2)
+    draw_life_gauge(vis, ratio, lives, hud)
+    hud.text(vis, f"Invincible: {remain:.1f}s", (16, 132), 0.8, (80, 220, 255), 2)
+    x = hud.text(vis, f"MAR:{mar:.2f}", (16, 150), 0.7, (255,255,255), 2, cv2.LINE_AA)
+    hud.text(vis, f"EAR:{ear:.2f}", (x, 150), 0.7, (255,255,255), 2, cv2.LINE_AA)
+
+
+def game_values(i):
+    """60fps のプレイ相当：スコアは2秒ごと、無敵表示は0.1秒ごと、MAR/EAR は毎推論（30fps）変わる"""
+    t = i / 60.0
+    return (int(t / 2), (t % 3.0) / 3.0, 3, 1.0 - (t % 1.0), 0.1 + 0.2 * ((i // 2) % 7) / 7, 0.3)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    bg = rng.integers(0, 256, size=(WIN_H, WIN_W, 3), dtype=np.uint8)
+    a, b = bg.copy(), bg.copy()
+    hud = HudCompositor()
+    vals = (12, 0.4, 3, 0.8, 0.12, 0.31)
+    hud_before(a, *vals)
+    hud_after(hud, b, *vals)
+    diff = np.abs(a.astype(np.int16) - b.astype(np.int16))
+    print(f"max abs difference vs direct drawing: {int(diff.max())} "
+          f"({int((diff > 2).any(axis=2).sum())} px differ by more than 2)")
+
+    frame = bg.copy()
+    before = time_call(lambda: hud_before(frame, *vals), n=2000)
+    after = time_call(lambda: hud_after(hud, frame, *vals), n=2000)
+    print_compare("HUD, values unchanged", before, after)
+
+    i = [0]
+
+    def step_before():
+        i[0] += 1
+        hud_before(frame, *game_values(i[0]))
+
+    def step_after():
+        i[0] += 1
+        hud_after(hud, frame, *game_values(i[0]))
+
+    i[0] = 0
+    before = time_call(step_before, n=3000)
+    i[0] = 0
+    r0 = hud.rebuilds
+    after = time_call(step_after, n=3000)
+    print_compare("HUD, values changing like a 60 fps game", before, after)
+    print(f"  tile rebuilds: {hud.rebuilds - r0} for 3050 frames x 4 widgets")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+# bench_pipe_store.py
+# パイプ更新＋スコア・衝突判定：Pipe のリストと PipeStore（配列）の比較
+import numpy as np
+
+from bench_utils import time_call, print_compare
+from config import WIN_W, PLAYER_X, RADIUS, PIPE_GAP_H
+from obstacles import Pipe, update_pipes, check_score_and_collision
+from pipe_store import PipeStore
+
+
+def main():
+    y = 250
+    for n in (4, 16, 64):
+        # 画面内に等間隔で n 本（密な出現設定を想定）
+        xs = np.linspace(-50, WIN_W, n)
+        pipes = [Pipe(x=float(x), gap_y=300.0, gap_h=PIPE_GAP_H) for x in xs]
+        store = PipeStore()
+        for x in xs:
+            store.spawn(float(x), 300.0, PIPE_GAP_H)
+        assert check_score_and_collision(pipes, PLAYER_X, y) == store.score_and_collide(PLAYER_X, y, RADIUS)
+
+        def step_list():
+            nonlocal pipes
+            pipes = update_pipes(pipes, 1 / 60, 0.0)
+            check_score_and_collision(pipes, PLAYER_X, y)
+
+        def step_store():
+            store.scroll(0.0)
+            store.score_and_collide(PLAYER_X, y, RADIUS)
+
+        print_compare(f"scroll + score/collide, {n} pipes",
+                      time_call(step_list, n=5000), time_call(step_store, n=5000))
+
+
+if __name__ == "__main__":
+    main()
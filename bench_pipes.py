@@ -0,0 +1,60 @@
+# bench_pipes.py
+# パイプ描画：毎回 cv2.rectangle で描く場合と、キャッシュ画像をコピーする場合の比較
+import numpy as np
+
+from bench_utils import time_call, print_compare
+from config import WIN_W, WIN_H, PIPE_GAP_H
+from obstacles import Pipe
+from pipe_render import draw_pipe
+
+
+BORDER = 3   # cv2 は画面端で切った AA の外周線に端の丸めを描き直すので、参照側が端から3画素だけ変わる
+
+
+def check_equivalence(bg: np.ndarray):
+    """
+    負の小数を含むいろいろな x・ギャップ位置で cached=True/False の出力を比べる。
+    戻り値は (画面端 BORDER 画素を除いた最大の差, 画面端で差が8を超えた画素数)
+    """
+    worst, at_border = 0, 0
+    for x in (-40.5, -40.0, -7.25, -0.5, 0.0, 13.7, 220.3, WIN_W - 30.5):
+        for gy in (90.0, 200.0, 300.5, 380.0, WIN_H - 90.0):
+            a = bg.copy(); draw_pipe(a, x, gy, cached=False)
+            b = bg.copy(); draw_pipe(b, x, gy, cached=True)
+            diff = np.abs(a.astype(np.int16) - b.astype(np.int16)).max(axis=2)
+            inner = diff[BORDER:-BORDER, BORDER:-BORDER]
+            worst = max(worst, int(inner.max()))
+            at_border += int((diff > 8).sum() - (inner > 8).sum())
+    return worst, at_border
+
+
+def main():
+    rng = np.random.default_rng(0)
+    bg = rng.integers(0, 256, size=(WIN_H, WIN_W, 3), dtype=np.uint8)
+    worst, at_border = check_equivalence(bg)
+    print(f"max abs difference vs cv2.rectangle: {worst} "
+          f"(pixels differing by >8 within {BORDER} px of the frame edge: {at_border})")
+    assert worst <= 3, worst
+
+    # 画面内に4本（左端で一部はみ出すものを含む）
+    pipes = [Pipe(x=float(x), gap_y=float(gy), gap_h=PIPE_GAP_H)
+             for x, gy in [(-40.5, 200), (220.3, 300), (480.0, 380), (740.7, 160)]]
+    frame = bg.copy()
+
+    def draw(cached):
+        frame[:] = bg
+        for p in pipes:
+            draw_pipe(frame, p.x, p.gap_y, p.w, p.gap_h, cached=cached)
+
+    # 背景のコピー分を差し引いて比べる
+    base = time_call(lambda: np.copyto(frame, bg), n=500)
+    before = time_call(lambda: draw(False), n=500)
+    after = time_call(lambda: draw(True), n=500)
+    for st in (before, after):
+        for k in st:
+            st[k] -= base[k]
+    print_compare("draw_pipe x4 per frame", before, after)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+# bench_prep.py
+# 前処理（表示サイズへのリサイズ＋鏡像＋推論用の縮小・RGB化）：毎回確保する旧実装と使い回す実装の比較
+import cv2
+import numpy as np
+
+from bench_utils import time_call, alloc_call, print_compare
+from config import WIN_W, WIN_H, INFER_W, INFER_H
+from frame_prep import FramePreprocessor
+
+
+def prep_before(frame):
+    vis = cv2.flip(cv2.resize(frame, (WIN_W, WIN_H)), 1)
+    small = cv2.resize(vis, (INFER_W, INFER_H), interpolation=cv2.INTER_AREA)
+    return vis, cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+
+
+def prep_after(prep: FramePreprocessor, frame):
+    vis = prep(frame)
+    small = prep.buffer("infer_small", (INFER_H, INFER_W, 3))
+    cv2.resize(vis, (INFER_W, INFER_H), dst=small, interpolation=cv2.INTER_AREA)
+    rgb = prep.buffer("infer_rgb", small.shape)
+    cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=rgb)
+    return vis, rgb
+
+
+def main():
+    rng = np.random.default_rng(0)
+    prep = FramePreprocessor()
+    # 640x480: 表示サイズを要求できなかったカメラ、960x540: 表示サイズで取れたカメラ
+    for w, h in [(640, 480), (1280, 720), (WIN_W, WIN_H)]:
+        frame = rng.integers(0, 256, size=(h, w, 3), dtype=np.uint8)
+        a_vis, a_rgb = prep_before(frame)
+        b_vis, b_rgb = prep_after(prep, frame)
+        assert np.array_equal(a_vis, b_vis) and np.array_equal(a_rgb, b_rgb)
+
+        before = time_call(lambda: prep_before(frame), n=300)
+        after = time_call(lambda: prep_after(prep, frame), n=300)
+        print_compare(f"capture {w}x{h} -> {WIN_W}x{WIN_H} + infer RGB", before, after)
+        ab = alloc_call(lambda: prep_before(frame))
+        aa = alloc_call(lambda: prep_after(prep, frame))
+        print(f"  alloc per frame: before {ab['peak_bytes'] / 1e6:.2f} MB  after {aa['peak_bytes'] / 1e6:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
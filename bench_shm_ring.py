@@ -0,0 +1,170 @@
+# bench_shm_ring.py
+# カメラ側プロセス → 推論側プロセスのフレーム受け渡し：multiprocessing.Queue（毎回 pickle でコピー）と
+# 共有メモリのリング（ビューで読み、戻すのは小さな結果だけ）の比較
+import argparse
+import multiprocessing as mp
+import time
+
+import numpy as np
+
+from bench_utils import time_call, print_compare
+from config import WIN_W, WIN_H
+from shm_ring import SharedFrameRing
+
+
+def _feature(img: np.ndarray, work_s: float) -> float:
+    """推論の代わり：間引いた画素の平均（＋指定時間だけ待つ）"""
+    v = float(img[::16, ::16, 1].mean())
+    if work_s > 0:
+        time.sleep(work_s)
+    return v
+
+
+def _queue_consumer(frames, results, work_s):
+    while True:
+        item = frames.get()
+        if item is None:
+            return
+        seq, t, img = item
+        results.put((seq, t, _feature(img, work_s)))
+
+
+def _ring_consumer(spec, wake, stop, results, work_s):
+    ring = SharedFrameRing.attach(spec)
+    last = -1
+    try:
+        while not stop.is_set():
+            if not wake.wait(0.1):
+                continue
+            wake.clear()
+            got = ring.read()
+            if got is None or got[0] == last:
+                continue
+            seq, t, img = got
+            v = _feature(img, work_s)
+            last = seq
+            if ring.is_current(seq):
+                results.put((seq, t, v))
+    finally:
+        ring.close()
+
+
+class QueueLink:
+    def __init__(self, ctx, work_s, maxsize=2):
+        self.frames = ctx.Queue(maxsize=maxsize)
+        self.results = ctx.Queue()
+        self.proc = ctx.Process(target=_queue_consumer, args=(self.frames, self.results, work_s), daemon=True)
+        self.proc.start()
+
+    def send(self, seq, img):
+        self.frames.put((seq, time.perf_counter(), img))
+        return seq
+
+    def close(self):
+        self.frames.put(None)
+        self.proc.join()
+
+
+class RingLink:
+    def __init__(self, ctx, work_s, slots=4):
+        self.ring = SharedFrameRing((WIN_H, WIN_W, 3), slots=slots)
+        self.wake = ctx.Event()
+        self.stop = ctx.Event()
+        self.results = ctx.Queue()
+        self.proc = ctx.Process(target=_ring_consumer, daemon=True,
+                                args=(self.ring.spec, self.wake, self.stop, self.results, work_s))
+        self.proc.start()
+
+    def send(self, _seq, img):
+        # 実際の使い方と同じく、前処理の出力先を共有メモリの枠にする（ここでは1回の copyto）
+        np.copyto(self.ring.begin_write(), img)
+        seq = self.ring.commit(time.perf_counter())
+        self.wake.set()
+        return seq   # リング側の通し番号（結果にはこれが付いて戻る）
+
+    def close(self):
+        self.stop.set()
+        self.proc.join()
+        self.ring.close()
+
+
+def round_trip(link, img, n):
+    """1枚送って結果が戻るまで（ロックステップ）"""
+    count = [0]
+
+    def once():
+        count[0] += 1
+        seq = link.send(count[0], img)
+        while link.results.get()[0] != seq:
+            pass
+    return time_call(once, n=n, warmup=20)
+
+
+def stream(link, img, duration, fps):
+    """
+    カメラの速さ（fps、0 なら全速）で送り続け、推論側が処理できた枚数と遅れ、
+    送る側（描画ループ）が1枚に使った時間を測る
+    """
+    sent = 0
+    send_s = 0.0
+    lat = []
+    t_start = time.perf_counter()
+    t_end = t_start + duration
+    while time.perf_counter() < t_end:
+        if fps > 0:
+            wait = t_start + sent / fps - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+        t0 = time.perf_counter()
+        link.send(sent, img)
+        send_s += time.perf_counter() - t0
+        sent += 1
+        while not link.results.empty():
+            _, t, _ = link.results.get()
+            lat.append(time.perf_counter() - t)
+    time.sleep(0.2)
+    while not link.results.empty():
+        link.results.get()
+    done = len(lat)
+    lat = np.array(lat) * 1000.0 if lat else np.zeros(1)
+    return {"sent_fps": sent / duration, "done_fps": done / duration, "send_us": send_s / max(sent, 1) * 1e6,
+            "lat_p50_ms": float(np.percentile(lat, 50)), "lat_p95_ms": float(np.percentile(lat, 95))}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=300, help="round trips per method")
+    ap.add_argument("--duration", type=float, default=3.0, help="streaming seconds per method")
+    ap.add_argument("--work-ms", type=float, default=0.0,
+                    help="simulated inference time in the consumer (FaceMesh is ~10-30 ms)")
+    ap.add_argument("--fps", type=float, default=30.0, help="streaming: camera frame rate (0 = as fast as possible)")
+    args = ap.parse_args()
+
+    ctx = mp.get_context("spawn")
+    img = np.random.default_rng(0).integers(0, 256, size=(WIN_H, WIN_W, 3), dtype=np.uint8)
+    work_s = args.work_ms / 1000.0
+
+    links = {"queue": lambda: QueueLink(ctx, work_s), "shm ring": lambda: RingLink(ctx, work_s)}
+    rt = {}
+    for name, make in links.items():
+        link = make()
+        try:
+            rt[name] = round_trip(link, img, args.n)
+        finally:
+            link.close()
+    print_compare(f"round trip {WIN_W}x{WIN_H} frame -> result (queue -> shm ring)", rt["queue"], rt["shm ring"])
+
+    print(f"streaming for {args.duration:.1f}s at {args.fps:.0f} fps (consumer work {args.work_ms:.1f} ms)")
+    for name, make in links.items():
+        link = make()
+        try:
+            s = stream(link, img, args.duration, args.fps)
+        finally:
+            link.close()
+        print(f"  {name:8s}: sent {s['sent_fps']:7.1f} fps ({s['send_us']:7.1f} µs each)  "
+              f"processed {s['done_fps']:7.1f} fps  "
+              f"latency p50 {s['lat_p50_ms']:6.2f} ms  p95 {s['lat_p95_ms']:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
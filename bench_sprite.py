@@ -0,0 +1,33 @@
+# bench_sprite.py
+# 鳥画像のアルファ合成：float64 での合成と Sprite（前計算＋固定小数点）の比較
+import numpy as np
+
+from bench_utils import time_call, print_compare
+from bird_anim import Sprite, overlay_image_alpha
+from config import WIN_W, WIN_H
+
+
+def main():
+    rng = np.random.default_rng(0)
+    bg = rng.integers(0, 256, size=(WIN_H, WIN_W, 3), dtype=np.uint8)
+    fg = rng.integers(0, 256, size=(120, 120, 4), dtype=np.uint8)
+    fg[:20, :, 3] = 0      # 透明
+    fg[-20:, :, 3] = 255   # 不透明
+    sprite = Sprite.from_bgra(fg)
+
+    # 画面内・左上はみ出し・右下はみ出しで結果を比べる（float側は切り捨てなので差は1まで）
+    for x, y in [(200, 200), (-30, -50), (WIN_W - 60, WIN_H - 40)]:
+        a = overlay_image_alpha(bg.copy(), fg, x, y)
+        b = overlay_image_alpha(bg.copy(), sprite, x, y)
+        diff = int(np.abs(a.astype(np.int16) - b.astype(np.int16)).max())
+        print(f"max abs difference at ({x}, {y}): {diff}")
+        assert diff <= 1, diff
+
+    frame = bg.copy()
+    before = time_call(lambda: overlay_image_alpha(frame, fg, 200, 200), n=2000)
+    after = time_call(lambda: overlay_image_alpha(frame, sprite, 200, 200), n=2000)
+    print_compare("overlay 120x120 BGRA", before, after)
+
+
+if __name__ == "__main__":
+    main()
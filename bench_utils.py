@@ -0,0 +1,54 @@
+# bench_utils.py
+import time
+import tracemalloc
+from typing import Callable, Dict
+
+import numpy as np
+
+
+def time_call(fn: Callable[[], object], n: int = 1000, warmup: int = 50) -> Dict[str, float]:
+    """fn を n 回呼んで1回あたりの時間 [µs] の統計を返す"""
+    for _ in range(warmup):
+        fn()
+    samples = np.empty(n, dtype=np.float64)
+    for i in range(n):
+        t0 = time.perf_counter_ns()
+        fn()
+        samples[i] = (time.perf_counter_ns() - t0) / 1000.0
+    return {
+        "mean_us": float(samples.mean()),
+        "p50_us": float(np.percentile(samples, 50)),
+        "p95_us": float(np.percentile(samples, 95)),
+        "p99_us": float(np.percentile(samples, 99)),
+    }
+
+
+def alloc_call(fn: Callable[[], object], n: int = 20) -> Dict[str, float]:
+    """
+    tracemalloc で fn 1回あたりのメモリ確保を測る（時間計測とは別に回す）
+    peak_bytes: 呼び出し中に一時的に増えた最大量、retained_bytes: 呼び出し後も残った量
+    """
+    fn()
+    started = tracemalloc.is_tracing()
+    if not started:
+        tracemalloc.start()
+    peak = retained = 0
+    try:
+        for _ in range(n):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            fn()
+            after, p = tracemalloc.get_traced_memory()
+            peak = max(peak, p - before)
+            retained += after - before
+    finally:
+        if not started:
+            tracemalloc.stop()
+    return {"peak_bytes": float(peak), "retained_bytes": float(retained) / n}
+
+
+def print_compare(name: str, before: Dict[str, float], after: Dict[str, float]):
+    speedup = before["mean_us"] / after["mean_us"] if after["mean_us"] > 0 else float("inf")
+    print(f"{name}")
+    print(f"  before: mean {before['mean_us']:9.2f} µs  p95 {before['p95_us']:9.2f} µs")
+    print(f"  after : mean {after['mean_us']:9.2f} µs  p95 {after['p95_us']:9.2f} µs  (x{speedup:.1f})")
@@ -1,6 +1,70 @@
 import cv2
 import time
+import numpy as np
 from config import BIRD_IMG
+from asset_cache import get_asset
+
+
+class Sprite:
+    """
+    アルファ付き画像を合成用に前計算して持つ。
+    premul: BGR * alpha / 255、inv_alpha: 255 - alpha（どちらも uint16）
+    合成は整数の固定小数点演算だけで行い、作業バッファも最初に確保しておく。
+    """
+    def __init__(self, premul: np.ndarray, inv_alpha: np.ndarray):
+        self.premul = premul          # (h, w, 3) uint16
+        self.inv_alpha = inv_alpha    # (h, w, 1) uint16
+        h, w = premul.shape[:2]
+        self.shape = (h, w, 4)
+        self._buf = np.empty((h, w, 3), dtype=np.uint16)
+        self._tmp = np.empty((h, w, 3), dtype=np.uint16)
+
+    @classmethod
+    def from_bgra(cls, img: np.ndarray) -> "Sprite":
+        """BGRA（アルファ無しなら不透明扱い）から作る"""
+        if img.ndim == 2:
+            img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+        bgr = img[:, :, :3].astype(np.uint16)
+        if img.shape[2] == 4:
+            a = img[:, :, 3:4].astype(np.uint16)
+        else:
+            a = np.full(img.shape[:2] + (1,), 255, dtype=np.uint16)
+        premul = (bgr * a + 127) // 255
+        return cls(premul, 255 - a)
+
+    def blit(self, bg: np.ndarray, x: int, y: int) -> np.ndarray:
+        """bg の (x, y) に合成（画面外は切り取る）。bg をそのまま返す"""
+        fg_h, fg_w = self.shape[:2]
+        bg_h, bg_w = bg.shape[:2]
+        if x >= bg_w or y >= bg_h or x + fg_w <= 0 or y + fg_h <= 0:
+            return bg
+
+        x1, y1 = max(x, 0), max(y, 0)
+        x2, y2 = min(x + fg_w, bg_w), min(y + fg_h, bg_h)
+        fx1, fy1 = x1 - x, y1 - y
+        h, w = y2 - y1, x2 - x1
+
+        bg_roi = bg[y1:y2, x1:x2]
+        buf = self._buf[:h, :w]
+        tmp = self._tmp[:h, :w]
+        # out = premul + bg * (255 - a) / 255
+        np.multiply(bg_roi, self.inv_alpha[fy1:fy1 + h, fx1:fx1 + w], out=buf)
+        # v / 255 の丸め： (v + 128 + ((v + 128) >> 8)) >> 8
+        buf += 128
+        np.right_shift(buf, 8, out=tmp)
+        buf += tmp
+        buf >>= 8
+        buf += self.premul[fy1:fy1 + h, fx1:fx1 + w]
+        np.copyto(bg_roi, buf, casting="unsafe")
+        return bg
+
+
+def _load_bird_frames(paths, size):
+    frames = [cv2.imread(p, cv2.IMREAD_UNCHANGED) for p in paths]
+    if any(f is None for f in frames):
+        raise FileNotFoundError("画像が見つかりません")
+    return [Sprite.from_bgra(cv2.resize(f, size)) for f in frames]
+
 
 class BirdAnimator:
     def __init__(self, difficulty="NORMAL", size=(120, 120), switch_interval=0.5):
@@ -8,16 +72,9 @@ class BirdAnimator:
         size: (幅, 高さ)
         switch_interval: フレーム切り替えの間隔[秒]
         """
-        path1 = BIRD_IMG[difficulty][0]
-        path2 = BIRD_IMG[difficulty][1]
-        self.frames = [
-            cv2.imread(path1, cv2.IMREAD_UNCHANGED),
-            cv2.imread(path2, cv2.IMREAD_UNCHANGED)
-        ]
-        if any(f is None for f in self.frames):
-            raise FileNotFoundError("画像が見つかりません")
-        
-        self.frames = [cv2.resize(f, size) for f in self.frames]
+        # 読み込み・縮小・前計算はプロセス内で1度だけ（リスタートで再読み込みしない）
+        self.frames = get_asset(("bird", difficulty, tuple(size)),
+                                lambda: _load_bird_frames(BIRD_IMG[difficulty], size))
         self.switch_interval = switch_interval
         self.last_switch = time.time()
         self.index = 0
@@ -32,6 +89,9 @@ class BirdAnimator:
         return self.frames[self.index]
     
 def overlay_image_alpha(bg, fg, x, y):
+    if isinstance(fg, Sprite):
+        return fg.blit(bg, x, y)
+
     fg_h, fg_w = fg.shape[:2]
     bg_h, bg_w = bg.shape[:2]
 
@@ -0,0 +1,318 @@
+# calibrate_thresholds.py
+# 録画した動画のフォルダを FaceMesh + EAR/MAR（ゲームと同じ FaceInputDetector）に通し、
+# 閾値（EAR_CLOSE_THRESH / EAR_OPEN_THRESH / MAR_OPEN_THRESH）を決めるための材料を作る。
+#   - 動画を数千フレームずつの区間に分け、区間ごとにワーカープロセスがその範囲だけデコード・推論する
+#     （長い動画1本でもコア数ぶん並列になる）
+#   - 出力（--out）:
+#       series/<入力からの相対パス>.npz  フレームごとの列 frame, t, ear, mar, face（区切りは "__"）
+#       histograms.npz / histograms.png  顔が写っているフレームの EAR/MAR のヒストグラム
+#       thresholds.json      今の値と、ヒストグラムから求めた候補（大津の方法＋ノイズ幅のヒステリシス）
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from config import EAR_CLOSE_THRESH, EAR_OPEN_THRESH, MAR_OPEN_THRESH
+
+VIDEO_EXTS = (".mp4", ".avi", ".mov", ".mkv", ".webm")
+HIST_BINS = np.linspace(0.0, 1.0, 201)   # 0.005 刻み。範囲外の値は端のビンに寄せる（clip_to_bins）
+
+
+# --- ワーカー ---
+
+def _init_worker():
+    # プロセスごとに1コアを使う（OpenCV のスレッドとプロセス並列を重ねない）
+    cv2.setNumThreads(1)
+
+
+def analyze_chunk(path: str, start: int, stop: Optional[int]) -> Tuple[str, int, Dict[str, np.ndarray]]:
+    """
+    path の [start, stop) フレーム（stop=None なら最後まで）を推論し、列を返す。
+    FaceMesh の追跡・ROI は区間ごとに初めからやり直す
+    """
+    from detector_facemesh import FaceInputDetector
+
+    cap = cv2.VideoCapture(path)
+    if start > 0 and not cap.set(cv2.CAP_PROP_POS_FRAMES, start):
+        # シークできない形式は頭から読み飛ばす
+        for _ in range(start):
+            if not cap.grab():
+                break
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    detector = FaceInputDetector(draw_mesh=False, adaptive=False)
+    frames, ear_l, mar_l, face_l = [], [], [], []
+    i = start
+    try:
+        while stop is None or i < stop:
+            ok, img = cap.read()
+            if not ok:
+                break
+            _, _, mar, ear = detector.infer(detector.prepare(img))
+            frames.append(i)
+            ear_l.append(ear)
+            mar_l.append(mar)
+            face_l.append(ear > 0.0)
+            i += 1
+    finally:
+        detector.close()
+        cap.release()
+    frame = np.asarray(frames, dtype=np.int32)
+    return path, start, {
+        "frame": frame,
+        "t": frame / fps,
+        "ear": np.asarray(ear_l, dtype=np.float32),
+        "mar": np.asarray(mar_l, dtype=np.float32),
+        "face": np.asarray(face_l, dtype=bool),
+    }
+
+
+def _frame_count(path: str) -> int:
+    cap = cv2.VideoCapture(path)
+    n = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) if cap.isOpened() else 0
+    cap.release()
+    return max(n, 0)
+
+
+def plan_chunks(paths: List[str], chunk: int) -> List[Tuple[str, int, Optional[int]]]:
+    """動画ごとに chunk フレームずつの区間に分ける（最後の区間は終わりまで読む）"""
+    jobs = []
+    for path in paths:
+        n = _frame_count(path)
+        k = max(1, math.ceil(n / chunk))
+        for c in range(k):
+            jobs.append((path, c * chunk, (c + 1) * chunk if c + 1 < k else None))
+    return jobs
+
+
+def analyze_videos(paths: List[str], chunk: int = 3000, workers: Optional[int] = None,
+                   progress: bool = True) -> Dict[str, Dict[str, np.ndarray]]:
+    """全動画をプロセスプールで解析し、{動画のパス: 列} を返す（区間はフレーム順につなぐ）"""
+    jobs = plan_chunks(paths, chunk)
+    parts: Dict[str, List[Tuple[int, Dict[str, np.ndarray]]]] = {p: [] for p in paths}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as ex:
+        futures = [ex.submit(analyze_chunk, *job) for job in jobs]
+        for k, fut in enumerate(as_completed(futures), 1):
+            path, start, cols = fut.result()
+            parts[path].append((start, cols))
+            if progress:
+                print(f"  [{k}/{len(jobs)}] {os.path.basename(path)} from frame {start}: "
+                      f"{len(cols['frame'])} frames", flush=True)
+    out = {}
+    for path, chunks in parts.items():
+        chunks.sort(key=lambda c: c[0])
+        out[path] = {name: np.concatenate([c[name] for _, c in chunks]) for name in chunks[0][1]}
+    return out
+
+
+# --- 閾値の候補 ---
+
+def clip_to_bins(values: np.ndarray, bins: np.ndarray = HIST_BINS) -> Tuple[np.ndarray, int]:
+    """ビンの範囲に収める（np.histogram は範囲外を黙って捨てるので）。戻り値は (収めた値, 範囲外だった数)"""
+    lo, hi = bins[0], bins[-1]
+    return np.clip(values, lo, hi), int(((values < lo) | (values > hi)).sum())
+
+
+def otsu_threshold(values: np.ndarray, bins: np.ndarray = HIST_BINS) -> float:
+    """ヒストグラムを2つに分けたときのクラス間分散が最大になる境目（大津の方法）"""
+    counts, edges = np.histogram(clip_to_bins(values, bins)[0], bins=bins)
+    p = counts / max(1, counts.sum())
+    centers = (edges[:-1] + edges[1:]) / 2.0
+    omega = np.cumsum(p)
+    mu = np.cumsum(p * centers)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sigma_b = (mu[-1] * omega - mu) ** 2 / (omega * (1.0 - omega))
+    sigma_b = np.nan_to_num(sigma_b, nan=0.0, posinf=0.0)
+    return float(edges[int(sigma_b.argmax()) + 1])
+
+
+def frame_noise(series: List[Dict[str, np.ndarray]], key: str, above: float) -> float:
+    """連続する2フレームの差から見た1フレームのノイズの標準偏差（above より大きい区間だけ、MAD で頑健に）"""
+    diffs = []
+    for s in series:
+        v, ok = s[key], s["face"] & (s[key] > above)
+        both = ok[1:] & ok[:-1]
+        diffs.append(np.diff(v)[both])
+    d = np.concatenate(diffs) if diffs else np.zeros(0)
+    if d.size < 2:
+        return 0.0
+    return float(1.4826 * np.median(np.abs(d - np.median(d))) / math.sqrt(2.0))
+
+
+def count_onsets(series: List[Dict[str, np.ndarray]], key: str, on_below: Optional[float] = None,
+                 off_above: Optional[float] = None, on_above: Optional[float] = None) -> Tuple[int, float]:
+    """
+    閾値（とヒステリシス）で判定したときの立ち上がりの数と、顔が写っていた時間 [分]。
+    目: on_below / off_above（閉じる・開く）、口: on_above
+    """
+    n, minutes = 0, 0.0
+    for s in series:
+        state = False
+        fps = 1.0 / np.median(np.diff(s["t"])) if len(s["t"]) > 1 else 30.0
+        minutes += s["face"].sum() / fps / 60.0
+        for v, face in zip(s[key].tolist(), s["face"].tolist()):
+            if not face:
+                continue
+            if on_above is not None:
+                now = v > on_above
+            elif not state:
+                now = v < on_below
+            else:
+                now = not v > off_above
+            n += now and not state
+            state = now
+    return n, minutes
+
+
+def suggest(series: List[Dict[str, np.ndarray]]) -> Dict[str, float]:
+    """
+    EAR: 大津の境目を「閉」、そこからノイズの3σ（0.02〜0.10）上を「開」にする。
+    MAR: 大津の境目を「開」にする。
+    山が2つ（閉じた目・開けた口のフレームが十分ある）ときだけ意味がある。ヒストグラムの画像で確かめる
+    """
+    ear = np.concatenate([s["ear"][s["face"]] for s in series])
+    mar = np.concatenate([s["mar"][s["face"]] for s in series])
+    ear_close = otsu_threshold(ear)
+    hyst = min(0.10, max(0.02, 3.0 * frame_noise(series, "ear", ear_close)))
+    return {"EAR_CLOSE_THRESH": round(ear_close, 3),
+            "EAR_OPEN_THRESH": round(ear_close + hyst, 3),
+            "MAR_OPEN_THRESH": round(otsu_threshold(mar), 3)}
+
+
+def _rates(series, th: Dict[str, float]) -> Dict[str, float]:
+    blinks, minutes = count_onsets(series, "ear", on_below=th["EAR_CLOSE_THRESH"],
+                                   off_above=th["EAR_OPEN_THRESH"])
+    mouths, _ = count_onsets(series, "mar", on_above=th["MAR_OPEN_THRESH"])
+    minutes = max(minutes, 1e-9)
+    return {"blinks_per_min": blinks / minutes, "mouth_opens_per_min": mouths / minutes}
+
+
+# --- 出力 ---
+
+def draw_histogram(values: np.ndarray, lines: List[Tuple[float, Tuple[int, int, int]]], title: str,
+                   size=(800, 260)) -> np.ndarray:
+    """ヒストグラムの画像（lines: [(値, 色)] に縦線を引く）"""
+    w, h = size
+    img = np.full((h, w, 3), 255, dtype=np.uint8)
+    counts, edges = np.histogram(clip_to_bins(values)[0], bins=HIST_BINS)
+    top, bottom, left, right = 30, h - 24, 10, w - 10
+    scale = (bottom - top) / max(1, counts.max())
+    bw = (right - left) / len(counts)
+    for i, c in enumerate(counts):
+        x0 = int(left + i * bw)
+        cv2.rectangle(img, (x0, int(bottom - c * scale)), (int(x0 + bw) - 1, bottom), (150, 120, 60), -1)
+    for v, color in lines:
+        x = int(left + v * (right - left))
+        cv2.line(img, (x, top), (x, bottom), color, 2)
+    for v in np.arange(0.0, 1.01, 0.1):
+        x = int(left + v * (right - left))
+        cv2.putText(img, f"{v:.1f}", (x - 10, h - 6), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 0, 0), 1, cv2.LINE_AA)
+    cv2.putText(img, title, (left, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (0, 0, 0), 1, cv2.LINE_AA)
+    return img
+
+
+def series_names(paths: List[str]) -> Dict[str, str]:
+    """
+    動画ごとの series/*.npz の名前。全動画に共通の親ディレクトリからの相対パス（拡張子込み）の区切りを "__" にする。
+    別のフォルダにある同じ名前の動画や、拡張子だけ違う動画が上書きし合わない
+    """
+    absp = [os.path.abspath(p) for p in paths]
+    root = os.path.commonpath([os.path.dirname(p) for p in absp])
+    return {p: os.path.relpath(a, root).replace(os.sep, "__") for p, a in zip(paths, absp)}
+
+
+def write_outputs(out_dir: str, results: Dict[str, Dict[str, np.ndarray]]) -> Dict[str, object]:
+    os.makedirs(os.path.join(out_dir, "series"), exist_ok=True)
+    names = series_names(list(results))
+    for path, cols in results.items():
+        np.savez_compressed(os.path.join(out_dir, "series", names[path] + ".npz"), video=path, **cols)
+
+    series = [s for s in results.values() if s["face"].any()]
+    if not series:
+        raise SystemExit("no face found in any video")
+    ear = np.concatenate([s["ear"][s["face"]] for s in series])
+    mar = np.concatenate([s["mar"][s["face"]] for s in series])
+    ear_in, ear_clipped = clip_to_bins(ear)
+    mar_in, mar_clipped = clip_to_bins(mar)
+    np.savez_compressed(os.path.join(out_dir, "histograms.npz"), edges=HIST_BINS,
+                        ear=np.histogram(ear_in, bins=HIST_BINS)[0], mar=np.histogram(mar_in, bins=HIST_BINS)[0])
+
+    current = {"EAR_CLOSE_THRESH": EAR_CLOSE_THRESH, "EAR_OPEN_THRESH": EAR_OPEN_THRESH,
+               "MAR_OPEN_THRESH": MAR_OPEN_THRESH}
+    suggested = suggest(series)
+    gray, green, red = (128, 128, 128), (40, 170, 40), (40, 40, 220)
+    img = np.vstack([
+        draw_histogram(ear, [(current["EAR_CLOSE_THRESH"], gray), (current["EAR_OPEN_THRESH"], gray),
+                             (suggested["EAR_CLOSE_THRESH"], green), (suggested["EAR_OPEN_THRESH"], red)],
+                       "EAR (gray: current, green: suggested close, red: suggested open)"),
+        draw_histogram(mar, [(current["MAR_OPEN_THRESH"], gray), (suggested["MAR_OPEN_THRESH"], green)],
+                       "MAR (gray: current, green: suggested open)"),
+    ])
+    cv2.imwrite(os.path.join(out_dir, "histograms.png"), img)
+
+    report = {
+        "videos": len(results),
+        "frames": int(sum(len(s["frame"]) for s in results.values())),
+        "face_frames": int(ear.size),
+        # HIST_BINS の範囲外で端のビンに寄せた数（ヒストグラム・大津の方法に効く。百分位は元の値）
+        "ear_clipped": ear_clipped,
+        "mar_clipped": mar_clipped,
+        "ear_percentiles": {str(q): float(np.percentile(ear, q)) for q in (1, 5, 25, 50, 75, 95, 99)},
+        "mar_percentiles": {str(q): float(np.percentile(mar, q)) for q in (1, 5, 25, 50, 75, 95, 99)},
+        "current": {**current, **_rates(series, current)},
+        "suggested": {**suggested, **_rates(series, suggested)},
+    }
+    with open(os.path.join(out_dir, "thresholds.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def find_videos(inputs: List[str]) -> List[str]:
+    paths = []
+    for p in inputs:
+        if os.path.isdir(p):
+            paths += [os.path.join(p, f) for f in sorted(os.listdir(p)) if f.lower().endswith(VIDEO_EXTS)]
+        else:
+            paths.append(p)
+    return paths
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Analyze recorded videos to calibrate EAR/MAR thresholds")
+    ap.add_argument("inputs", nargs="+", help="video files or directories of videos")
+    ap.add_argument("--out", default="data/calibration")
+    ap.add_argument("--chunk", type=int, default=3000, help="frames per worker task")
+    ap.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    args = ap.parse_args()
+
+    paths = find_videos(args.inputs)
+    if not paths:
+        raise SystemExit("no videos found")
+    t0 = time.perf_counter()
+    results = analyze_videos(paths, chunk=args.chunk, workers=args.workers)
+    elapsed = time.perf_counter() - t0
+    report = write_outputs(args.out, results)
+
+    n = report["frames"]
+    workers = args.workers or os.cpu_count() or 1
+    print(f"{len(paths)} videos, {n} frames ({report['face_frames']} with a face) in {elapsed:.1f}s: "
+          f"{n / elapsed:.0f} frames/s, {n / elapsed / workers:.0f} frames/s per worker")
+    if report["ear_clipped"] or report["mar_clipped"]:
+        lo, hi = HIST_BINS[0], HIST_BINS[-1]
+        print(f"outside the histogram range [{lo:.1f}, {hi:.1f}] (counted in the edge bins): "
+              f"EAR {report['ear_clipped']}, MAR {report['mar_clipped']}")
+    for name in ("current", "suggested"):
+        r = report[name]
+        print(f"{name:9s}  EAR close {r['EAR_CLOSE_THRESH']:.3f} open {r['EAR_OPEN_THRESH']:.3f}  "
+              f"MAR open {r['MAR_OPEN_THRESH']:.3f}  -> {r['blinks_per_min']:.1f} blinks/min, "
+              f"{r['mouth_opens_per_min']:.1f} mouth opens/min")
+    print(f"written to {args.out}/ (series/*.npz, histograms.png, thresholds.json)")
+
+
+if __name__ == "__main__":
+    main()
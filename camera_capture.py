@@ -0,0 +1,153 @@
+# camera_capture.py
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+
+@dataclass
+class CapturedFrame:
+    image: np.ndarray
+    t_capture: float   # 取得時刻 [time.time()]
+    seq: int           # 取得順の通し番号（0始まり）
+    dropped: int       # 前回の読み出し以降に上書きされて捨てられた枚数
+
+
+class LatestFrameCapture:
+    """
+    cv2.VideoCapture を別スレッドで読み続け、最新1枚だけを保持する（latest frame wins）。
+    読み手が遅れた分は上書きされ、dropped として数える。
+
+    source: カメラ番号 または 動画ファイルのパス
+    width/height: カメラに要求する取得サイズ（None なら設定しない）
+    fourcc: カメラに要求する画素形式（例 "MJPG"。None なら設定しない）
+    pace: ファイル入力のとき、動画のFPSに合わせて読み出す（カメラ相当の挙動）
+    lossless: True なら読み手が取り出すまで次を読まない（ファイルでのテスト用）
+    """
+    def __init__(self, source: Union[int, str] = 0, width: Optional[int] = None,
+                 height: Optional[int] = None, pace: bool = True, lossless: bool = False,
+                 fourcc: Optional[str] = None):
+        self.source = source
+        self.is_file = isinstance(source, str)
+        self.pace = pace and self.is_file
+        self.lossless = lossless
+
+        self._cap = cv2.VideoCapture(source)
+        if fourcc is not None and not self.is_file:
+            self._cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        if width is not None:
+            self._cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        if height is not None:
+            self._cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+
+        fps = self._cap.get(cv2.CAP_PROP_FPS) if self.is_file else 0.0
+        self.frame_interval = 1.0 / fps if fps and fps > 0 else 1.0 / 30.0
+
+        self._cond = threading.Condition()
+        self._latest: Optional[CapturedFrame] = None
+        self._last_read_seq = -1
+        self._eof = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # 統計
+        self.frames_captured = 0
+        self.frames_delivered = 0
+        self.frames_dropped = 0
+
+    @property
+    def frame_size(self) -> Tuple[int, int]:
+        """実際に決まった取得サイズ (w, h)（要求どおりとは限らない）"""
+        return (int(self._cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self._cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+
+    def isOpened(self) -> bool:
+        return self._cap.isOpened()
+
+    def start(self) -> "LatestFrameCapture":
+        if self._thread is None and self.isOpened():
+            self._thread = threading.Thread(target=self._run, name="camera-capture", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        next_t = time.time()
+        while not self._stop.is_set():
+            if self.lossless:
+                with self._cond:
+                    while (self._latest is not None and self._latest.seq > self._last_read_seq
+                           and not self._stop.is_set()):
+                        self._cond.wait(0.1)
+            if self.pace:
+                delay = next_t - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                next_t = max(next_t + self.frame_interval, time.time() - self.frame_interval)
+
+            ok, img = self._cap.read()
+            t = time.time()
+            with self._cond:
+                if not ok:
+                    self._eof = True
+                    self._cond.notify_all()
+                    return
+                seq = self.frames_captured
+                self.frames_captured += 1
+                self._latest = CapturedFrame(image=img, t_capture=t, seq=seq, dropped=0)
+                self._cond.notify_all()
+
+    def read_frame(self, timeout: Optional[float] = 1.0) -> Optional[CapturedFrame]:
+        """
+        前回より新しいフレームが来るまで待って返す。EOF/停止/タイムアウトなら None。
+        """
+        self.start()
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while self._latest is None or self._latest.seq <= self._last_read_seq:
+                if self._eof or self._stop.is_set():
+                    return None
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            f = self._latest
+            dropped = f.seq - self._last_read_seq - 1
+            self._last_read_seq = f.seq
+            self.frames_delivered += 1
+            self.frames_dropped += dropped
+            self._cond.notify_all()
+        return CapturedFrame(image=f.image, t_capture=f.t_capture, seq=f.seq, dropped=dropped)
+
+    @property
+    def alive(self) -> bool:
+        """読み取りスレッドがまだフレームを出せる（EOF・切断・停止していない）"""
+        return not (self._eof or self._stop.is_set())
+
+    def latest(self) -> Optional[CapturedFrame]:
+        """
+        待たずに最新フレームを返す（既読でもよい）。まだ1枚も無ければ None。
+        EOF・切断・停止の後も None（read_frame と同じく、読み手はループを抜ける）
+        """
+        self.start()
+        with self._cond:
+            if not self.alive:
+                return None
+            return self._latest
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """cv2.VideoCapture.read() 互換"""
+        f = self.read_frame(timeout=5.0)
+        if f is None:
+            return False, None
+        return True, f.image
+
+    def release(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self._cap.release()
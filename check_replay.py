@@ -0,0 +1,84 @@
+# check_replay.py
+# 記録 → 再生で同じ進行になるかをカメラ無しで確かめる。
+# main() と同じ順序（step かゲームオーバーメニューのリセット → 描画 → 'r' キーのリセット）・同じ時刻の扱い
+# （dt = now - last_t、リセットしたら last_t を数え直す）で合成した入力を流して
+# SessionRecorder に記録し、replay(headless=True) の最後の状態と比べる
+import os
+import tempfile
+
+import numpy as np
+
+from game_state import GameState, StepInput, StepRunner
+from mouthy_bird_game import replay
+from session_replay import SessionRecorder, RESET_NONE, RESET_MENU, RESET_KEY
+
+
+def record_live(path: str, seed: int, frames: int, key_frames=(), menu_restarts: int = 0,
+                key_on_restart: bool = False, menu_s: float = 5.0, fps: float = 30.0):
+    """
+    口を開けない（床でパイプに当たり続ける）入力で遊んだことにして記録する。
+    key_frames: 'r' を押すフレーム。menu_restarts: ゲームオーバーで RESTART を選ぶ回数（その後は QUIT）。
+    key_on_restart: RESTART を選んだのと同じフレームで 'r' も押す。menu_s: メニューにいた時間 [s]
+    """
+    rng = np.random.default_rng(seed)
+    state = GameState(seed=seed)
+    runner = StepRunner(state)
+    rec = SessionRecorder(path, seed=seed, difficulty=state.difficulty, t0=0.0, step_hz=runner.hz)
+    clock = last_t = 0.0
+    restarts = 0
+    for i in range(frames):
+        clock += (1.0 / fps) * (1.0 + 0.3 * rng.uniform(-1.0, 1.0))
+        now = clock
+        dt = now - last_t
+        last_t = now
+        inp = StepInput(mouth_open=False, eyes_closed=False)
+        reset = RESET_NONE
+        key = i in key_frames
+        if not state.game_over:
+            runner.advance([inp], dt)
+        elif restarts < menu_restarts:
+            restarts += 1
+            clock += menu_s   # show_game_over_menu で待っている間
+            state.reset()
+            runner.reset()
+            last_t = clock
+            reset = RESET_MENU
+            key = key or key_on_restart
+        else:
+            break   # QUIT
+        if key:
+            clock += 0.002    # 描画・waitKey の分
+            state.reset()
+            runner.reset()
+            last_t = clock
+            reset |= RESET_KEY
+        rec.add(now, 0.0, 0.3, inp.mouth_open, inp.eyes_closed, reset, t_resume=last_t if reset else None)
+    rec.close()
+    return {"score": state.score, "lives": state.lives, "t": state.t, "frames": len(rec)}
+
+
+CASES = {
+    "no reset": dict(),
+    "'r' key mid-run": dict(key_frames=(120,)),
+    "menu restart": dict(menu_restarts=1),
+    "menu restart and 'r' in the same frame": dict(menu_restarts=1, key_on_restart=True),
+}
+
+
+def main():
+    ok = True
+    with tempfile.TemporaryDirectory() as d:
+        for k, (name, kw) in enumerate(CASES.items()):
+            path = os.path.join(d, f"case{k}")
+            live = record_live(path, seed=k, frames=3000, **kw)
+            rep = replay(path, headless=True)
+            same = (rep["frames"] == live["frames"] and rep["score"] == live["score"]
+                    and rep["lives"] == live["lives"] and rep["t"] == live["t"])
+            ok &= same
+            print(f"{'OK  ' if same else 'FAIL'} {name}: live {live}, replay frames {rep['frames']} "
+                  f"score {rep['score']} lives {rep['lives']} t {rep['t']:.3f}")
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
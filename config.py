@@ -4,7 +4,37 @@ WIN_W, WIN_H = 960, 540
 # 物理
 GRAVITY = 500.0     # 下向き加速度 [px/s^2]
 THRUST  = 600.0     # 口開き中の上向き加速度 [px/s^2]
-DT_CLAMP = 1/30.0
+DT_CLAMP = 1/30.0   # フレームの dt で進めるとき（FIXED_STEP_HZ = 0）の上限
+FIXED_STEP_HZ = 120 # 物理・パイプ・ライフゲージをこの刻みで進める（描画は刻みの間を補間する）
+FIXED_MAX_STEPS = 12  # 1フレームで進める刻みの上限（これより遅れたら捨てる＝そこまで遅いときだけゆっくりになる）
+
+# 推論/描画
+ASYNC_INFERENCE = True   # FaceMeshを別スレッドで回し、描画はRENDER_FPSで進める
+RENDER_FPS = 60
+INFER_PROCESS = False     # ASYNC_INFERENCE 時、FaceMeshを別プロセスで回す（フレームは共有メモリのリングで渡す）
+SHM_RING_SLOTS = 4        # 共有メモリのフレーム枠数（推論中の枠が上書きされるまでの猶予）
+CAPTURE_FOURCC = "MJPG"  # カメラに要求する形式。取得サイズは WIN_W x WIN_H を要求する
+INFER_W, INFER_H = 480, 270  # FaceMeshに渡す最大サイズ（表示サイズ WIN_W/WIN_H とは別）
+ROI_TRACKING = True   # 前回の顔の周りだけを切り出して推論する
+ROI_PAD = 0.4         # 切り出し枠の余白（顔の大きさに対する割合、片側）
+ROI_MIN_SIZE = 48     # これより小さい枠は追跡をやめて全体から探し直す [px]
+
+# 推論の間引き（同期推論のとき）
+INFER_ADAPTIVE = True
+INFER_TARGET_FPS = 30        # 目標フレームレート
+INFER_BUDGET = 0.5           # 1フレーム時間のうち推論に使ってよい割合
+INFER_MAX_STRIDE = 4         # 最大で何フレームに1回まで間引くか
+INFER_THRESH_MARGIN = 0.03   # 外挿したEAR/MARが閾値にこれより近ければ間引かない
+INFER_EXTRAP_HORIZON = 0.15  # 外挿する最大の時間 [s]
+PERF_RING_SIZE = 600          # フレーム計測を残す数（リングバッファ）
+PERF_EXPORT_DIR = "data/perf"
+PERF_EXPORT_INTERVAL = 10.0   # 計測の書き出し間隔 [s]
+
+# イベント配信（detect_blink_mouth.py --serve / event_server.py）
+EVENT_SOCKET = "/tmp/mouthy_bird_events.sock"  # Unix ドメインソケット
+EVENT_PORT = 47800            # AF_UNIX が無い環境・--serve-port で使う 127.0.0.1 の TCP
+EVENT_QUEUE_MAX = 256         # クライアントごとの送信待ちの上限（溢れたら切る）
+
 RADIUS  = 25
 PLAYER_X = int(WIN_W * 0.25)
 
@@ -22,12 +52,25 @@ HIT_KNOCKBACK_VY = -600
 # === Eyes / Life gauge ===
 EAR_CLOSE_THRESH = 0.38   # これ未満で「閉」
 EAR_OPEN_THRESH  = 0.43  # これ超で「開」  ※ヒステリシス
+MAR_OPEN_THRESH  = 0.26  # これ超で口「開」
+
+# === 入力の予測（カメラ取得→表示の遅れを先読みで補う） ===
+INPUT_PREDICT = True
+PREDICT_MIN_CUTOFF = 3.0    # 1€フィルタ：静止時のカットオフ [Hz]（小さいほど滑らか・遅い）
+PREDICT_BETA       = 1.0    # 1€フィルタ：変化が速いほどカットオフを上げる係数
+PREDICT_D_CUTOFF   = 4.0    # 変化率（予測に使う傾き）のカットオフ [Hz]
+PREDICT_MAX_LEAD   = 0.12   # 先読みする最大の時間 [s]
 
 LIFE_MAX          = 5           # ライフの上限
 LIFE_GAUGE_RATE   = 0.35      # 目を閉じている間のゲージ充填速度 [ゲージ/秒]
 LIFE_GAUGE_UNIT   = 1.0         # 満タン量（1.0で1回回復）
 LIFE_GAUGE_COOLDOWN = 0.0       # 回復後のクールタイム(秒)。不要なら0
 
+ASSET_CACHE_MAX_BYTES = 64 * 1024 * 1024   # 読み込んだ画像を保持する上限
+
+# 複数人プレイのプレイヤーごとの表示色（BGR）
+PLAYER_COLORS = [(80, 220, 255), (255, 160, 60), (120, 255, 120), (220, 120, 255)]
+
 BIRD_IMG = {
     "EASY": ["assets/bird1.png", "assets/bird2.png"],
     "NORMAL": ["assets/bird3.png", "assets/bird4.png"],
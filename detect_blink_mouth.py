@@ -1,9 +1,12 @@
+import argparse
 import cv2
-import numpy as np
-import time
 from dataclasses import dataclass
-from typing import List, Tuple, Optional
+from typing import Optional
 import mediapipe as mp
+from camera_capture import LatestFrameCapture
+from face_features import gather_points, ear_mar
+from config import EVENT_SOCKET
+from event_server import EventServer
 
 WIN_W, WIN_H = 960, 540
 
@@ -25,36 +28,11 @@ class BlinkState:
 class MouthState:
     is_open: bool = False
 
-def open_camera() -> cv2.VideoCapture:
-    cap = cv2.VideoCapture(0)
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, WIN_W)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, WIN_H)
+def open_camera(source=0) -> LatestFrameCapture:
+    cap = LatestFrameCapture(source, width=WIN_W, height=WIN_H)
     if not cap.isOpened():
         raise RuntimeError("Camera open failed")
-    return cap
-
-R_EYE = [33, 160, 158, 133, 153, 144]
-L_EYE = [263, 387, 385, 362, 380, 373]
-MOUTH = [78, 13, 82, 14, 312, 308]
-
-def dist(a: np.ndarray, b: np.ndarray) -> float:
-    return float(np.linalg.norm(a - b))
-
-def ear_from_landmarks(pts: np.ndarray, idxs: list) -> float:
-    left, up1, up2, right, low1, low2 = [pts[i] for i in idxs]
-    horiz = dist(left, right)
-    vert = (dist(up1, low1) + dist(up2, low2)) / 2.0
-    if horiz < 1e-6:
-        return 0.0
-    return vert / horiz
-
-def mar_from_landmarks(pts: np.ndarray, idxs: list) -> float:
-    left, up1, up2, low1, low2, right = [pts[i] for i in idxs]
-    horiz = dist(left, right)
-    vert = (dist(up1, low1) + dist(up2, low2)) / 2.0
-    if horiz < 1e-6:
-        return 0.0
-    return vert / horiz
+    return cap.start()
 
 def update_blink_state_from_ear(ear: float, blink: BlinkState) -> bool:
     event = False
@@ -90,7 +68,7 @@ def draw_overlays(frame, ear, mar, face_landmarks=None, mesh=None):
 def process_frame_facemesh(frame, mesh, blink: BlinkState, mouth: MouthState):
     """
     1フレーム：FaceMesh推論→EAR/MAR計算→イベント判定→可視化
-    戻り値：(vis_frame, blink_event, mouth_event)
+    戻り値：(vis_frame, blink_event, mouth_event, ear, mar)
     """
     frame = cv2.resize(frame, (WIN_W, WIN_H))
     frame = cv2.flip(frame, 1)
@@ -108,16 +86,9 @@ def process_frame_facemesh(frame, mesh, blink: BlinkState, mouth: MouthState):
         face = res.multi_face_landmarks[0]
         face_lms_draw = face  # 可視化用
 
-        # (x,y) pixel座標配列を作る
-        pts = np.array([(lm.x * w, lm.y * h) for lm in face.landmark], dtype=np.float32)
-
-        # EAR（両目の平均）
-        ear_r = ear_from_landmarks(pts, R_EYE)
-        ear_l = ear_from_landmarks(pts, L_EYE)
-        ear = (ear_r + ear_l) / 2.0
-
-        # MAR（口）
-        mar = mar_from_landmarks(pts, MOUTH)
+        # 目・口の18点だけ (x,y) pixel座標で取り出し、EAR（両目の平均）/MAR をまとめて計算
+        pts = gather_points(face.landmark, w, h)
+        ear, mar = ear_mar(pts)
 
         # イベント更新
         blink_event = update_blink_state_from_ear(ear, blink)
@@ -125,41 +96,62 @@ def process_frame_facemesh(frame, mesh, blink: BlinkState, mouth: MouthState):
 
     draw_overlays(frame, ear, mar, face_lms_draw, mp_mesh)
 
-    return frame, blink_event, mouth_event
+    return frame, blink_event, mouth_event, ear, mar
 
-def main():
+def main(serve: Optional[str] = None, serve_port: Optional[int] = None):
+    """serve / serve_port: 標準出力に加えて、イベントをソケットで配る（event_server.py）"""
     cap = open_camera()
     blink = BlinkState()
     mouth = MouthState()
-
-    # FaceMesh 初期化
-    with mp_mesh.FaceMesh(
-        max_num_faces=1,
-        refine_landmarks=True,           # 目・口まわりが精密
-        min_detection_confidence=0.5,
-        min_tracking_confidence=0.5
-    ) as mesh:
-
-        while True:
-            ok, frame = cap.read()
-            if not ok:
-                break
-
-            vis, blink_event, mouth_event = process_frame_facemesh(frame, mesh, blink, mouth)
-
-            # 標準出力イベント
-            if blink_event:
-                print(1, flush=True)   # 瞬き
-            if mouth_event:
-                print(2, flush=True)   # 口を開けた瞬間
-
-            cv2.imshow("FaceMesh Blink & Mouth Detector", vis)
-            key = cv2.waitKey(1) & 0xFF
-            if key in [27, ord('q')]:
-                break
-
-    cap.release()
-    cv2.destroyAllWindows()
+    server = None
+    try:
+        if serve is not None or serve_port is not None:
+            server = EventServer(path=None if serve_port is not None else serve,
+                                 port=serve_port or 0).start()
+            print(f"serving events on {server.address}", flush=True)
+
+        # FaceMesh 初期化
+        with mp_mesh.FaceMesh(
+            max_num_faces=1,
+            refine_landmarks=True,           # 目・口まわりが精密
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        ) as mesh:
+
+            while True:
+                captured = cap.read_frame(timeout=5.0)
+                if captured is None:
+                    break
+
+                vis, blink_event, mouth_event, ear, mar = process_frame_facemesh(captured.image, mesh, blink, mouth)
+
+                # 標準出力イベント
+                if blink_event:
+                    print(1, flush=True)   # 瞬き
+                if mouth_event:
+                    print(2, flush=True)   # 口を開けた瞬間
+                # ソケットのイベント（取得時刻・EAR/MAR・通し番号つき）
+                if server is not None:
+                    if blink_event:
+                        server.publish("blink", captured.t_capture, ear, mar, captured.seq)
+                    if mouth_event:
+                        server.publish("mouth", captured.t_capture, ear, mar, captured.seq)
+
+                cv2.imshow("FaceMesh Blink & Mouth Detector", vis)
+                key = cv2.waitKey(1) & 0xFF
+                if key in [27, ord('q')]:
+                    break
+    finally:
+        if server is not None:
+            server.close()
+        cap.release()
+        cv2.destroyAllWindows()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    ap = argparse.ArgumentParser(description="FaceMesh blink & mouth detector (prints 1 = blink, 2 = mouth open)")
+    ap.add_argument("--serve", nargs="?", const=EVENT_SOCKET, metavar="PATH",
+                    help=f"also broadcast events on a Unix socket (default {EVENT_SOCKET})")
+    ap.add_argument("--serve-port", type=int, metavar="PORT",
+                    help="broadcast over TCP on 127.0.0.1:PORT instead of a Unix socket")
+    args = ap.parse_args()
+    main(serve=args.serve, serve_port=args.serve_port)
\ No newline at end of file
@@ -1,19 +1,18 @@
 # detector_facemesh.py
-import cv2, numpy as np, mediapipe as mp
+import cv2, time, numpy as np, mediapipe as mp
 from dataclasses import dataclass
-from typing import Tuple
-from config import WIN_W, WIN_H, EAR_CLOSE_THRESH, EAR_OPEN_THRESH
-
-MAR_OPEN_THRESH = 0.26
+from typing import Optional, Tuple
+from config import (EAR_CLOSE_THRESH, EAR_OPEN_THRESH, MAR_OPEN_THRESH,
+                    INFER_W, INFER_H, ROI_TRACKING, ROI_PAD, ROI_MIN_SIZE, INFER_ADAPTIVE)
+from frame_prep import FramePreprocessor
+from hud import HudCompositor, draw_debug
+from face_features import gather_points, face_box, ear_mar
+from inference_scheduler import InferenceScheduler
 
 mp_mesh  = mp.solutions.face_mesh
 mp_draw  = mp.solutions.drawing_utils
 mp_style = mp.solutions.drawing_styles
 
-R_EYE = [33, 160, 158, 133, 153, 144]
-L_EYE = [263, 387, 385, 362, 380, 373]
-MOUTH = [78, 13, 82, 14, 312, 308]
-
 @dataclass
 class MouthState:
     is_open: bool = False
@@ -22,68 +21,139 @@ class MouthState:
 class EyeState:
     is_closed: bool = False
 
-def _dist(a, b): return float(np.linalg.norm(a - b))
-
-def _ear_from_landmarks(pts, idxs):
-    left, up1, up2, right, low1, low2= [pts[i] for i in idxs]
-    horiz = _dist(left, right)
-    vert  = (_dist(up1, low1) + _dist(up2, low2)) / 2.0
-    return 0.0 if horiz < 1e-6 else vert / horiz
-
-def _mar_from_landmarks(pts, idxs):
-    left, up1, up2, low1, low2, right = [pts[i] for i in idxs]
-    horiz = _dist(left, right)
-    vert  = (_dist(up1, low1) + _dist(up2, low2)) / 2.0
-    return 0.0 if horiz < 1e-6 else vert / horiz
-
 class FaceInputDetector:
-    def __init__(self, draw_mesh: bool = False):
+    def __init__(self, draw_mesh: bool = False, infer_size: Tuple[int, int] = (INFER_W, INFER_H),
+                 roi_tracking: bool = ROI_TRACKING, adaptive: bool = INFER_ADAPTIVE):
+        """
+        infer_size: FaceMeshに渡す画像の最大サイズ（これより大きければ縮小）
+        roi_tracking: 前回検出した顔の周りだけ切り出して推論する。見失ったら全体に戻る
+        adaptive: 推論を数フレームおきに間引き、間のフレームはEAR/MARを外挿する
+        """
         self.mouth = MouthState()
         self.eyes = EyeState()
         self.draw_mesh = draw_mesh
+        self.infer_w, self.infer_h = infer_size
+        self.roi_tracking = roi_tracking
+        self.roi: Optional[Tuple[int, int, int, int]] = None   # (x0, y0, x1, y1) 表示座標
+        self.scheduler = InferenceScheduler(MAR_OPEN_THRESH) if adaptive else None
+        self.prep = FramePreprocessor()
+        self.hud = HudCompositor()   # デバッグ表示のタイル
         self.mesh = mp_mesh.FaceMesh(
             max_num_faces=1, refine_landmarks=True,
             min_detection_confidence=0.5, min_tracking_confidence=0.5
         )
 
-    def process(self, frame) -> Tuple[np.ndarray, bool, bool, float, float]:
-        frame = cv2.resize(frame, (WIN_W, WIN_H))
-        frame = cv2.flip(frame, 1)
+    def warm_up(self):
+        """最初の推論は遅いので、黒画像で1回通しておく（状態は変えない）"""
+        self.mesh.process(np.zeros((self.infer_h, self.infer_w, 3), dtype=np.uint8))
+
+    def prepare(self, frame) -> np.ndarray:
+        """カメラ画像を表示サイズにリサイズし、鏡像にする（戻り値のバッファは次の呼び出しで上書き）"""
+        return self.prep(frame)
+
+    def infer(self, frame) -> Tuple[bool, bool, float, float]:
+        """
+        prepare済みフレームでFaceMesh推論→(mouth_open, eyes_closed, mar, ear)
+        draw_mesh のときはメッシュを frame に描く
+        """
+        t = time.time()
+        if self.scheduler is not None and not self.scheduler.should_infer(t):
+            # 間引き：直近の推論結果から外挿（ヒステリシスはそのまま適用）
+            mar, ear = self.scheduler.extrapolate(t)
+            mouth_open = mar > MAR_OPEN_THRESH
+            eyes_closed = self.eyes.is_closed
+            self._update_eyes(ear)
+            self.scheduler.record_skip(mouth_open, self.eyes.is_closed)
+            self.mouth.is_open = mouth_open
+            return mouth_open, eyes_closed, mar, ear
+
         h, w = frame.shape[:2]
-        rgb  = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        res  = self.mesh.process(rgb)
+        face_lms = None
+        if self.roi_tracking and self.roi is not None:
+            region = self.roi
+            face_lms = self._infer_region(frame, region)
+        if face_lms is None:
+            # 追跡なし or 見失った → 全体から探す
+            region = (0, 0, w, h)
+            face_lms = self._infer_region(frame, region)
 
         mar, ear = 0.0, 0.0
         mouth_open = False
         eyes_closed = self.eyes.is_closed
-        face_lms = None
 
-        if res.multi_face_landmarks:
-            face_lms = res.multi_face_landmarks[0]
-            pts = np.array([(lm.x * w, lm.y * h) for lm in face_lms.landmark], dtype=np.float32)
-
-            mar = _mar_from_landmarks(pts, MOUTH)
+        x0, y0, x1, y1 = region
+        if face_lms is not None:
+            pts = gather_points(face_lms.landmark, x1 - x0, y1 - y0, x0, y0)
+            ear, mar = ear_mar(pts)
             mouth_open = mar > MAR_OPEN_THRESH
+            self._update_eyes(ear)
 
-            ear_r = _ear_from_landmarks(pts, R_EYE)
-            ear_l = _ear_from_landmarks(pts, L_EYE)
-            ear = (ear_r + ear_l) / 2.0
+        if self.scheduler is not None:
+            self.scheduler.record_inference(t, time.time() - t, face_lms is not None,
+                                            mar, ear, mouth_open, self.eyes.is_closed)
 
-            if not self.eyes.is_closed and ear < EAR_CLOSE_THRESH:
-                self.eyes.is_closed = True
-            elif self.eyes.is_closed and ear > EAR_OPEN_THRESH:
-                self.eyes.is_closed = False
+        self.roi = self._next_roi(face_lms, region, w, h)
 
         if self.draw_mesh and face_lms is not None:
+            # ランドマークは推論した領域に対する正規化座標なので、その部分に描く
             mp_draw.draw_landmarks(
-                frame, face_lms, mp_mesh.FACEMESH_TESSELATION,
+                frame[y0:y1, x0:x1], face_lms, mp_mesh.FACEMESH_TESSELATION,
                 landmark_drawing_spec=None,
                 connection_drawing_spec=mp_style.get_default_face_mesh_tesselation_style()
             )
 
-        cv2.putText(frame, f"MAR:{mar:.2f} EAR:{ear:.2f}", (16, 150),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255,255,255), 2, cv2.LINE_AA)
         self.mouth.is_open = mouth_open
+        return mouth_open, eyes_closed, mar, ear
+
+    def _update_eyes(self, ear: float):
+        if not self.eyes.is_closed and ear < EAR_CLOSE_THRESH:
+            self.eyes.is_closed = True
+        elif self.eyes.is_closed and ear > EAR_OPEN_THRESH:
+            self.eyes.is_closed = False
+
+    def to_infer_rgb(self, crop) -> np.ndarray:
+        """切り出し画像を infer_size 以内に縮小し、FaceMesh用のRGBにする"""
+        ch, cw = crop.shape[:2]
+        scale = min(1.0, self.infer_w / cw, self.infer_h / ch)
+        if scale < 1.0:
+            size = (max(1, round(cw * scale)), max(1, round(ch * scale)))
+            small = self.prep.buffer("infer_small", (size[1], size[0], 3))
+            cv2.resize(crop, size, dst=small, interpolation=cv2.INTER_AREA)
+            crop = small
+        rgb = self.prep.buffer("infer_rgb", crop.shape)
+        cv2.cvtColor(crop, cv2.COLOR_BGR2RGB, dst=rgb)
+        return rgb
+
+    def _infer_region(self, frame, region):
+        """region を（必要なら縮小して）FaceMeshに通し、顔のlandmarkを返す。無ければ None"""
+        x0, y0, x1, y1 = region
+        res = self.mesh.process(self.to_infer_rgb(frame[y0:y1, x0:x1]))
+        if not res.multi_face_landmarks:
+            return None
+        return res.multi_face_landmarks[0]
+
+    def _next_roi(self, face_lms, region, w, h):
+        """検出した顔の外接矩形に余白を付けた正方形の枠（表示座標）。追跡しないなら None"""
+        if not self.roi_tracking or face_lms is None:
+            return None
+        x0, y0, x1, y1 = region
+        bx0, by0, bx1, by1 = face_box(face_lms.landmark, x1 - x0, y1 - y0, x0, y0)
+        side = max(bx1 - bx0, by1 - by0) * (1.0 + 2.0 * ROI_PAD)
+        cx, cy = (bx0 + bx1) / 2.0, (by0 + by1) / 2.0
+        nx0 = int(max(0, cx - side / 2)); ny0 = int(max(0, cy - side / 2))
+        nx1 = int(min(w, cx + side / 2)); ny1 = int(min(h, cy + side / 2))
+        if nx1 - nx0 < ROI_MIN_SIZE or ny1 - ny0 < ROI_MIN_SIZE:
+            return None
+        return (nx0, ny0, nx1, ny1)
+
+    def draw_debug(self, frame, mar: float, ear: float, lag_s: Optional[float] = None):
+        stride = self.scheduler.stride if self.scheduler is not None else None
+        draw_debug(self.hud, frame, mar, ear, lag_s, stride)
+
+    def process(self, frame) -> Tuple[np.ndarray, bool, bool, float, float]:
+        frame = self.prepare(frame)
+        mouth_open, eyes_closed, mar, ear = self.infer(frame)
+        self.draw_debug(frame, mar, ear)
         return frame, mouth_open, eyes_closed, mar, ear
 
     def close(self): self.mesh.close()
@@ -0,0 +1,127 @@
+# eval_predictor.py
+# 記録したセッション（--record）で入力予測（signal_predictor）をオフライン評価する
+#   基準: 各フレームで直近の検出結果をそのまま使う（取得から表示までの分だけ遅れる）
+#   予測: InputPredictor が表示時刻の状態を予測する
+# 正解は「表示時刻に撮られていたフレーム」の検出結果（記録の後のフレームから分かる）
+import argparse
+import json
+from typing import Dict, List
+
+import numpy as np
+
+from config import MAR_OPEN_THRESH, PREDICT_MIN_CUTOFF, PREDICT_BETA, PREDICT_D_CUTOFF, PREDICT_MAX_LEAD
+from session_replay import load_session
+from signal_predictor import InputPredictor
+
+
+def _onsets(x: np.ndarray) -> np.ndarray:
+    """False→True になったインデックス"""
+    return np.flatnonzero(x[1:] & ~x[:-1]) + 1
+
+
+def _match(events_t: np.ndarray, fire_t: np.ndarray, window: float):
+    """
+    正解の立ち上がり時刻ごとに、window 秒前から次の正解までの間で最初の反応を対応づける。
+    戻り値: (正解ごとの反応時刻 [nan=反応なし], 対応しなかった反応の数)
+    """
+    used = np.zeros(len(fire_t), dtype=bool)
+    out = np.full(len(events_t), np.nan)
+    for k, t in enumerate(events_t):
+        t_next = events_t[k + 1] - window if k + 1 < len(events_t) else np.inf
+        lo = np.searchsorted(fire_t, t - window)
+        for j in range(lo, len(fire_t)):
+            if fire_t[j] >= t_next:
+                break
+            if not used[j]:
+                used[j] = True
+                out[k] = fire_t[j]
+                break
+    return out, int((~used).sum())
+
+
+def evaluate(path: str, latency: float, tail: float, window: float, **predictor_kw) -> Dict[str, float]:
+    s = load_session(path)
+    t = s.t.astype(np.float64)
+    tc = np.where(np.isfinite(s.t_input), s.t_input, t - latency)
+    td = t + tail   # 画面に出る時刻
+    mar = s.mar.astype(np.float64)
+    ear = s.ear.astype(np.float64)
+
+    # 検出結果ごと（取得時刻ごと）の列：非同期推論では同じ結果が複数フレーム続く
+    first = np.concatenate(([True], tc[1:] > tc[:-1]))
+    tc_u, open_u = tc[first], (mar[first] > MAR_OPEN_THRESH) & (ear[first] > 0)
+
+    pred = InputPredictor(**predictor_kw)
+    pred.tail_ema = tail
+    n = len(t)
+    p_open = np.zeros(n, dtype=bool)
+    for i in range(n):
+        pred.update(mar[i], ear[i], tc[i])
+        p_open[i] = pred.predict(t[i])[0]
+    b_open = (mar > MAR_OPEN_THRESH) & (ear > 0)
+
+    # 表示時刻の正解（それより後に撮られたフレームが無い末尾は除く）
+    valid = td <= tc_u[-1]
+    truth = open_u[np.maximum(np.searchsorted(tc_u, td, side="right") - 1, 0)]
+
+    ev_t = tc_u[_onsets(open_u)]
+    ev_t = ev_t[ev_t <= tc_u[-1] - window]
+    base_fire, _ = _match(ev_t, td[_onsets(b_open)], window)
+    pred_fire, false_pred = _match(ev_t, td[_onsets(p_open)], window)
+    base_lat = base_fire - ev_t
+    pred_lat = pred_fire - ev_t
+    both = np.isfinite(base_lat) & np.isfinite(pred_lat)
+
+    minutes = max((t[-1] - t[0]) / 60.0, 1e-9)
+    pred_onsets = len(_onsets(p_open))
+    return {
+        "frames": n,
+        "samples": int(first.sum()),
+        "onsets": int(len(ev_t)),
+        "latency_ms": float(np.median(td - tc) * 1000.0),
+        "base_onset_ms": float(np.nanmedian(base_lat) * 1000.0) if both.any() else float("nan"),
+        "pred_onset_ms": float(np.nanmedian(pred_lat) * 1000.0) if both.any() else float("nan"),
+        "saved_ms": float(np.median(base_lat[both] - pred_lat[both]) * 1000.0) if both.any() else float("nan"),
+        "missed": int(np.isnan(pred_lat).sum()),
+        "false_triggers": false_pred,
+        "false_rate": false_pred / max(1, pred_onsets),
+        "false_per_min": false_pred / minutes,
+        "base_agree": float((b_open == truth)[valid].mean()) if valid.any() else float("nan"),
+        "pred_agree": float((p_open == truth)[valid].mean()) if valid.any() else float("nan"),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Evaluate the input predictor on recorded sessions")
+    ap.add_argument("sessions", nargs="+", help="session .npz files recorded with --record")
+    ap.add_argument("--latency-ms", type=float, default=50.0,
+                    help="capture-to-decision latency for sessions without t_input")
+    ap.add_argument("--tail-ms", type=float, default=10.0, help="decision-to-display time")
+    ap.add_argument("--window-ms", type=float, default=150.0,
+                    help="a predicted onset this early (or later) still counts as the same press")
+    ap.add_argument("--min-cutoff", type=float, default=PREDICT_MIN_CUTOFF)
+    ap.add_argument("--beta", type=float, default=PREDICT_BETA)
+    ap.add_argument("--d-cutoff", type=float, default=PREDICT_D_CUTOFF)
+    ap.add_argument("--max-lead-ms", type=float, default=PREDICT_MAX_LEAD * 1000.0)
+    ap.add_argument("--json", metavar="PATH", help="write per-session results to PATH")
+    args = ap.parse_args()
+
+    kw = dict(min_cutoff=args.min_cutoff, beta=args.beta, d_cutoff=args.d_cutoff,
+              max_lead=args.max_lead_ms / 1000.0)
+    results: List[Dict[str, float]] = []
+    for path in args.sessions:
+        r = evaluate(path, args.latency_ms / 1000.0, args.tail_ms / 1000.0, args.window_ms / 1000.0, **kw)
+        results.append({"session": path, **r})
+        print(f"{path}: {r['frames']} frames, {r['onsets']} mouth onsets, latency {r['latency_ms']:.0f} ms")
+        print(f"  onset latency  base {r['base_onset_ms']:6.1f} ms  pred {r['pred_onset_ms']:6.1f} ms  "
+              f"saved {r['saved_ms']:6.1f} ms  (missed {r['missed']})")
+        print(f"  false triggers {r['false_triggers']} ({r['false_rate'] * 100:.1f}% of predicted onsets, "
+              f"{r['false_per_min']:.1f}/min)  agreement with display-time truth "
+              f"base {r['base_agree'] * 100:.1f}%  pred {r['pred_agree'] * 100:.1f}%")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"params": kw, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+# event_server.py
+# 瞬き・口のイベントを同じマシンの複数のプロセスへ配る。asyncio のサーバを別スレッドで回し、
+# 1イベント = JSON 1行（seq・種類・カメラ取得時刻・EAR/MAR）を Unix ドメインソケット
+# （AF_UNIX が無い環境では 127.0.0.1 の TCP）で送る。遅いクライアントは待たずに切る
+#   python event_server.py            # 購読して1行ずつ表示する
+import argparse
+import asyncio
+import json
+import os
+import socket
+import threading
+import time
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from config import EVENT_SOCKET, EVENT_PORT, EVENT_QUEUE_MAX
+
+HAS_UNIX = hasattr(socket, "AF_UNIX")
+
+
+def encode_event(seq: int, kind: str, t_capture: float, ear: float, mar: float, frame: int = -1) -> bytes:
+    """1イベントを1行にする（t_sent は送った時刻 [time.time()]）"""
+    ev = {"seq": seq, "type": kind, "frame": frame, "t_capture": t_capture, "t_sent": time.time(),
+          "ear": round(ear, 4), "mar": round(mar, 4)}
+    return (json.dumps(ev, separators=(",", ":")) + "\n").encode()
+
+
+class EventServer:
+    """
+    publish() は検出ループのスレッドから呼ぶ。行を作ってサーバのスレッドへ渡すだけで、送信は待たない。
+    クライアントごとに最大 queue_max 行の送信待ちを持ち、溢れたら（読むのが遅い・止まっている）そのクライアントを切る。
+    seq はイベントの通し番号（1始まり）。つなぎ直したクライアントは飛んだ seq で取りこぼしが分かる。
+    path=None なら host:port の TCP（port=0 なら空いている番号を使い、start() 後に self.port に入る）
+    """
+    def __init__(self, path: Optional[str] = EVENT_SOCKET, host: str = "127.0.0.1", port: int = EVENT_PORT,
+                 queue_max: int = EVENT_QUEUE_MAX):
+        self.path = path if HAS_UNIX else None
+        self.host, self.port = host, port
+        self.queue_max = queue_max
+        self.seq = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._clients: Dict[asyncio.StreamWriter, Tuple[asyncio.Queue, asyncio.Task]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._error: Optional[BaseException] = None
+
+        # 統計
+        self.events_published = 0
+        self.clients_accepted = 0
+        self.clients_dropped = 0   # 送信待ちが溢れて切ったクライアント
+
+    @property
+    def address(self) -> str:
+        return self.path if self.path is not None else f"{self.host}:{self.port}"
+
+    @property
+    def n_clients(self) -> int:
+        return len(self._clients)
+
+    def start(self) -> "EventServer":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="event-server", daemon=True)
+            self._thread.start()
+            self._ready.wait()
+            if self._error is not None:
+                self._thread.join()
+                self._thread = None
+                raise self._error
+        return self
+
+    def publish(self, kind: str, t_capture: float, ear: float, mar: float, frame: int = -1) -> int:
+        """イベントを全クライアントへ送る（ブロックしない）。戻り値は seq"""
+        self.seq += 1
+        self.events_published += 1
+        if self._clients and self._loop is not None:
+            line = encode_event(self.seq, kind, t_capture, ear, mar, frame)
+            self._loop.call_soon_threadsafe(self._broadcast, line)
+        return self.seq
+
+    def close(self):
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=2.0)
+        self._thread = None
+
+    # --- 以下はサーバのスレッド ---
+
+    def _run(self):
+        loop = self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(self._listen())
+        except BaseException as e:
+            self._error = e
+            loop.close()
+            self._ready.set()
+            return
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            self._server.close()
+            tasks = [task for _, task in self._clients.values()]
+            for writer, (queue, _) in list(self._clients.items()):
+                self._end(writer, queue)
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(self._server.wait_closed())
+            loop.close()
+            if self.path is not None and os.path.exists(self.path):
+                os.unlink(self.path)
+
+    async def _listen(self):
+        if self.path is None:
+            self._server = await asyncio.start_server(self._serve, self.host, self.port)
+            self.port = self._server.sockets[0].getsockname()[1]
+            return
+        if os.path.exists(self.path):
+            # 前に落ちたサーバのソケットファイルなら消す。生きているサーバがいれば使わない
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.path)
+            except OSError:
+                os.unlink(self.path)
+            else:
+                raise RuntimeError(f"another event server is running on {self.path}")
+            finally:
+                probe.close()
+        self._server = await asyncio.start_unix_server(self._serve, path=self.path)
+
+    def _broadcast(self, line: bytes):
+        for writer, (queue, _) in list(self._clients.items()):
+            try:
+                queue.put_nowait(line)
+            except asyncio.QueueFull:
+                self._drop(writer)
+
+    def _drop(self, writer: asyncio.StreamWriter):
+        entry = self._clients.get(writer)
+        if entry is None:
+            return
+        self._end(writer, entry[0])
+        self.clients_dropped += 1
+
+    @staticmethod
+    def _end(writer: asyncio.StreamWriter, queue: asyncio.Queue):
+        """送信待ちを捨てて終わりの印 None を入れ、接続を切る（_serve のループが抜ける）"""
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+        writer.transport.abort()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        queue: asyncio.Queue = asyncio.Queue(self.queue_max)
+        self._clients[writer] = (queue, asyncio.current_task())
+        self.clients_accepted += 1
+        try:
+            while True:
+                line = await queue.get()
+                # 溜まっている分もまとめて書いてから待つ
+                while line is not None and not queue.empty():
+                    writer.write(line)
+                    line = queue.get_nowait()
+                if line is None:
+                    break
+                writer.write(line)
+                await writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self._clients.pop(writer, None)
+            writer.close()
+
+
+def _connect(path: Optional[str], host: str, port: int, timeout: Optional[float]) -> socket.socket:
+    if path is not None and HAS_UNIX:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        sock.connect(path)
+        return sock
+    sock = socket.create_connection((host, port), timeout=timeout)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
+
+class EventClient:
+    """
+    ブロッキングの購読クライアント。
+        with EventClient() as c:
+            for ev in c:   # ev は dict（seq, type, frame, t_capture, t_sent, ear, mar）
+                ...
+    サーバが閉じる（または遅すぎて切られる）と反復が終わる。timeout は recv の待ち時間 [s]
+    """
+    def __init__(self, path: Optional[str] = EVENT_SOCKET, host: str = "127.0.0.1", port: int = EVENT_PORT,
+                 timeout: Optional[float] = None):
+        self.sock = _connect(path, host, port, timeout)
+        self._file = self.sock.makefile("rb")
+
+    def recv(self) -> Optional[dict]:
+        """次のイベント。接続が切れたら None（timeout を過ぎたら socket.timeout）"""
+        line = self._file.readline()
+        return json.loads(line) if line else None
+
+    def __iter__(self):
+        while True:
+            ev = self.recv()
+            if ev is None:
+                return
+            yield ev
+
+    def close(self):
+        self._file.close()
+        self.sock.close()
+
+    def __enter__(self) -> "EventClient":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+async def subscribe(path: Optional[str] = EVENT_SOCKET, host: str = "127.0.0.1",
+                    port: int = EVENT_PORT) -> AsyncIterator[dict]:
+    """asyncio 版の購読：async for ev in subscribe(): ..."""
+    if path is not None and HAS_UNIX:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            yield json.loads(line)
+    finally:
+        writer.close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Print events from a running detect_blink_mouth --serve")
+    ap.add_argument("--path", default=EVENT_SOCKET, help="Unix socket of the server")
+    ap.add_argument("--port", type=int, default=None, help="connect over TCP to 127.0.0.1:PORT instead")
+    args = ap.parse_args()
+    path = None if args.port is not None else args.path
+    with EventClient(path=path, port=args.port or EVENT_PORT) as client:
+        for ev in client:
+            lag_ms = (time.time() - ev["t_capture"]) * 1000.0
+            print(f"{ev['seq']:6d} {ev['type']:5s} EAR:{ev['ear']:.2f} MAR:{ev['mar']:.2f} "
+                  f"capture->here {lag_ms:.1f} ms", flush=True)
+
+
+if __name__ == "__main__":
+    main()
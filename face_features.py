@@ -0,0 +1,91 @@
+# face_features.py
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+R_EYE = [33, 160, 158, 133, 153, 144]
+L_EYE = [263, 387, 385, 362, 380, 373]
+MOUTH = [78, 13, 82, 14, 312, 308]
+
+# 顔の外接矩形の目安に使う4点（額・顎・左右の頬）
+FACE_BOX_IDX = [10, 152, 234, 454]
+
+FEATURE_IDX = np.array(R_EYE + L_EYE + MOUTH, dtype=np.intp)
+_FEATURE_LIST = FEATURE_IDX.tolist()
+
+# 18点配列上の距離ペア。行: [右目, 左目, 口]、列: [横, 縦1, 縦2]
+#   目: left, up1, up2, right, low1, low2
+#   口: left, up1, up2, low1, low2, right
+_PAIR_A = np.array([[0, 1, 2], [6, 7, 8], [12, 13, 14]], dtype=np.intp)
+_PAIR_B = np.array([[3, 4, 5], [9, 10, 11], [17, 15, 16]], dtype=np.intp)
+
+
+def gather_points(landmarks, w: float, h: float, x0: float = 0.0, y0: float = 0.0) -> np.ndarray:
+    """
+    FaceMeshのlandmark列から目・口の18点だけを (18, 2) のピクセル座標で取り出す
+    w, h: 推論に使った画像（切り出し領域）の大きさ、x0, y0: その領域の左上
+    """
+    pts = np.array([(landmarks[i].x, landmarks[i].y) for i in _FEATURE_LIST], dtype=np.float32)
+    pts *= (w, h)
+    pts += (x0, y0)
+    return pts
+
+
+def face_box(landmarks, w: float, h: float, x0: float = 0.0, y0: float = 0.0):
+    """FACE_BOX_IDX の4点から顔の外接矩形 (x_min, y_min, x_max, y_max) を返す"""
+    xs = [landmarks[i].x for i in FACE_BOX_IDX]
+    ys = [landmarks[i].y for i in FACE_BOX_IDX]
+    return (x0 + min(xs) * w, y0 + min(ys) * h, x0 + max(xs) * w, y0 + max(ys) * h)
+
+
+def eye_mouth_ratios(pts: np.ndarray) -> np.ndarray:
+    """
+    (..., 18, 2) → (..., 3) の [右目EAR, 左目EAR, MAR] を一度に計算する
+    """
+    d = np.linalg.norm(pts[..., _PAIR_A, :] - pts[..., _PAIR_B, :], axis=-1)
+    horiz = d[..., 0]
+    vert = (d[..., 1] + d[..., 2]) * 0.5
+    return np.divide(vert, horiz, out=np.zeros_like(vert), where=horiz >= 1e-6)
+
+
+def ear_mar(pts: np.ndarray):
+    """
+    18点 (18, 2) → (ear, mar) の float、バッチ (N, 18, 2) → 長さNの配列2つ
+    earは両目の平均
+    """
+    r = eye_mouth_ratios(pts)
+    ear = (r[..., 0] + r[..., 1]) * 0.5
+    mar = r[..., 2]
+    if r.ndim == 1:
+        return float(ear), float(mar)
+    return ear, mar
+
+
+def ear_mar_batch(pts: np.ndarray):
+    """
+    オフライン用。全点 (N, 478, 2) または18点 (N, 18, 2) の配列から (ear[N], mar[N])
+    """
+    pts = np.asarray(pts, dtype=np.float32)
+    if pts.shape[-2] != len(_FEATURE_LIST):
+        pts = pts[..., FEATURE_IDX, :]
+    return ear_mar(pts)
+
+
+@dataclass
+class FaceResult:
+    mouth_open: bool = False
+    eyes_closed: bool = False
+    mar: float = 0.0
+    ear: float = 0.0
+    timestamp: float = 0.0    # 推論が終わった時刻 [time.time()]
+    t_capture: float = 0.0    # 推論に使ったフレームの取得時刻
+    seq: int = -1             # 推論に使ったフレームの通し番号（-1: まだ結果なし）
+    infer_s: float = 0.0      # 推論にかかった時間 [s]
+
+    def age(self, now: Optional[float] = None) -> float:
+        """カメラ取得からの経過時間（= 入力の古さ）[s]"""
+        if now is None:
+            now = time.time()
+        return now - self.t_capture
@@ -0,0 +1,53 @@
+# frame_prep.py
+# カメラ画像 → 表示サイズの鏡像。出力と作業領域は使い回し、毎フレームの確保をしない
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from config import WIN_W, WIN_H
+
+
+class FramePreprocessor:
+    """
+    __call__(frame) は毎回同じ配列を返す（次の呼び出しで上書きされる）。
+    残しておきたいときは呼び出し側でコピーすること。1つのインスタンスは1スレッドから使う。
+    """
+    def __init__(self, out_size=(WIN_W, WIN_H), mirror: bool = True):
+        self.out_w, self.out_h = out_size
+        self.mirror = mirror
+        self._out = np.empty((self.out_h, self.out_w, 3), dtype=np.uint8)
+        self._scratch = {}
+
+    def buffer(self, name: str, shape, dtype=np.uint8) -> np.ndarray:
+        """name ごとの作業領域を shape の連続した配列として返す（足りなければ大きくする）"""
+        n = int(np.prod(shape))
+        buf = self._scratch.get(name)
+        if buf is None or buf.size < n or buf.dtype != dtype:
+            buf = np.empty(n, dtype=dtype)
+            self._scratch[name] = buf
+        return buf[:n].reshape(shape)
+
+    def __call__(self, frame: np.ndarray, dst: Optional[np.ndarray] = None) -> np.ndarray:
+        """dst: 書き込み先（表示サイズの uint8 配列。省略時は内部の出力バッファ）"""
+        h, w = frame.shape[:2]
+        out = self._out if dst is None else dst
+        if (w, h) == (self.out_w, self.out_h):
+            # 取得サイズ＝表示サイズなら鏡像にするだけ（1パス）
+            if self.mirror:
+                cv2.flip(frame, 1, dst=out)
+            else:
+                np.copyto(out, frame)
+        elif not self.mirror:
+            cv2.resize(frame, (self.out_w, self.out_h), dst=out)
+        elif w * h < self.out_w * self.out_h:
+            # 拡大：小さい方（元画像）を反転してから拡大する
+            tmp = self.buffer("flip", frame.shape)
+            cv2.flip(frame, 1, dst=tmp)
+            cv2.resize(tmp, (self.out_w, self.out_h), dst=out)
+        else:
+            # 縮小：縮小してから反転する
+            tmp = self.buffer("resize", out.shape)
+            cv2.resize(frame, (self.out_w, self.out_h), dst=tmp)
+            cv2.flip(tmp, 1, dst=out)
+        return out
@@ -0,0 +1,165 @@
+# frame_stats.py
+# ゲームループの区間ごとの時刻をリングバッファに記録し、HUD表示とファイル書き出しをする
+#   1フレーム: begin() → mark(CAPTURE) → mark(DETECT) → ... → end(t_input)
+# 無効のときは各メソッドが最初の if で戻るだけ
+import csv
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from config import PERF_RING_SIZE, PERF_EXPORT_DIR, PERF_EXPORT_INTERVAL
+
+# 区間（mark に渡す番号）
+CAPTURE, DETECT, UPDATE, DRAW, SHOW, WAIT = range(6)
+STAGE_NAMES = ("capture", "detect", "update", "draw", "show", "wait")
+
+_HUD_REFRESH_S = 0.5
+
+
+class FrameProfiler:
+    """
+    enabled: 記録するか（HUDを出すと自動で有効になる）
+    export: PERF_EXPORT_INTERVAL 秒ごとに export_dir へ JSON/CSV を書き出す
+    """
+    def __init__(self, enabled: bool = False, export: bool = False, capacity: int = PERF_RING_SIZE,
+                 export_dir: str = PERF_EXPORT_DIR, export_interval: float = PERF_EXPORT_INTERVAL):
+        self.enabled = enabled or export
+        self.export_enabled = export
+        self.show_hud = False
+        self.capacity = capacity
+        # 列0: フレーム開始、列k+1: 区間kの終わり [perf_counter]
+        self._marks = np.zeros((capacity, len(STAGE_NAMES) + 1), dtype=np.float64)
+        self._latency = np.full(capacity, np.nan, dtype=np.float64)   # カメラ取得→表示 [s]
+        self._row = self._marks[0]
+        self._count = 0          # これまでに記録したフレーム数
+        self._exported = 0       # CSVに書き出したフレーム数
+
+        self.export_dir = export_dir
+        self.export_interval = export_interval
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        self._json_path = os.path.join(export_dir, f"frames_{stamp}.jsonl")
+        self._csv_path = os.path.join(export_dir, f"frames_{stamp}.csv")
+        self._next_export = time.perf_counter() + export_interval
+
+        self._hud_lines: List[str] = []
+        self._next_hud = 0.0
+
+    def toggle_hud(self):
+        self.show_hud = not self.show_hud
+        if self.show_hud:
+            self.enabled = True
+
+    def begin(self):
+        if not self.enabled:
+            return
+        self._row = self._marks[self._count % self.capacity]
+        self._row[:] = np.nan
+        self._row[0] = time.perf_counter()
+
+    def mark(self, stage: int):
+        if not self.enabled:
+            return
+        self._row[stage + 1] = time.perf_counter()
+
+    def end(self, t_input: Optional[float] = None):
+        """
+        t_input: このフレームの入力に使ったカメラ画像の取得時刻 [time.time()]
+        SHOW の後に呼べば、入力が画面に出るまでの遅れとして記録される
+        """
+        if not self.enabled:
+            return
+        i = self._count % self.capacity
+        self._latency[i] = time.time() - t_input if t_input is not None else np.nan
+        self._count += 1
+        if self.export_enabled and self._row[0] >= self._next_export:
+            self._next_export = self._row[0] + self.export_interval
+            self.export()
+
+    def _rows(self) -> np.ndarray:
+        """記録済みの行の番号（古い順）"""
+        n = min(self._count, self.capacity)
+        return (self._count - n + np.arange(n)) % self.capacity
+
+    def stats(self) -> Dict[str, float]:
+        idx = self._rows()
+        if len(idx) < 2:
+            return {"frames": int(self._count)}
+        marks = self._marks[idx]
+        starts = marks[:, 0]
+        frame_ms = (np.nanmax(marks[:, 1:], axis=1) - starts) * 1000.0
+        # 記録されなかった区間は直前の時刻から測る
+        filled = marks.copy()
+        for k in range(1, filled.shape[1]):
+            miss = np.isnan(filled[:, k])
+            filled[miss, k] = filled[miss, k - 1]
+        stage_ms = np.diff(filled, axis=1) * 1000.0
+        out = {
+            "frames": int(self._count),
+            "fps": float((len(idx) - 1) / max(starts[-1] - starts[0], 1e-9)),
+            "frame_p50_ms": float(np.percentile(frame_ms, 50)),
+            "frame_p95_ms": float(np.percentile(frame_ms, 95)),
+            "frame_max_ms": float(frame_ms.max()),
+        }
+        for k, name in enumerate(STAGE_NAMES):
+            out[f"{name}_mean_ms"] = float(stage_ms[:, k].mean())
+        lat = self._latency[idx]
+        lat = lat[~np.isnan(lat)] * 1000.0
+        if lat.size:
+            out["latency_p50_ms"] = float(np.percentile(lat, 50))
+            out["latency_p95_ms"] = float(np.percentile(lat, 95))
+        return out
+
+    def draw_hud(self, vis: np.ndarray):
+        """右上に fps・フレーム時間・入力遅延を描く（表示中のみ）"""
+        if not self.show_hud:
+            return
+        now = time.perf_counter()
+        if now >= self._next_hud:
+            self._next_hud = now + _HUD_REFRESH_S
+            st = self.stats()
+            if "fps" not in st:
+                self._hud_lines = ["measuring..."]
+            else:
+                self._hud_lines = [
+                    f"fps {st['fps']:.1f}",
+                    f"frame p50 {st['frame_p50_ms']:.1f} p95 {st['frame_p95_ms']:.1f} ms",
+                    (f"input lag p50 {st['latency_p50_ms']:.0f} p95 {st['latency_p95_ms']:.0f} ms"
+                     if "latency_p50_ms" in st else "input lag -"),
+                ] + [f"{name} {st[f'{name}_mean_ms']:.1f} ms" for name in STAGE_NAMES]
+        x = vis.shape[1] - 300
+        for j, line in enumerate(self._hud_lines):
+            cv2.putText(vis, line, (x, 24 + 20 * j), cv2.FONT_HERSHEY_SIMPLEX, 0.5,
+                        (255, 255, 0), 1, cv2.LINE_AA)
+
+    def export(self):
+        """統計を JSON Lines に1行追記し、前回以降のフレームを CSV に追記する"""
+        os.makedirs(self.export_dir, exist_ok=True)
+        st = self.stats()
+        st["time"] = time.time()
+        with open(self._json_path, "a") as f:
+            f.write(json.dumps(st) + "\n")
+
+        idx = self._rows()
+        new = min(self._count - self._exported, len(idx))
+        if new > 0:
+            write_header = not os.path.exists(self._csv_path)
+            with open(self._csv_path, "a", newline="") as f:
+                w = csv.writer(f)
+                if write_header:
+                    w.writerow(["frame", "start"] + [f"{n}_ms" for n in STAGE_NAMES] + ["latency_ms"])
+                for k, i in zip(range(self._count - new, self._count), idx[-new:]):
+                    row = self._marks[i]
+                    stage_ms = [(row[s + 1] - row[s]) * 1000.0 if not np.isnan(row[s + 1] + row[s]) else ""
+                                for s in range(len(STAGE_NAMES))]
+                    lat = self._latency[i]
+                    w.writerow([k, f"{row[0]:.6f}"] + [f"{v:.3f}" if v != "" else "" for v in stage_ms]
+                               + ["" if np.isnan(lat) else f"{lat * 1000.0:.1f}"])
+        self._exported = self._count
+
+    def close(self):
+        if self.export_enabled and self._count > self._exported:
+            self.export()
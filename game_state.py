@@ -0,0 +1,261 @@
+# game_state.py
+# ゲームの状態と更新処理。cv2・カメラ・ウィンドウには依存しない（描画は mouthy_bird_game 側）
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence
+
+from config import (WIN_W, WIN_H, RADIUS, PLAYER_X, INVINCIBLE_S, LIFE_MAX, DIFFICULTY_PRESETS,
+                    PIPE_GAP_MIN_Y, PIPE_GAP_MAX_Y, DT_CLAMP, FIXED_STEP_HZ, FIXED_MAX_STEPS)
+from pipe_store import PipeStore
+from life_gauge import LifeGauge
+
+START_LIVES = 3
+
+
+@dataclass
+class StepInput:
+    mouth_open: bool = False
+    eyes_closed: bool = False
+
+
+@dataclass
+class StepEvents:
+    scored: int = 0          # このステップで増えたスコア
+    hit: bool = False        # 当たってライフが減った
+    healed: int = 0          # ライフゲージで回復した数
+    game_over: bool = False  # このステップの終わりでライフが0
+
+
+@dataclass
+class Bird:
+    """プレイヤー1人分の状態（複数人プレイではパイプだけを共有する）"""
+    y: float
+    vy: float
+    score: int
+    lives: int
+    invincible_until: float
+    life_gauge: LifeGauge
+
+
+def _bird_property(name: str):
+    """1人目の鳥の属性を GameState の属性として見せる（1人用のコードとの互換）"""
+    return property(lambda self: getattr(self.birds[0], name),
+                    lambda self, v: setattr(self.birds[0], name, v))
+
+
+class GameState:
+    """
+    1プレイ分の状態。step(inputs, dt) で dt 秒だけ進める。
+    seed: パイプ出現に使う乱数の種（同じ種・同じ入力列なら同じ結果になる）
+    clock: 現在時刻を返す関数。省略時は step の dt を積算したゲーム内時刻 t
+    n_players: 鳥の数。全員 PLAYER_X にいて同じパイプを避ける。
+               state.y / state.score などは1人目の鳥を指す
+    速さの目安（1人・1コア・純 Python）: step 1回 約 11〜15 µs。dt=1/60 で 120 秒のゲーム（7200 ステップ）は
+    1秒に約 10 ゲーム（途中でライフが尽きるゲームを含めて約 15 ゲーム）。何千ゲームも回す用途には向かない
+    （python game_state.py で測れる）
+    """
+    y = _bird_property("y")
+    vy = _bird_property("vy")
+    score = _bird_property("score")
+    lives = _bird_property("lives")
+    invincible_until = _bird_property("invincible_until")
+    life_gauge = _bird_property("life_gauge")
+
+    def __init__(self, difficulty: str = "NORMAL", seed: Optional[int] = None,
+                 clock: Optional[Callable[[], float]] = None, n_players: int = 1):
+        self.difficulty = difficulty
+        self.params = DIFFICULTY_PRESETS[difficulty]
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.clock = clock
+        self.n_players = n_players
+        self.t = 0.0
+        self.pipes = PipeStore()
+        self.reset()
+
+    def reset(self):
+        """リスタート（乱数列はそのまま続ける）"""
+        self.birds = [Bird(y=WIN_H * 0.5, vy=0.0, score=0, lives=START_LIVES, invincible_until=0.0,
+                           life_gauge=LifeGauge(difficulty=self.difficulty))
+                      for _ in range(self.n_players)]
+        self.pipes.clear()
+        self.run_started = self.t   # このプレイを始めたゲーム内時刻
+        self.time_from_spawn = 0.0
+        self.next_spawn = self._spawn_interval()
+
+    def _spawn_interval(self) -> float:
+        return self.rng.uniform(self.params["spawn_interval_min"], self.params["spawn_interval_max"])
+
+    def now(self) -> float:
+        return self.clock() if self.clock is not None else self.t
+
+    def is_invincible(self, player: int = 0) -> bool:
+        return self.now() < self.birds[player].invincible_until
+
+    @property
+    def run_time(self) -> float:
+        """このプレイの経過時間（ゲーム内時刻、reset からの秒数）"""
+        return self.t - self.run_started
+
+    @property
+    def game_over(self) -> bool:
+        """全員のライフが0"""
+        return all(b.lives <= 0 for b in self.birds)
+
+    def step(self, inputs: StepInput, dt: float) -> StepEvents:
+        """1人用。n_players > 1 なら step_all を使う"""
+        return self.step_all([inputs], dt)[0]
+
+    def step_all(self, inputs: Sequence[StepInput], dt: float) -> List[StepEvents]:
+        """プレイヤーごとの入力で dt 秒進め、プレイヤーごとのイベントを返す"""
+        birds = self.birds
+        events = [StepEvents() for _ in birds]
+        self.t += dt
+        # 物理更新（ライフが残っている鳥だけ）
+        alive = [b.lives > 0 for b in birds]
+        if not any(alive):
+            for ev in events:
+                ev.game_over = True
+            return events
+
+        p = self.params
+        now = self.clock() if self.clock is not None else self.t
+        thrust, gravity = -p["thrust"], p["gravity"]
+        for b, inp, live in zip(birds, inputs, alive):
+            if not live:
+                continue
+            ay = thrust if inp.mouth_open else gravity
+            b.vy += ay * dt
+            b.y += b.vy * dt
+
+            # 画面端で止める
+            if b.y < RADIUS:
+                b.y, b.vy = RADIUS, 0.0
+            if b.y > WIN_H - RADIUS:
+                b.y, b.vy = WIN_H - RADIUS, 0.0
+
+        # パイプ生成・更新（全員で共有）
+        self.time_from_spawn += dt
+        while self.time_from_spawn >= self.next_spawn:
+            self.time_from_spawn -= self.next_spawn
+            gap_y = self.rng.randint(PIPE_GAP_MIN_Y, PIPE_GAP_MAX_Y)
+            self.pipes.spawn(WIN_W + 20, gap_y, p["pipe_gap_h"])
+            self.next_spawn = self._spawn_interval()
+        self.pipes.scroll(p["scroll_speed"] * dt)
+
+        # スコア（全員同じ x にいるので通過は共通）・衝突判定
+        inc = self.pipes.score(PLAYER_X)
+        for b, inp, ev, live in zip(birds, inputs, events, alive):
+            if not live:
+                ev.game_over = True
+                continue
+            b.score += inc
+            ev.scored = inc
+            if self.pipes.collide(PLAYER_X, int(b.y), RADIUS) and not now < b.invincible_until:
+                b.lives -= 1
+                b.invincible_until = now + INVINCIBLE_S
+                ev.hit = True
+
+            gained = b.life_gauge.update(eyes_closed=inp.eyes_closed, dt=dt, lives=b.lives, now=now)
+            if gained > 0:
+                b.lives = min(LIFE_MAX, b.lives + gained)
+                ev.healed = gained
+
+            ev.game_over = b.lives <= 0
+        return events
+
+
+class StepRunner:
+    """
+    描画フレームごとの経過時間で GameState を進める。
+    hz > 0: 経過時間を積算し、1/hz 秒の固定刻みで step_all する（1フレーム最大 max_steps 回。
+            それ以上の遅れは捨てる）。フレームレートが変わっても同じ刻みで進むので動きが変わらない。
+            描画は最後の2つの刻みの間を alpha で補間する（bird_y / pipe_offset）
+    hz = 0: 従来どおりフレームの dt（DT_CLAMP で頭打ち）で1回だけ進める
+    state.reset() の後は reset() を呼ぶ
+    """
+    def __init__(self, state: GameState, hz: float = FIXED_STEP_HZ, max_steps: int = FIXED_MAX_STEPS):
+        self.state = state
+        self.hz = hz
+        self.step_dt = 1.0 / hz if hz > 0 else 0.0
+        self.max_steps = max_steps
+        self.steps = 0          # 進めた刻みの合計
+        self.dropped = 0.0      # 追いつけずに捨てた時間の合計 [s]
+        self.reset()
+
+    def reset(self):
+        self.acc = 0.0
+        self.alpha = 1.0
+        self.prev_y = [b.y for b in self.state.birds]
+        self.scrolled = 0.0     # 最後の刻みでパイプが左へ動いた量 [px]
+
+    def advance(self, inputs: Sequence[StepInput], frame_dt: float) -> List[StepEvents]:
+        """frame_dt 秒ぶん進め、このフレームの間のイベントをプレイヤーごとにまとめて返す"""
+        state = self.state
+        if self.step_dt == 0.0:
+            self.steps += 1
+            return state.step_all(inputs, min(frame_dt, DT_CLAMP))
+
+        events = [StepEvents() for _ in state.birds]
+        self.acc += frame_dt
+        n = 0
+        while self.acc >= self.step_dt and not state.game_over:
+            if n == self.max_steps:
+                # 1刻み未満の端数だけ残す（補間の位置が飛ばないように）
+                keep = self.acc % self.step_dt
+                self.dropped += self.acc - keep
+                self.acc = keep
+                break
+            self.prev_y = [b.y for b in state.birds]
+            for ev, e in zip(events, state.step_all(inputs, self.step_dt)):
+                ev.scored += e.scored
+                ev.hit = ev.hit or e.hit
+                ev.healed += e.healed
+                ev.game_over = e.game_over
+            self.scrolled = state.params["scroll_speed"] * self.step_dt
+            self.acc -= self.step_dt
+            n += 1
+        self.steps += n
+        self.alpha = min(1.0, self.acc / self.step_dt)
+        return events
+
+    def bird_y(self, player: int = 0) -> float:
+        """描画用の鳥の y（1つ前の刻みと最後の刻みの間）"""
+        y = self.state.birds[player].y
+        return y - (y - self.prev_y[player]) * (1.0 - self.alpha)
+
+    def pipe_offset(self) -> float:
+        """描画用にパイプの x へ足す量（最後の刻みで動いた分の戻し）"""
+        return self.scrolled * (1.0 - self.alpha)
+
+
+def simulate(policy: Callable[[GameState], StepInput], difficulty: str = "NORMAL",
+             seed: Optional[int] = None, dt: float = 1 / 60, max_t: float = 120.0) -> GameState:
+    """ライフが尽きるか max_t 秒経つまで policy の入力で進め、最後の状態を返す"""
+    state = GameState(difficulty=difficulty, seed=seed)
+    bird = state.birds[0]
+    while bird.lives > 0 and state.t < max_t:
+        state.step(policy(state), dt)
+    return state
+
+
+def follow_gap_policy(state: GameState) -> StepInput:
+    """次のパイプのギャップ中心より下にいたら口を開ける簡単な入力"""
+    target = WIN_H * 0.5
+    for p in state.pipes:
+        if p.x + p.w >= PLAYER_X - RADIUS:
+            target = p.gap_y
+            break
+    b = state.birds[0]
+    return StepInput(mouth_open=b.y > target + 10 and b.vy > -150, eyes_closed=False)
+
+
+if __name__ == "__main__":
+    n = 50
+    t0 = time.perf_counter()
+    states = [simulate(follow_gap_policy, seed=i) for i in range(n)]
+    elapsed = time.perf_counter() - t0
+    steps = sum(round(s.t * 60) for s in states)
+    print(f"{n} games in {elapsed:.2f}s ({n / elapsed:.1f} games/s, {elapsed / steps * 1e6:.1f} us/step), "
+          f"mean score {sum(s.score for s in states) / n:.1f}, mean length {sum(s.t for s in states) / n:.0f}s")
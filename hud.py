@@ -0,0 +1,144 @@
+# hud.py
+# HUD（スコア・ライフ・ゲージ・無敵時間・デバッグ表示）をウィジェットごとの小さなタイルとして持ち、
+# 値が変わったときだけ描き直す。毎フレームはタイルを合成するだけ（文字のラスタライズをしない）
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# render(img, paint): タイル座標で描く。色は paint(color) を通す（アルファ用の2回目は 255 になる）
+Render = Callable[[np.ndarray, Callable[[Tuple[int, int, int]], Tuple[int, ...]]], None]
+
+
+class _Tile:
+    """
+    乗算済みの色 premul（黒地に描いた BGR）と 255 - alpha を持つ。
+    合成は cv2.multiply / cv2.add の2回（bird_anim.Sprite の numpy 版より小さいタイルで速い）
+    """
+    def __init__(self, premul: np.ndarray, inv_alpha: np.ndarray, dx: int, dy: int):
+        self.premul = premul
+        self.inv_alpha = inv_alpha
+        self.dx, self.dy = dx, dy     # 描画位置からタイル左上までのずれ
+        self._tmp = np.empty_like(premul)
+        self.advance = 0              # 文字タイルの送り幅（後ろのスペース込み）
+
+    def blit(self, vis: np.ndarray, x: int, y: int):
+        x += self.dx
+        y += self.dy
+        fg_h, fg_w = self.premul.shape[:2]
+        bg_h, bg_w = vis.shape[:2]
+        if fg_w == 0 or x >= bg_w or y >= bg_h or x + fg_w <= 0 or y + fg_h <= 0:
+            return
+        x1, y1 = max(x, 0), max(y, 0)
+        x2, y2 = min(x + fg_w, bg_w), min(y + fg_h, bg_h)
+        fx, fy = x1 - x, y1 - y
+        h, w = y2 - y1, x2 - x1
+        roi = vis[y1:y2, x1:x2]
+        tmp = self._tmp[:h, :w]
+        # out = premul + bg * (255 - a) / 255
+        cv2.multiply(roi, self.inv_alpha[fy:fy + h, fx:fx + w], dst=tmp, scale=1.0 / 255.0)
+        cv2.add(tmp, self.premul[fy:fy + h, fx:fx + w], dst=roi)
+
+
+def _bgr(color):
+    return color
+
+
+def _white(_color):
+    return 255
+
+
+def _color_lut(color) -> np.ndarray:
+    """alpha → color * alpha / 255 の表（1色の文字タイルを alpha から作る）"""
+    a = np.arange(256, dtype=np.uint32)[:, None]
+    return ((a * np.asarray(color, dtype=np.uint32) + 127) // 255).astype(np.uint8).reshape(256, 1, 3)
+
+
+class HudCompositor:
+    """
+    ウィジェットのタイルを「何を描いたか」の key で最大 max_tiles 枚まで覚えておく（LRU）。
+    同じ値に戻ったときも描き直さない（残り時間・MAR/EAR・遅延などは同じ表示が何度も出る）。
+    別々に変わる値は、text() の戻り値の x を使って値ごとに分けて描くとよく当たる。
+    1つのインスタンスは1つの描画ループから使う
+    """
+    def __init__(self, max_tiles: int = 256):
+        self.max_tiles = max_tiles
+        self._tiles: "OrderedDict[object, _Tile]" = OrderedDict()
+        self._luts: Dict[Tuple[int, int, int], np.ndarray] = {}
+        self.rebuilds = 0
+
+    def _get(self, key):
+        tile = self._tiles.get(key)
+        if tile is not None:
+            self._tiles.move_to_end(key)
+        return tile
+
+    def _put(self, key, tile: _Tile):
+        self._tiles[key] = tile
+        self.rebuilds += 1
+        if len(self._tiles) > self.max_tiles:
+            self._tiles.popitem(last=False)
+
+    def widget(self, vis: np.ndarray, name: str, key, x: int, y: int, w: int, h: int, render: Render):
+        """(x, y, w, h) の範囲に render で描く widget を合成する。key は描く内容が同じなら等しい値"""
+        key = ("widget", name, key)
+        tile = self._get(key)
+        if tile is None:
+            img = np.zeros((h, w, 3), dtype=np.uint8)
+            mask = np.zeros((h, w), dtype=np.uint8)
+            render(img, _bgr)
+            render(mask, _white)
+            # 透明でない範囲だけ残す
+            bx, by, bw, bh = cv2.boundingRect(mask)
+            mask = cv2.cvtColor(mask[by:by + bh, bx:bx + bw], cv2.COLOR_GRAY2BGR)
+            premul = np.minimum(img[by:by + bh, bx:bx + bw], mask)
+            tile = _Tile(premul, cv2.bitwise_not(mask), bx, by)
+            self._put(key, tile)
+        tile.blit(vis, x, y)
+
+    def text(self, vis: np.ndarray, text: str, org: Tuple[int, int], scale: float,
+             color: Tuple[int, int, int], thickness: int = 1, line_type: int = cv2.LINE_8,
+             font: int = cv2.FONT_HERSHEY_SIMPLEX) -> int:
+        """
+        cv2.putText(vis, text, org, font, scale, color, thickness, line_type) と同じ見た目。
+        戻り値は続けて書くときの x（text の後ろにスペース1つ分あけた位置）
+        """
+        key = (text, scale, color, thickness, line_type, font)
+        tile = self._get(key)
+        if tile is None:
+            (tw, th), base = cv2.getTextSize(text, font, scale, thickness)
+            pad = thickness + 1
+            w, h = tw + 2 * pad, th + base + 2 * pad
+            local = (pad, pad + th)   # タイル内のベースライン位置
+            mask = np.zeros((h, w), dtype=np.uint8)
+            cv2.putText(mask, text, local, font, scale, 255, thickness, line_type)
+            lut = self._luts.get(color)
+            if lut is None:
+                lut = self._luts[color] = _color_lut(color)
+            # 1色なので色は alpha から表で作る（文字を描くのは1回）
+            mask = cv2.cvtColor(mask, cv2.COLOR_GRAY2BGR)
+            tile = _Tile(cv2.LUT(mask, lut), cv2.bitwise_not(mask), -local[0], -local[1])
+            # 送り幅：getTextSize は線の太さや末尾のスペースの扱いが素直でないので、次の1文字との差で測る
+            tile.advance = (cv2.getTextSize(text + " E", font, scale, thickness)[0][0]
+                            - cv2.getTextSize("E", font, scale, thickness)[0][0])
+            self._put(key, tile)
+        tile.blit(vis, org[0], org[1])
+        return org[0] + tile.advance
+
+    def clear(self):
+        self._tiles.clear()
+
+
+def draw_debug(hud: HudCompositor, frame: np.ndarray, mar: float, ear: float,
+               lag_s: Optional[float] = None, stride: Optional[int] = None):
+    """検出器のデバッグ表示（MAR/EAR・遅延・間引き）。値ごとに別のタイルにして、変わった値だけを描き直す"""
+    parts = [f"MAR:{mar:.2f}", f"EAR:{ear:.2f}"]
+    if lag_s is not None:
+        # 10ms 刻みにして、表示のタイルを毎フレーム描き直さないようにする
+        parts.append(f"lag:{round(lag_s * 100) * 10}ms")
+    if stride is not None:
+        parts.append(f"1/{stride}")
+    x = 16
+    for part in parts:
+        x = hud.text(frame, part, (x, 150), 0.7, (255,255,255), 2, cv2.LINE_AA)
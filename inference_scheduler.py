@@ -0,0 +1,93 @@
+# inference_scheduler.py
+import math
+from collections import deque
+from typing import Dict, Tuple
+
+from config import (EAR_CLOSE_THRESH, EAR_OPEN_THRESH, INFER_TARGET_FPS, INFER_BUDGET,
+                    INFER_MAX_STRIDE, INFER_THRESH_MARGIN, INFER_EXTRAP_HORIZON)
+
+
+class InferenceScheduler:
+    """
+    FaceMeshを N フレームに1回だけ回すための間引き判定。
+    N（stride）は推論時間の移動平均と1フレームあたりの予算から決める。
+    間引いたフレームでは直近2回の推論結果から MAR/EAR を線形外挿する。
+    外挿値が閾値の近くにあるときは状態が変わりそうなので間引かない。
+    """
+    def __init__(self, mar_thresh: float, target_fps: float = INFER_TARGET_FPS,
+                 budget: float = INFER_BUDGET, max_stride: int = INFER_MAX_STRIDE,
+                 margin: float = INFER_THRESH_MARGIN, horizon: float = INFER_EXTRAP_HORIZON):
+        self.mar_thresh = mar_thresh
+        self.frame_budget = budget / target_fps   # 1フレームで推論に使ってよい時間 [s]
+        self.max_stride = max_stride
+        self.margin = margin
+        self.horizon = horizon
+
+        self.stride = 1
+        self.latency_ema = 0.0
+        self._since = 0
+        self._hist = deque(maxlen=2)   # (t, mar, ear)
+        self._skipped_state = None     # 直前の間引きフレームで返した (mouth_open, eyes_closed)
+
+        # 統計
+        self.frames = 0
+        self.inferred = 0
+        self.skipped = 0
+        self.missed_mouth = 0   # 間引き中に口の状態が変わっていて、次の推論まで気付かなかった回数
+        self.missed_eyes = 0
+
+    def should_infer(self, t: float) -> bool:
+        self.frames += 1
+        if len(self._hist) < 2 or self._since + 1 >= self.stride:
+            return True
+        mar, ear = self.extrapolate(t)
+        if abs(mar - self.mar_thresh) < self.margin:
+            return True
+        if abs(ear - EAR_CLOSE_THRESH) < self.margin or abs(ear - EAR_OPEN_THRESH) < self.margin:
+            return True
+        return False
+
+    def extrapolate(self, t: float) -> Tuple[float, float]:
+        (t0, m0, e0), (t1, m1, e1) = self._hist
+        span = t1 - t0
+        if span <= 0:
+            return m1, e1
+        k = min(t - t1, self.horizon) / span
+        return max(0.0, m1 + (m1 - m0) * k), max(0.0, e1 + (e1 - e0) * k)
+
+    def record_skip(self, mouth_open: bool, eyes_closed: bool):
+        self.skipped += 1
+        self._since += 1
+        self._skipped_state = (mouth_open, eyes_closed)
+
+    def record_inference(self, t: float, latency: float, face_found: bool,
+                         mar: float, ear: float, mouth_open: bool, eyes_closed: bool):
+        self.inferred += 1
+        self._since = 0
+        if self._skipped_state is not None:
+            if mouth_open != self._skipped_state[0]:
+                self.missed_mouth += 1
+            if eyes_closed != self._skipped_state[1]:
+                self.missed_eyes += 1
+            self._skipped_state = None
+
+        if face_found:
+            self._hist.append((t, mar, ear))
+        else:
+            self._hist.clear()
+
+        a = 0.2 if self.inferred > 1 else 1.0
+        self.latency_ema += a * (latency - self.latency_ema)
+        self.stride = int(min(self.max_stride, max(1, math.ceil(self.latency_ema / self.frame_budget))))
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "stride": self.stride,
+            "latency_ms": self.latency_ema * 1000.0,
+            "frames": self.frames,
+            "inferred": self.inferred,
+            "skipped": self.skipped,
+            "missed_mouth": self.missed_mouth,
+            "missed_eyes": self.missed_eyes,
+            "missed_rate": (self.missed_mouth + self.missed_eyes) / max(1, self.skipped),
+        }
@@ -12,24 +12,26 @@ class LifeGauge:
     cooldown_until: float = 0.0
     difficulty: str = "NORMAL"
 
-    def update(self, eyes_closed: bool, dt: float, lives: int) -> int:
+    def update(self, eyes_closed: bool, dt: float, lives: int, now: float = None) -> int:
         """
         追加で増えたライフ数を返す
+        now: 現在時刻（クールタイム判定用）。省略時は time.time()
         """
-        now = time.time()
+        if now is None:
+            now = time.time()
         gained = 0
-        life_gauge_rate = DIFFICULTY_PRESETS[self.difficulty]["life_gauge_rate"]
 
         if now < self.cooldown_until:
             return 0
         
         if eyes_closed:
+            life_gauge_rate = DIFFICULTY_PRESETS[self.difficulty]["life_gauge_rate"]
             self.value += life_gauge_rate * dt
             while self.value >= LIFE_GAUGE_UNIT and lives + gained < LIFE_MAX:
                 self.value -= LIFE_GAUGE_UNIT
                 gained += 1
                 if LIFE_GAUGE_COOLDOWN > 0:
-                    self.cooldown_until = time.time() + LIFE_GAUGE_COOLDOWN
+                    self.cooldown_until = now + LIFE_GAUGE_COOLDOWN
                     break
         
         else:
@@ -1,163 +1,379 @@
 # mouthy_bird_game.py
-import cv2, time
+import time
+_T_START = time.perf_counter()   # 起動時間の計測の基準
+import argparse, json, os, random
+import cv2
+import numpy as np
 from config import *
-from detector_facemesh import FaceInputDetector
-from obstacles import spawn_pipe, update_pipes, check_score_and_collision
+# mediapipe を読む detector_facemesh / async_detector はメニュー表示後に読み込む（startup.py）
+from startup import BackgroundStartup
+from pipe_render import draw_pipe
 from bird_anim import BirdAnimator, overlay_image_alpha
-from life_gauge import LifeGauge
-import random
+from game_state import GameState, StepInput, StepRunner
+from signal_predictor import InputPredictor
 from difficulty_menu import show_difficulty_menu
 from game_over_menu import show_game_over_menu
+from hud import HudCompositor
+from frame_stats import FrameProfiler, CAPTURE, DETECT, UPDATE, DRAW, SHOW, WAIT
+from session_replay import (SessionRecorder, load_session, frame_time_stats,
+                            RESET_NONE, RESET_MENU, RESET_KEY)
 
-def draw_life_gauge(vis, ratio: float, lives: int):
+WINDOW_NAME = "flappy bird advanced"
+
+# HUD は値が変わったときだけタイルを描き直し、毎フレームは合成だけ（hud.py）
+HUD = HudCompositor()
+
+def draw_life_gauge(vis, ratio: float, lives: int, hud: HudCompositor = HUD):
     x, y, w, h = 16, 100, 180, 14
-    cv2.rectangle(vis, (x, y), (x+w, y+h), (60, 60, 60), 2, cv2.LINE_AA)
+    # 枠と文字はタイル（ライフが変わったときだけ描き直す）、中身の棒は毎フレーム直接描く
+    x0, y0 = x - 3, y - 48
+
+    def render(img, paint):
+        gx, gy = x - x0, y - y0
+        cv2.rectangle(img, (gx, gy), (gx+w, gy+h), paint((60, 60, 60)), 2, cv2.LINE_AA)
+        cv2.putText(img, f"Lives: {lives}", (gx, gy-25),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, paint((255, 255, 255)), 2, cv2.LINE_AA)
+        cv2.putText(img, "Heal", (gx+w+8, gy+h-19),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, paint((180, 255, 180)), 1, cv2.LINE_AA)
+    hud.widget(vis, "life_gauge", lives, x0, y0, w + 60, h + 52, render)
     fill_w = int(w * max(0.0, min(1.0, ratio)))
     cv2.rectangle(vis, (x+1, y+1), (x+1+fill_w, y+h-1), (90, 230, 90), -1, cv2.LINE_AA)
-    cv2.putText(vis, f"Lives: {lives}", (x, y-25),
-                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2, cv2.LINE_AA)
-    cv2.putText(vis, "Heal", (x+w+8, y+h-19),
-                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (180, 255, 180), 1, cv2.LINE_AA)
-
-def main():
-    difficulty = show_difficulty_menu()
-    params = DIFFICULTY_PRESETS[difficulty]
-    print(f"difficulty: {difficulty}")
 
-    GRAVITY = params["gravity"]
-    THRUST = params["thrust"]
-    spawn_interval_min = params["spawn_interval_min"]
-    spawn_interval_max = params["spawn_interval_max"]
-    SCROLL_SPEED = params["scroll_speed"]
-    PIPE_GAP_H = params["pipe_gap_h"]
+def draw_player_hud(vis, state: GameState, player: int, hud: HudCompositor = HUD):
+    """複数人プレイの HUD（プレイヤーごとに1行：スコア・ライフ・ゲージ）"""
+    b = state.birds[player]
+    color = PLAYER_COLORS[player % len(PLAYER_COLORS)]
+    y = 32 + 30 * player
+    hud.text(vis, f"P{player + 1}  {b.score}  x{b.lives}", (16, y),
+             0.7, color, 2, cv2.LINE_AA)
+    x, w = 170, 100
+    fill_w = int(w * max(0.0, min(1.0, b.life_gauge.fill_ratio())))
+    cv2.rectangle(vis, (x, y-12), (x+w, y), (60, 60, 60), 1)
+    cv2.rectangle(vis, (x, y-12), (x+fill_w, y), color, -1)
+
+def draw_game(vis, state: GameState, birds, runner: StepRunner = None):
+    """
+    GameState をフレームに描く（パイプ・鳥・HUD）。birds はプレイヤーごとの BirdAnimator。
+    runner を渡すと、鳥とパイプは固定刻みの間を補間した位置に描く
+    """
+    now = state.now()
+
+    if not state.game_over:
+        dx = runner.pipe_offset() if runner is not None else 0.0
+        for p in state.pipes:
+            draw_pipe(vis, p.x + dx, p.gap_y, p.w, p.gap_h)
 
+    for i, b in enumerate(state.birds):
+        alive = b.lives > 0
+        if not alive and len(state.birds) > 1 and not state.game_over:
+            continue   # 複数人では脱落した鳥は消す
+        flicker_on = True
+        if state.is_invincible(i) and alive:
+            flicker_on = (int(now * 10) % 2 ==0)
+        if flicker_on:
+            bird_img = birds[i].get_frame() if alive else birds[i].get_frame(alive=False)
+            x = PLAYER_X - bird_img.shape[1] // 2 - 20
+            y = runner.bird_y(i) if runner is not None else b.y
+            y_top = int(y) - bird_img.shape[0] // 2 - 20
+            vis = overlay_image_alpha(vis, bird_img, x, y_top)
+
+    if len(state.birds) > 1:
+        for i in range(len(state.birds)):
+            draw_player_hud(vis, state, i)
+        return vis
+
+    lives = state.lives
+    # スコア
+    HUD.text(vis, f"Score: {state.score}", (16, 36), 0.9, (255,255,255), 2)
+    draw_life_gauge(vis, state.life_gauge.fill_ratio(), lives)
+
+    if state.is_invincible() and lives > 0:
+        # 0.1秒刻みの表示なので、タイルの描き直しも0.1秒に1回
+        HUD.text(vis, f"Invincible: {state.invincible_until - now:.1f}s",
+                 (16, 132), 0.8, (80, 220, 255), 2)
+    return vis
+
+def make_birds(difficulty: str, players: int):
+    """P1 は難易度の鳥、P2 以降は他の難易度の鳥を順に使って見分けられるようにする"""
+    skins = list(BIRD_IMG)
+    first = skins.index(difficulty)
+    return [BirdAnimator(difficulty=skins[(first + i) % len(skins)]) for i in range(players)]
+
+def main(record=None, record_video=False, seed=None, profile=False, players=1):
+    # メニューを出している間に MediaPipe・FaceMesh・カメラを用意する
+    # 非同期推論では最新フレームしか推論しないので、間引きは同期時だけ使う
+    # 複数人プレイは FaceMesh 1回で全員を見る同期推論だけ（非同期・ROI追跡は1人用）
+    use_async = ASYNC_INFERENCE and players == 1
+    use_process = use_async and INFER_PROCESS
+    boot = BackgroundStartup(_T_START, adaptive=INFER_ADAPTIVE and not use_async,
+                             players=players, process=use_process).start()
+    difficulty = show_difficulty_menu(on_shown=lambda: boot.mark("first_menu"))
+    print(f"difficulty: {difficulty}")
 
-    cap = cv2.VideoCapture(0)
+    cap, detector = boot.wait()
     if not cap.isOpened():
         print("Camera open failed.")
+        detector.close()
         return
+    print("capture size: {}x{}".format(*cap.frame_size))
+
+    if use_process:
+        async_det = detector   # 推論プロセスは起動時に立ち上がっている
+    elif use_async:
+        from async_detector import AsyncFaceInputDetector
+        async_det = AsyncFaceInputDetector(detector).start()
+    else:
+        async_det = None
+    birds = make_birds(difficulty, players)
+    if seed is None:
+        seed = random.randrange(2**31)
+    state = GameState(difficulty=difficulty, seed=seed, n_players=players)
+    # 物理は FIXED_STEP_HZ の固定刻み（描画が遅くても速くても同じ動き）
+    runner = StepRunner(state)
 
-    detector = FaceInputDetector(draw_mesh=False)
-    bird = BirdAnimator(difficulty=difficulty)
-    life_gauge = LifeGauge(difficulty=difficulty)
-
-    y = WIN_H * 0.5
-    vy = 0.0
-    pipes = []
-    time_from_spawn = 0.0
-    next_spawn = random.uniform(spawn_interval_min, spawn_interval_max)
-    score = 0
-    lives = 3
-    invincible_until = 0.0
     last_t = time.time()
+    recorder = None
+    if record:
+        recorder = SessionRecorder(record, seed=seed, difficulty=difficulty, t0=last_t, video=record_video,
+                                   step_hz=runner.hz)
+    # 'p' でHUD表示、--profile で data/perf へ定期書き出し
+    prof = FrameProfiler(export=profile)
+    # 検出結果を平滑化し、表示される時刻の口・目の状態を予測する（1人用）
+    predictor = InputPredictor() if INPUT_PREDICT and players == 1 else None
+    last_seq = -1
+    bg = None
+    canvas = np.empty((WIN_H, WIN_W, 3), dtype=np.uint8)
+    playable = False   # 検出結果が入った最初のフレームを表示したか
 
     try:
         while True:
-            ok, frame = cap.read()
-            if not ok:
-                break
-
-            vis, mouth_open, eyes_closed, mar, ear = detector.process(frame)
+            frame_start = time.time()
+            prof.begin()
+            if async_det is None:
+                captured = cap.read_frame(timeout=5.0)
+                prof.mark(CAPTURE)
+                if captured is None:
+                    break
+                if players > 1:
+                    vis, faces = detector.process(captured.image)
+                    mouth_open, eyes_closed, mar, ear = faces.mouth_open, faces.eyes_closed, faces.mar, faces.ear
+                else:
+                    vis, mouth_open, eyes_closed, mar, ear = detector.process(captured.image)
+                t_input = captured.t_capture
+            else:
+                # 描画は待たずに最新フレーム＋最新の推論結果で進める
+                captured = cap.latest() if bg is not None else cap.read_frame(timeout=5.0)
+                prof.mark(CAPTURE)
+                if captured is None:
+                    break
+                if captured.seq != last_seq:
+                    last_seq = captured.seq
+                    if use_process:
+                        # 前処理の出力先が共有メモリの枠。推論側と同じ画素を背景にも使う
+                        bg = async_det.submit(captured)
+                    else:
+                        async_det.submit(captured)
+                        bg = detector.prepare(captured.image)
+                np.copyto(canvas, bg)
+                vis = canvas
+                res = async_det.latest()
+                mouth_open, eyes_closed, mar, ear = res.mouth_open, res.eyes_closed, res.mar, res.ear
+                detector.draw_debug(vis, mar, ear, lag_s=res.age() if res.seq >= 0 else None)
+                t_input = res.t_capture if res.seq >= 0 else None
+            if predictor is not None and t_input is not None:
+                mouth_open, eyes_closed, _, _ = predictor(mar, ear, t_input, time.time())
+            prof.mark(DETECT)
 
             now = time.time()
-            dt = min(now - last_t, DT_CLAMP)
+            dt = now - last_t
             last_t = now
-            is_invincible = now < invincible_until
-
-            if lives > 0:
-                # 物理更新
-                ay = -THRUST if mouth_open else GRAVITY
-                vy += ay * dt
-                y  += vy * dt
-
-                # 画面端で止める
-                if y < RADIUS:
-                    y, vy = RADIUS, 0.0
-                if y > WIN_H - RADIUS:
-                    y, vy = WIN_H - RADIUS, 0.0
-
-                # パイプ生成・更新
-                time_from_spawn += dt
-
-                while time_from_spawn >= next_spawn:
-                    time_from_spawn -= next_spawn
-                    pipes.append(spawn_pipe(WIN_W + 20, PIPE_GAP_H))
-                    next_spawn = random.uniform(spawn_interval_min, spawn_interval_max)
-
-                pipes = update_pipes(pipes, dt, SCROLL_SPEED)
-                for p in pipes:
-                    p.draw(vis)
-
-                # スコア・衝突判定
-                inc, hit = check_score_and_collision(pipes, PLAYER_X, int(y))
-                score += inc
-                if hit and not is_invincible:
-                    lives -= 1
-                    invincible_until = now + INVINCIBLE_S
-
-                gained = life_gauge.update(eyes_closed=eyes_closed, dt=dt, lives=lives)
-                if gained > 0:
-                    lives = min(LIFE_MAX, lives + gained)
 
+            reset = RESET_NONE
+            if not state.game_over:
+                if players > 1:
+                    runner.advance([StepInput(mouth_open=bool(m), eyes_closed=bool(e))
+                                    for m, e in zip(mouth_open, eyes_closed)], dt)
+                else:
+                    runner.advance([StepInput(mouth_open=mouth_open, eyes_closed=eyes_closed)], dt)
             else:
                 # When lives drop to zero, invoke the game-over menu
                 # The menu will return either 'restart' or 'quit'
-                choice = show_game_over_menu(score, difficulty, window_name="flappy bird advanced")
+                # 複数人プレイは最高得点のプレイヤーの点を記録する
+                top = max(b.score for b in state.birds)
+                choice = show_game_over_menu(top, difficulty, window_name=WINDOW_NAME,
+                                             duration_s=state.run_time)
                 if choice == 'restart':
                     # reset game state (same as pressing 'r')
-                    y = WIN_H * 0.5
-                    vy = 0.0
-                    pipes.clear()
-                    time_from_spawn = 0.0
-                    score = 0
-                    lives = 3
-                    invincible_until = 0.0
-                    life_gauge = LifeGauge(difficulty=difficulty)
+                    state.reset()
+                    runner.reset()
+                    last_t = time.time()   # メニューにいた時間を次のフレームの dt に入れない
+                    reset = RESET_MENU
                     # continue main loop
                 else:
                     # quit chosen: break out of the game loop and end
                     break
+            prof.mark(UPDATE)
 
-            flicker_on = True
-
-            if is_invincible and lives > 0:
-                flicker_on = (int(now * 10) % 2 ==0)
-
-            if flicker_on:
-                bird_img = bird.get_frame() if lives > 0 else bird.get_frame(alive=False)
-                x = PLAYER_X - bird_img.shape[1] // 2 - 20
-                y_top = int(y) - bird_img.shape[0] // 2 - 20
-                vis = overlay_image_alpha(vis, bird_img, x, y_top)
+            vis = draw_game(vis, state, birds, runner)
+            prof.draw_hud(vis)
+            prof.mark(DRAW)
 
-            # スコア
-            cv2.putText(vis, f"Score: {score}", (16, 36),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.9, (255,255,255), 2)
-            draw_life_gauge(vis, life_gauge.fill_ratio(), lives)
-            
-            if is_invincible and lives > 0:
-                cv2.putText(vis, f"Invincible: {invincible_until - now:.1f}s",
-                            (16, 132), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (80, 220, 255), 2)
+            cv2.imshow(WINDOW_NAME, vis)
+            prof.mark(SHOW)
+            if not playable and t_input is not None:
+                playable = True
+                boot.mark("first_playable_frame")
+                boot.report(export=profile)
 
-            cv2.imshow("flappy bird advanced", vis)
-
-            # キー操作
-            key = cv2.waitKey(1) & 0xFF
+            # キー操作（非同期時は RENDER_FPS に合わせて待つ）
+            wait_ms = 1
+            if async_det is not None:
+                wait_ms = max(1, int((frame_start + 1.0 / RENDER_FPS - time.time()) * 1000))
+            key = cv2.waitKey(wait_ms) & 0xFF
+            prof.mark(WAIT)
+            if predictor is not None:
+                predictor.displayed(time.time())
+            # 画面の更新は waitKey 中に行われるので、入力遅延はここまでを数える
+            prof.end(t_input)
             if key in [27, ord('q')]:
                 break
             if key == ord('r'):
-                y = WIN_H * 0.5
-                vy = 0.0
-                pipes.clear()
-                time_from_spawn = 0.0
-                score = 0
-                lives = 3
-                invincible_until = 0.0
-                life_gauge = LifeGauge(difficulty=difficulty)
+                state.reset()
+                runner.reset()
+                last_t = time.time()
+                reset |= RESET_KEY   # メニューのリスタートと同じフレームなら両方を記録する
+            if key == ord('p'):
+                prof.toggle_hud()
+
+            if recorder is not None:
+                recorder.add(now, mar, ear, mouth_open, eyes_closed, reset, image=captured.image,
+                             t_input=t_input, t_resume=last_t if reset else None)
 
     finally:
-        detector.close()
+        prof.close()
+        if recorder is not None:
+            recorder.close()
+            print(f"session saved: {recorder.path} ({len(recorder)} frames, seed {seed})")
+        if detector.scheduler is not None:
+            print("inference scheduler:", detector.scheduler.stats())
+        if async_det is not None:
+            async_det.close()
+        else:
+            detector.close()
         cap.release()
         cv2.destroyAllWindows()
 
+def replay(path, through_detector=False, headless=False, report=None):
+    """
+    記録したセッションを再生する。乱数の種・フレームごとの dt・物理の刻み方は記録どおりなので、
+    同じ入力なら毎回同じ進行になる（フレーム処理時間だけがビルドごとに変わる）。
+    through_detector: 記録した動画を FaceMesh に通す（False なら記録した入力をそのまま使う）
+    戻り値: 最後のスコア・ライフ・ゲーム内時刻とフレーム処理時間の統計
+    """
+    session = load_session(path)
+    state = GameState(difficulty=session.difficulty, seed=session.seed)
+    runner = StepRunner(state, hz=session.step_hz)
+    bird = BirdAnimator(difficulty=session.difficulty)
+
+    cap = detector = None
+    if through_detector:
+        from camera_capture import LatestFrameCapture
+        from detector_facemesh import FaceInputDetector
+        if session.video_path is None or not os.path.exists(session.video_path):
+            print("This session has no video (record with --record-video).")
+            return
+        cap = LatestFrameCapture(session.video_path, pace=False, lossless=True).start()
+        # 間引きは壁時計に依存するので再生では使わない
+        detector = FaceInputDetector(draw_mesh=False, adaptive=False)
+    blank = np.full((WIN_H, WIN_W, 3), 90, dtype=np.uint8)
+
+    frame_s = []
+    last_t = session.t0
+    try:
+        for i in range(len(session)):
+            frame_start = time.perf_counter()
+            if detector is not None:
+                captured = cap.read_frame(timeout=5.0)
+                if captured is None:
+                    break
+                vis, mouth_open, eyes_closed, mar, ear = detector.process(captured.image)
+            else:
+                vis = blank.copy()
+                mouth_open = bool(session.mouth_open[i])
+                eyes_closed = bool(session.eyes_closed[i])
+
+            now = float(session.t[i])
+            dt = now - last_t
+            last_t = now
+
+            reset = int(session.reset[i])
+            if state.lives > 0:
+                runner.advance([StepInput(mouth_open=mouth_open, eyes_closed=eyes_closed)], dt)
+            elif reset & RESET_MENU:
+                state.reset()
+                runner.reset()
+            else:
+                break
+
+            vis = draw_game(vis, state, [bird], runner)
+            frame_s.append(time.perf_counter() - frame_start)
+
+            if not headless:
+                cv2.imshow(WINDOW_NAME, vis)
+                if cv2.waitKey(1) & 0xFF in [27, ord('q')]:
+                    break
+            if reset & RESET_KEY:
+                state.reset()
+                runner.reset()
+            if not np.isnan(session.t_resume[i]):
+                last_t = float(session.t_resume[i])
+    finally:
+        if detector is not None:
+            detector.close()
+            cap.release()
+        if not headless:
+            cv2.destroyAllWindows()
+
+    stats = frame_time_stats(frame_s)
+    print(f"replay: {stats['frames']}/{len(session)} frames, score {state.score}, lives {state.lives}")
+    if stats["frames"]:
+        print("frame time [ms]: " + ", ".join(f"{k[:-3]} {v:.2f}" for k, v in stats.items() if k.endswith("_ms")))
+    if report:
+        with open(report, "w") as f:
+            json.dump({"session": path, "through_detector": through_detector,
+                       "score": state.score, "lives": state.lives, **stats}, f, indent=2)
+    return {"score": state.score, "lives": state.lives, "t": state.t, **stats}
+
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description="Mouthy Bird")
+    ap.add_argument("--record", metavar="PATH", help="save inputs of this session to PATH.npz")
+    ap.add_argument("--record-video", action="store_true", help="also save camera frames to PATH.mp4")
+    ap.add_argument("--profile", action="store_true",
+                    help="export frame timing to data/perf periodically ('p' toggles the HUD)")
+    ap.add_argument("--players", type=int, default=1, choices=range(1, 5), metavar="N",
+                    help="number of players (1-4), one face each in front of the same camera")
+    ap.add_argument("--seed", type=int, default=None, help="seed for pipe spawning (random if omitted)")
+    ap.add_argument("--replay", metavar="PATH", help="replay a recorded session instead of using the camera")
+    ap.add_argument("--through-detector", action="store_true",
+                    help="replay: run the recorded video through FaceMesh")
+    ap.add_argument("--headless", action="store_true", help="replay: do not open a window")
+    ap.add_argument("--report", metavar="JSON", help="replay: write frame-time stats to JSON")
+    args = ap.parse_args(argv)
+    if args.record_video and not args.record:
+        ap.error("--record-video requires --record")
+    if not args.replay and (args.headless or args.through_detector or args.report):
+        ap.error("--headless/--through-detector/--report require --replay")
+    if args.players > 1 and (args.record or args.replay):
+        ap.error("--record/--replay support a single player only")
+    return args
+
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.replay:
+        replay(args.replay, through_detector=args.through_detector, headless=args.headless,
+               report=args.report)
+    else:
+        main(record=args.record, record_video=args.record_video, seed=args.seed, profile=args.profile,
+             players=args.players)
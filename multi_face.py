@@ -0,0 +1,144 @@
+# multi_face.py
+# 複数人プレイ用の入力：FaceMesh を max_num_faces=N で1回だけ回し、
+# 全員の EAR/MAR を1回の配列演算で求め、顔の位置で毎フレーム同じプレイヤー番号に割り当てる
+import itertools
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+import mediapipe as mp
+
+from config import EAR_CLOSE_THRESH, EAR_OPEN_THRESH, MAR_OPEN_THRESH, INFER_W, INFER_H, PLAYER_COLORS
+from face_features import FEATURE_IDX, FACE_BOX_IDX, ear_mar
+from frame_prep import FramePreprocessor
+
+_GATHER_IDX = FEATURE_IDX.tolist() + FACE_BOX_IDX
+_N_FEATURE = len(FEATURE_IDX)
+
+@dataclass
+class MultiFaceResult:
+    present: np.ndarray       # (N,) bool このフレームで顔が見つかったか
+    mouth_open: np.ndarray    # (N,) bool
+    eyes_closed: np.ndarray   # (N,) bool（FaceInputDetector と同じく更新前の状態）
+    mar: np.ndarray           # (N,) float32
+    ear: np.ndarray           # (N,) float32
+    centers: np.ndarray       # (N, 2) 最後に見えた顔の中心（表示座標、未登場は nan）
+
+
+def match_faces(slots: np.ndarray, faces: np.ndarray) -> List[int]:
+    """
+    slots: (N, 2) 各プレイヤーの最後の顔の中心（未登場は nan）
+    faces: (F, 2) 今回見つかった顔の中心（F <= N）
+    戻り値: 顔ごとのプレイヤー番号。移動距離の2乗和が最小になる割り当て（N<=4 なので総当たり）
+    """
+    n, f = len(slots), len(faces)
+    if f == 0:
+        return []
+    known = ~np.isnan(slots[:, 0])
+    if not known.any():
+        # 初回は左から順に P1, P2, ...
+        order = np.argsort(faces[:, 0])
+        out = [0] * f
+        for rank, fi in enumerate(order):
+            out[fi] = rank
+        return out
+    d2 = ((faces[:, None, :] - slots[None, :, :]) ** 2).sum(axis=-1)   # (F, N)
+    # まだ誰もいない枠はどの顔からも遠い扱い（既知の枠を優先して使う）
+    far = np.nanmax(d2) + 1.0 if np.isfinite(np.nanmax(d2)) else 1.0
+    d2 = np.where(known[None, :], d2, far * 4.0)
+    best, best_cost = None, np.inf
+    for perm in itertools.permutations(range(n), f):
+        cost = d2[np.arange(f), perm].sum()
+        if cost < best_cost:
+            best, best_cost = perm, cost
+    return list(best)
+
+
+class MultiFaceInputDetector:
+    """
+    FaceInputDetector の複数人版。infer() は MultiFaceResult を返す。
+    人数が増えても FaceMesh は1回、EAR/MAR も (N, 18, 2) の1回の計算で済む
+    """
+    def __init__(self, n_players: int = 2, infer_size: Tuple[int, int] = (INFER_W, INFER_H)):
+        self.n = n_players
+        self.infer_w, self.infer_h = infer_size
+        self.prep = FramePreprocessor()
+        self.mesh = mp.solutions.face_mesh.FaceMesh(
+            max_num_faces=n_players, refine_landmarks=True,
+            min_detection_confidence=0.5, min_tracking_confidence=0.5
+        )
+        self.eyes_closed = np.zeros(n_players, dtype=bool)
+        self.centers = np.full((n_players, 2), np.nan, dtype=np.float32)
+        self.scheduler = None   # 単独プレイ用の間引きは使わない
+
+    def warm_up(self):
+        self.mesh.process(np.zeros((self.infer_h, self.infer_w, 3), dtype=np.uint8))
+
+    def prepare(self, frame) -> np.ndarray:
+        """カメラ画像を表示サイズにリサイズし、鏡像にする（戻り値のバッファは次の呼び出しで上書き）"""
+        return self.prep(frame)
+
+    def to_infer_rgb(self, frame) -> np.ndarray:
+        h, w = frame.shape[:2]
+        scale = min(1.0, self.infer_w / w, self.infer_h / h)
+        if scale < 1.0:
+            size = (max(1, round(w * scale)), max(1, round(h * scale)))
+            small = self.prep.buffer("infer_small", (size[1], size[0], 3))
+            cv2.resize(frame, size, dst=small, interpolation=cv2.INTER_AREA)
+            frame = small
+        rgb = self.prep.buffer("infer_rgb", frame.shape)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+        return rgb
+
+    def infer(self, frame) -> MultiFaceResult:
+        h, w = frame.shape[:2]
+        res = self.mesh.process(self.to_infer_rgb(frame))
+        faces = res.multi_face_landmarks or []
+
+        n = self.n
+        present = np.zeros(n, dtype=bool)
+        mar = np.zeros(n, dtype=np.float32)
+        ear = np.zeros(n, dtype=np.float32)
+        if faces:
+            # 全員分の18点＋外接矩形4点を (F, 22, 2) にまとめて1回で計算する
+            pts = np.array([[(lm[i].x, lm[i].y) for i in _GATHER_IDX] for lm in (f.landmark for f in faces)],
+                           dtype=np.float32)
+            pts *= (w, h)
+            f_ear, f_mar = ear_mar(pts[:, :_N_FEATURE])
+            box = pts[:, _N_FEATURE:]
+            f_center = (box.min(axis=1) + box.max(axis=1)) * 0.5
+
+            slots = match_faces(self.centers, f_center)
+            present[slots] = True
+            ear[slots] = f_ear
+            mar[slots] = f_mar
+            self.centers[slots] = f_center
+
+        # 目のヒステリシス（見えていない人は前の状態のまま）
+        closed = np.where(self.eyes_closed, ear <= EAR_OPEN_THRESH, ear < EAR_CLOSE_THRESH)
+        prev_closed = self.eyes_closed.copy()
+        self.eyes_closed = np.where(present, closed, self.eyes_closed)
+        mouth_open = present & (mar > MAR_OPEN_THRESH)
+        # 単独プレイ（FaceInputDetector.infer）と同じく、目の状態は更新前の値を返す
+        return MultiFaceResult(present=present, mouth_open=mouth_open, eyes_closed=prev_closed,
+                               mar=mar, ear=ear, centers=self.centers.copy())
+
+    def draw_debug(self, frame, result: MultiFaceResult):
+        """各プレイヤーの顔の上に番号と MAR/EAR を描く"""
+        for i in range(self.n):
+            if not result.present[i]:
+                continue
+            cx, cy = result.centers[i]
+            cv2.putText(frame, f"P{i + 1} M{result.mar[i]:.2f} E{result.ear[i]:.2f}",
+                        (int(cx) - 70, max(20, int(cy) - 90)), cv2.FONT_HERSHEY_SIMPLEX, 0.6,
+                        PLAYER_COLORS[i % len(PLAYER_COLORS)], 2, cv2.LINE_AA)
+
+    def process(self, frame) -> Tuple[np.ndarray, MultiFaceResult]:
+        frame = self.prepare(frame)
+        result = self.infer(frame)
+        self.draw_debug(frame, result)
+        return frame, result
+
+    def close(self):
+        self.mesh.close()
@@ -1,6 +1,7 @@
 # obstacles.py
-import cv2
+# パイプの状態と当たり判定（描画は pipe_render.py）
 import random
+import numpy as np
 from dataclasses import dataclass, field
 from typing import List
 from config import WIN_W, WIN_H, SCROLL_SPEED, PIPE_WIDTH, PIPE_GAP_H, PIPE_GAP_MIN_Y, PIPE_GAP_MAX_Y, PLAYER_X, RADIUS
@@ -13,39 +14,30 @@ def circle_rect_collision(cx, cy, r, rx, ry, rw, rh) -> bool:
     dy = cy - nearest_y
     return (dx*dx + dy*dy) <= (r*r)
 
+def circle_rect_collision_np(cx, cy, r, rx, ry, rw, rh) -> np.ndarray:
+    # circle_rect_collision の配列版（引数はブロードキャストされる）
+    nearest_x = np.maximum(rx, np.minimum(cx, rx + rw))
+    nearest_y = np.maximum(ry, np.minimum(cy, ry + rh))
+    dx = cx - nearest_x
+    dy = cy - nearest_y
+    return (dx*dx + dy*dy) <= (r*r)
 
-def _clamp(v, lo, hi):
-    return max(lo, min(hi, v))
-
-def _shift_color(bgr, db=0, dg=0, dr=0):
-    # BGR各チャンネルをシフトしてクリップ
-    b, g, r = bgr
-    return (_clamp(b+db, 0, 255), _clamp(g+dg, 0, 255), _clamp(r+dr, 0, 255))
-
-def _draw_vertical_cylinder(frame, x, y0, y1, w, base, outline, line_aa=cv2.LINE_AA):
+def pipe_rects_np(x, gap_y, gap_h):
     """
-    y0〜y1の縦パイプ胴体を描く（円筒っぽい2トーン＋ハイライト帯＋外周線）
+    Pipe.collide_circle と同じ上下の矩形を配列で返す
+    戻り値: rx, top_h, bot_y, bot_h（幅は PIPE_WIDTH 固定）
     """
-    x0, x1 = int(x), int(x + w)
-    y0, y1 = int(y0), int(y1)
-    if y1 <= y0: 
-        return
-
-    # 胴体ベース
-    cv2.rectangle(frame, (x0, y0), (x1, y1), base, -1)
-
-    # 右側を少し暗めにして円筒陰影
-    dark = _shift_color(base, db=-20, dg=-40, dr=-20)
-    cv2.rectangle(frame, (x0 + int(w*0.65), y0), (x1, y1), dark, -1)
-
-    # 左側に細いハイライト帯
-    light = _shift_color(base, db=+30, dg=+55, dr=+30)
-    hl_x0 = x0 + int(w*0.08)
-    hl_x1 = x0 + int(w*0.16)
-    cv2.rectangle(frame, (hl_x0, y0), (hl_x1, y1), light, -1)
-
-    # 外周アウトライン
-    cv2.rectangle(frame, (x0, y0), (x1, y1), outline, 2, lineType=line_aa)
+    rx = np.trunc(x)
+    top_h = np.trunc(gap_y - gap_h/2)
+    bot_y = np.trunc(gap_y + gap_h/2)
+    return rx, top_h, bot_y, WIN_H - bot_y
+
+def collide_pipes_np(cx, cy, r, x, gap_y, gap_h, w=PIPE_WIDTH) -> np.ndarray:
+    """円と複数パイプ（上下の矩形）の当たり判定。x, gap_y の形の bool 配列を返す"""
+    rx, top_h, bot_y, bot_h = pipe_rects_np(x, gap_y, gap_h)
+    hit_top = (top_h > 0) & circle_rect_collision_np(cx, cy, r, rx, 0, w, top_h)
+    hit_bot = (bot_h > 0) & circle_rect_collision_np(cx, cy, r, rx, bot_y, w, bot_h)
+    return hit_top | hit_bot
 
 @dataclass
 class Pipe:
@@ -55,30 +47,9 @@ class Pipe:
     gap_h: int = PIPE_GAP_H
     passed: bool = False
 
-    # 見た目の個体差（明度少しランダム）
-    def _colors(self):
-        base = (60, 180, 60)    # BGR
-        outline = (40, 120, 40)
-        jitter = 0
-        base = _shift_color(base, dg=jitter, db=jitter//2, dr=jitter//3)
-        return base, outline
-
     def offscreen(self) -> bool:
         return self.x + self.w < 0
 
-    def draw(self, frame):
-        base, outline = self._colors()
-        top_h = int(self.gap_y - self.gap_h/2)
-        bot_y = int(self.gap_y + self.gap_h/2)
-
-        # --- 上パイプ（上からギャップまで） ---
-        if top_h > 0:
-            _draw_vertical_cylinder(frame, self.x, 0, top_h, self.w, base, outline)
-
-        # --- 下パイプ（ギャップから下端まで） ---
-        if bot_y < WIN_H:
-            _draw_vertical_cylinder(frame, self.x, bot_y, WIN_H, self.w, base, outline)
-
     def collide_circle(self, cx: int, cy: int, r: int) -> bool:
         top_rect = (int(self.x), 0, self.w, int(self.gap_y - self.gap_h/2))
         bot_rect = (int(self.x), int(self.gap_y + self.gap_h/2), self.w, WIN_H - int(self.gap_y + self.gap_h/2))
@@ -88,8 +59,8 @@ class Pipe:
         if rh > 0 and circle_rect_collision(cx, cy, r, rx, ry, rw, rh): return True
         return False
 
-def spawn_pipe(x: float, gap_h) -> Pipe:
-    gy = random.randint(PIPE_GAP_MIN_Y, PIPE_GAP_MAX_Y)
+def spawn_pipe(x: float, gap_h, rng=random) -> Pipe:
+    gy = rng.randint(PIPE_GAP_MIN_Y, PIPE_GAP_MAX_Y)
     return Pipe(x=float(x), gap_y=float(gy), gap_h=gap_h)
 
 def update_pipes(pipes: List[Pipe], dt: float, scroll_speed: float):
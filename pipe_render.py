@@ -0,0 +1,188 @@
+# pipe_render.py
+# パイプの描画（状態と当たり判定は obstacles.py）
+import cv2
+import numpy as np
+from collections import OrderedDict
+from dataclasses import dataclass
+from config import WIN_H, PIPE_WIDTH, PIPE_GAP_H
+
+def _clamp(v, lo, hi):
+    return max(lo, min(hi, v))
+
+def _shift_color(bgr, db=0, dg=0, dr=0):
+    # BGR各チャンネルをシフトしてクリップ
+    b, g, r = bgr
+    return (_clamp(b+db, 0, 255), _clamp(g+dg, 0, 255), _clamp(r+dr, 0, 255))
+
+def _draw_vertical_cylinder(frame, x, y0, y1, w, base, outline, line_aa=cv2.LINE_AA):
+    """
+    y0〜y1の縦パイプ胴体を描く（円筒っぽい2トーン＋ハイライト帯＋外周線）
+    """
+    _draw_cylinder_px(frame, int(x), int(x + w), int(y0), int(y1), w, base, outline, line_aa)
+
+def _draw_cylinder_px(frame, x0, x1, y0, y1, w, base, outline, line_aa=cv2.LINE_AA):
+    """
+    画素座標で描く本体。右端 x1 は int(x + w) なので、x が負の小数だと x0 + w より1つ左になる
+    """
+    if y1 <= y0:
+        return
+
+    # 胴体ベース
+    cv2.rectangle(frame, (x0, y0), (x1, y1), base, -1)
+
+    # 右側を少し暗めにして円筒陰影
+    dark = _shift_color(base, db=-20, dg=-40, dr=-20)
+    cv2.rectangle(frame, (x0 + int(w*0.65), y0), (x1, y1), dark, -1)
+
+    # 左側に細いハイライト帯
+    light = _shift_color(base, db=+30, dg=+55, dr=+30)
+    hl_x0 = x0 + int(w*0.08)
+    hl_x1 = x0 + int(w*0.16)
+    cv2.rectangle(frame, (hl_x0, y0), (hl_x1, y1), light, -1)
+
+    # 外周アウトライン
+    cv2.rectangle(frame, (x0, y0), (x1, y1), outline, 2, lineType=line_aa)
+
+# --- パイプ画像のキャッシュ ---
+# 胴体は縦方向に一様なので「上端」「1行」「下端」だけを1度描いておき、
+# 描画時は上端・下端を矩形ごと合成し、間は1行を縦に並べる（タイル）。
+# 合成は bird_anim.Sprite と同じ前乗算アルファ（out = 前乗算の色 + 背景 * (255 - 被覆率) / 255、最も近い整数に丸め）。
+# タイルは不透明な列の連続区間をスライスでコピーし（np.copyto(where=) は遅い）、
+# AAの縁の列だけ列ごとの変換表（cv2.LUT）で合成する。
+PIPE_BASE = (60, 180, 60)      # BGR
+PIPE_OUTLINE = (40, 120, 40)
+PIPE_SPRITE_CACHE_MAX = 16     # キャッシュする (幅, 色) の組の上限
+
+_SPRITE_PAD = 3    # AAの外周線が矩形の外にはみ出す分
+_SPRITE_EDGE = 6   # 上端/下端として別に持つ矩形内側の行数（外周線を含む）
+_SPRITE_BODY = 24  # テンプレートの胴体の高さ
+
+@dataclass
+class PipeSection:
+    img: np.ndarray     # (h, W, 3) uint8。前乗算済みの色（不透明な画素はそのままの色）
+    inv: np.ndarray     # (h, W, 3) uint8。255 - 被覆率
+    # 以下は胴体の1行だけ（上端・下端は空）
+    runs: list          # 不透明な画素の [(行, 開始列, 終了列)]
+    edge_luts: list     # AAの縁（0 < 被覆率 < 255）の [(列, 背景 -> 出力の変換表 (256, 1, 3))]
+
+@dataclass
+class PipeSprite:
+    head: PipeSection   # 上端 PAD+EDGE 行
+    row: PipeSection    # 胴体の1行（縦に並べる）
+    tail: PipeSection   # 下端 EDGE+PAD 行
+
+def _mask_runs(mask: np.ndarray) -> list:
+    """bool マスクを行ごとの連続区間 (r, c0, c1) のリストにする"""
+    runs = []
+    for r in range(mask.shape[0]):
+        m = np.concatenate(([False], mask[r], [False])).astype(np.int8)
+        edges = np.flatnonzero(np.diff(m))
+        runs.extend((r, int(c0), int(c1)) for c0, c1 in zip(edges[::2], edges[1::2]))
+    return runs
+
+_pipe_sprites: "OrderedDict[tuple, PipeSprite]" = OrderedDict()
+
+def _render_pipe_sprite(w, span, base, outline) -> PipeSprite:
+    """span: 画面上の幅 int(x + w) - int(x)（w か w - 1）"""
+    p = _SPRITE_PAD
+    H = p + _SPRITE_BODY + 1 + p
+    W = p + span + 1 + p
+    black = np.zeros((H, W, 3), dtype=np.uint8)
+    white = np.full((H, W, 3), 255, dtype=np.uint8)
+    for canvas in (black, white):
+        _draw_cylinder_px(canvas, p, p + span, p, p + _SPRITE_BODY, w, base, outline)
+
+    # 黒地と白地の差から被覆率を出す（AAの縁だけ中間の値になる）。
+    # 黒地に描いた色がそのまま前乗算済みの色（色 * 被覆率 / 255）になる
+    inv = (white.astype(np.int16) - black.astype(np.int16)).max(axis=2)
+    opaque = inv == 0
+    edge = (inv > 0) & (inv < 255)
+    inv = np.repeat(inv.astype(np.uint8)[:, :, None], 3, axis=2)
+    bg = np.arange(256, dtype=np.int32)[:, None, None]
+
+    def section(r0, r1):
+        runs, luts = [], []
+        if r1 - r0 == 1:
+            runs = _mask_runs(opaque[r0:r1])
+            for c in np.flatnonzero(edge[r0]):
+                v = bg * int(inv[r0, c, 0]) + 128   # Sprite.blit と同じ v / 255 の丸め
+                luts.append((int(c), (((v + (v >> 8)) >> 8) + black[r0, c]).astype(np.uint8)))
+        return PipeSection(img=black[r0:r1].copy(), inv=inv[r0:r1].copy(), runs=runs, edge_luts=luts)
+
+    head_end = p + _SPRITE_EDGE
+    tail_start = p + _SPRITE_BODY + 1 - _SPRITE_EDGE
+    mid = p + _SPRITE_BODY // 2
+    return PipeSprite(head=section(0, head_end), row=section(mid, mid + 1), tail=section(tail_start, H))
+
+def get_pipe_sprite(w, base, outline, span=None) -> PipeSprite:
+    span = int(w) if span is None else int(span)
+    key = (int(w), span, tuple(base), tuple(outline))
+    spr = _pipe_sprites.get(key)
+    if spr is None:
+        spr = _render_pipe_sprite(int(w), span, base, outline)
+        _pipe_sprites[key] = spr
+        if len(_pipe_sprites) > PIPE_SPRITE_CACHE_MAX:
+            _pipe_sprites.popitem(last=False)   # 一番使われていないものを捨てる
+    else:
+        _pipe_sprites.move_to_end(key)
+    return spr
+
+def _blend_section(frame, sec: PipeSection, x, y):
+    """上端・下端：セクションの矩形ごと (x, y) に合成（画面外はクリップ）"""
+    sh, sw = sec.img.shape[:2]
+    fh, fw = frame.shape[:2]
+    xa, xb = max(x, 0), min(x + sw, fw)
+    ya, yb = max(y, 0), min(y + sh, fh)
+    if xb > xa and yb > ya:
+        src = (slice(ya - y, yb - y), slice(xa - x, xb - x))
+        dst = frame[ya:yb, xa:xb]
+        # 背景 * (255 - 被覆率) / 255 の丸めは Sprite.blit の固定小数点と同じ結果になる
+        cv2.add(cv2.multiply(dst, sec.inv[src], scale=1 / 255), sec.img[src], dst=dst)
+
+def _tile_section(frame, sec: PipeSection, x, y, y_end):
+    """胴体：1行のセクションを y〜y_end まで縦に並べる。不透明な区間はコピー、AAの縁の列だけ合成"""
+    fh, fw = frame.shape[:2]
+    ya, yb = max(y, 0), min(y_end, fh)
+    if yb <= ya:
+        return
+    for _, c0, c1 in sec.runs:
+        xa, xb = max(x + c0, 0), min(x + c1, fw)
+        if xb > xa:
+            frame[ya:yb, xa:xb] = sec.img[:, xa - x:xb - x]
+    for c, lut in sec.edge_luts:
+        if 0 <= x + c < fw:
+            dst = frame[ya:yb, x + c:x + c + 1]
+            cv2.LUT(dst, lut, dst=dst)
+
+def _draw_vertical_cylinder_cached(frame, x, y0, y1, w, base, outline):
+    x0, y0, y1 = int(x), int(y0), int(y1)
+    if y1 <= y0:
+        return
+    if y1 - y0 < 2 * _SPRITE_EDGE:
+        # 短すぎてタイルにできないときはそのまま描く
+        _draw_vertical_cylinder(frame, x, y0, y1, w, base, outline)
+        return
+    # 右端は参照実装と同じく int(x + w)（x が負の小数だと int(x) + w と1ずれる）
+    spr = get_pipe_sprite(w, base, outline, span=int(x + w) - x0)
+    ox = x0 - _SPRITE_PAD
+    mid0 = y0 + _SPRITE_EDGE
+    mid1 = y1 + 1 - _SPRITE_EDGE
+    _blend_section(frame, spr.head, ox, y0 - _SPRITE_PAD)
+    if mid1 > mid0:
+        _tile_section(frame, spr.row, ox, mid0, mid1)
+    _blend_section(frame, spr.tail, ox, mid1)
+
+def draw_pipe(frame, x: float, gap_y: float, w: int = PIPE_WIDTH, gap_h: int = PIPE_GAP_H,
+              cached: bool = True):
+    """上下1組のパイプを描く。cached=False なら毎回 cv2.rectangle で描く（比較用）"""
+    top_h = int(gap_y - gap_h/2)
+    bot_y = int(gap_y + gap_h/2)
+    draw_cylinder = _draw_vertical_cylinder_cached if cached else _draw_vertical_cylinder
+
+    # --- 上パイプ（上からギャップまで） ---
+    if top_h > 0:
+        draw_cylinder(frame, x, 0, top_h, w, PIPE_BASE, PIPE_OUTLINE)
+
+    # --- 下パイプ（ギャップから下端まで） ---
+    if bot_y < WIN_H:
+        draw_cylinder(frame, x, bot_y, WIN_H, w, PIPE_BASE, PIPE_OUTLINE)
@@ -0,0 +1,143 @@
+# pipe_store.py
+# 1ゲーム分のパイプを固定長のNumPy配列で持つ。
+# パイプは同じ速さで左へ流れ、右端から出現するので、配列上では常に x の昇順に並ぶ。
+# 生きているパイプは [head, head + count) の連続区間で、消えるのは常に先頭から。
+# 通過済みのパイプも先頭から連続するので、1ステップで動く範囲（先頭・通過の境目の数本）だけを
+# スカラーで見る（本数が少ないと searchsorted やスライスの呼び出しの方が高くつく）。
+from typing import Iterator, NamedTuple, Tuple
+
+import numpy as np
+
+from config import WIN_H, PIPE_WIDTH
+from obstacles import circle_rect_collision, collide_pipes_np
+
+# broadphase 後の候補がこの本数以下ならスカラーで当たり判定する
+_SCALAR_NARROWPHASE_MAX = 2
+
+
+class PipeView(NamedTuple):
+    x: float
+    gap_y: float
+    w: int
+    gap_h: float
+    passed: bool
+
+
+def _collide_one(cx, cy, r, x, gap_y, gap_h, w) -> bool:
+    """Pipe.collide_circle と同じ判定（1本分）"""
+    rx = int(x)
+    top_h = int(gap_y - gap_h / 2)
+    bot_y = int(gap_y + gap_h / 2)
+    bot_h = WIN_H - bot_y
+    if top_h > 0 and circle_rect_collision(cx, cy, r, rx, 0, w, top_h):
+        return True
+    return bot_h > 0 and circle_rect_collision(cx, cy, r, rx, bot_y, w, bot_h)
+
+
+class PipeStore:
+    def __init__(self, capacity: int = 16, w: int = PIPE_WIDTH):
+        self.w = w
+        self.x = np.zeros(capacity)
+        self.gap_y = np.zeros(capacity)
+        self.gap_h = np.zeros(capacity)
+        self.passed = np.zeros(capacity, dtype=bool)
+        self.head = 0
+        self.count = 0
+        self.unpassed = 0   # まだ通過していない最初のパイプの添字（head 以上）
+
+    @property
+    def capacity(self) -> int:
+        return self.x.shape[0]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+        self.unpassed = 0
+
+    def _compact(self):
+        """末尾に空きが無いとき、生きている区間を先頭へ詰める（満杯なら容量を倍にする）"""
+        h, n = self.head, self.count
+        cap = self.capacity * 2 if n == self.capacity else self.capacity
+        for name in ("x", "gap_y", "gap_h", "passed"):
+            old = getattr(self, name)
+            new = old if cap == old.shape[0] else np.zeros(cap, dtype=old.dtype)
+            new[:n] = old[h:h + n]
+            setattr(self, name, new)
+        self.unpassed -= h
+        self.head = 0
+
+    def spawn(self, x: float, gap_y: float, gap_h: float):
+        """右端にパイプを足す（x は既存のどのパイプより右であること）"""
+        if self.head + self.count == self.capacity:
+            self._compact()
+        i = self.head + self.count
+        self.x[i] = x
+        self.gap_y[i] = gap_y
+        self.gap_h[i] = gap_h
+        self.passed[i] = False
+        self.count += 1
+
+    def scroll(self, dx: float):
+        """全パイプを dx だけ左へ動かし、画面外に出たものを先頭から消す"""
+        h, t = self.head, self.head + self.count
+        self.x[h:t] -= dx
+        # x + w < 0 のものは昇順の先頭に固まっている
+        x, w = self.x, self.w
+        while h < t and x[h] < -w:
+            h += 1
+        self.count = t - h
+        self.head = h
+        self.unpassed = max(self.unpassed, h)
+
+    def score(self, cx: float) -> int:
+        """x + w < cx になった（＝通過した）まだ数えていないパイプの数"""
+        # 通過済みのパイプは先頭から連続している（[head, unpassed)）
+        i, t = self.unpassed, self.head + self.count
+        x, lim = self.x, cx - self.w
+        while i < t and x[i] < lim:
+            self.passed[i] = True
+            i += 1
+        inc = i - self.unpassed
+        self.unpassed = i
+        return inc
+
+    def collide(self, cx: float, cy: float, r: float) -> bool:
+        """円とパイプの当たり判定。x 方向で円と重なり得るパイプの区間だけ調べる（broadphase）"""
+        h, t = self.head, self.head + self.count
+        x, w = self.x, self.w
+
+        # broadphase: x - 1 <= cx + r かつ x + w + 1 >= cx - r。
+        # 候補は通過の境目（unpassed）のすぐ前後にあるので、そこから左右へ数本だけ動かして探す
+        left, right = cx - r - w - 1, cx + r + 1
+        lo = self.unpassed
+        while lo > h and x[lo - 1] >= left:
+            lo -= 1
+        while lo < t and x[lo] < left:
+            lo += 1
+        hi = lo
+        while hi < t and x[hi] <= right:
+            hi += 1
+        n = hi - lo
+        if n <= 0:
+            return False
+        if n <= _SCALAR_NARROWPHASE_MAX:
+            # 候補が数本なら配列演算の呼び出しコストの方が高いのでスカラーで判定
+            for i in range(lo, hi):
+                if _collide_one(cx, cy, r, float(x[i]), float(self.gap_y[i]), float(self.gap_h[i]), w):
+                    return True
+            return False
+        return bool(collide_pipes_np(cx, cy, r, x[lo:hi], self.gap_y[lo:hi], self.gap_h[lo:hi], w).any())
+
+    def score_and_collide(self, cx: float, cy: float, r: float) -> Tuple[int, bool]:
+        """check_score_and_collision と同じ判定を配列でまとめて行う"""
+        return self.score(cx), self.collide(cx, cy, r)
+
+    def __iter__(self) -> Iterator[PipeView]:
+        """出現順（左から）に PipeView を返す（描画用）"""
+        w = self.w
+        for i in range(self.head, self.head + self.count):
+            yield PipeView(float(self.x[i]), float(self.gap_y[i]), w,
+                           float(self.gap_h[i]), bool(self.passed[i]))
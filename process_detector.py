@@ -0,0 +1,125 @@
+# process_detector.py
+# FaceMesh を別プロセスで回す。フレームは共有メモリのリング（shm_ring）に直接書いてコピーせずに渡し、
+# 戻ってくるのは MAR/EAR などの小さな結果だけ
+import multiprocessing as mp
+import queue
+import time
+from typing import Optional
+
+import numpy as np
+
+from camera_capture import CapturedFrame
+from config import WIN_W, WIN_H, SHM_RING_SLOTS
+from face_features import FaceResult
+from frame_prep import FramePreprocessor
+from hud import HudCompositor, draw_debug
+from shm_ring import RingSpec, SharedFrameRing
+
+
+def _worker(spec: RingSpec, wake, stop, results, adaptive: bool):
+    """推論プロセス。起動に成功したら None、失敗したら例外を results に送る"""
+    try:
+        from detector_facemesh import FaceInputDetector
+        ring = SharedFrameRing.attach(spec)
+        detector = FaceInputDetector(draw_mesh=False, adaptive=adaptive)
+        detector.warm_up()
+    except Exception as e:
+        results.put(RuntimeError(f"facemesh process failed to start: {e!r}"))
+        return
+    results.put(None)
+
+    last = -1
+    try:
+        while not stop.is_set():
+            # 書き手が commit ごとに立てる。clear してから読むので取りこぼさない
+            if not wake.wait(0.1):
+                continue
+            wake.clear()
+            got = ring.read()
+            if got is None or got[0] == last:
+                continue
+            seq, t_capture, frame = got
+            t0 = time.time()
+            mouth_open, eyes_closed, mar, ear = detector.infer(frame)
+            t1 = time.time()
+            last = seq
+            if not ring.is_current(seq):
+                continue   # 推論中に枠が上書きされた（読んだ画素が混ざっているかもしれない）
+            results.put((seq, t_capture, mouth_open, eyes_closed, mar, ear, t1, t1 - t0))
+    finally:
+        detector.close()
+        ring.close()
+
+
+class ProcessFaceInputDetector:
+    """
+    AsyncFaceInputDetector と同じ使い方（submit / latest / close）で、推論を別プロセスで行う。
+    submit() は前処理したフレームをリングの枠へ直接書き、その枠のビューを返す（描画の背景にそのまま使える。
+    次の submit までは上書きされない）。
+    GIL を共有しないので、推論が描画ループの Python 処理と取り合わない。
+    """
+    def __init__(self, slots: int = SHM_RING_SLOTS, adaptive: bool = False, size=(WIN_W, WIN_H)):
+        self.ring = SharedFrameRing((size[1], size[0], 3), slots=slots)
+        self.prep = FramePreprocessor(out_size=size)
+        self.hud = HudCompositor()   # デバッグ表示のタイル
+        ctx = mp.get_context("spawn")   # スレッドを持つ親から fork しない
+        self._wake = ctx.Event()
+        self._stop = ctx.Event()
+        self._results = ctx.Queue()
+        self._proc = ctx.Process(target=_worker, name="facemesh-process", daemon=True,
+                                 args=(self.ring.spec, self._wake, self._stop, self._results, adaptive))
+        self._result = FaceResult()
+        self.scheduler = None   # 間引きは同期推論用
+
+        # 統計
+        self.frames_submitted = 0
+        self.frames_inferred = 0
+
+    def start(self, timeout: float = 60.0) -> "ProcessFaceInputDetector":
+        """推論プロセスを起動し、ウォームアップが終わるまで待つ（失敗・時間切れならプロセスと共有メモリを片付けて例外）"""
+        self._proc.start()
+        try:
+            err = self._results.get(timeout=timeout)
+        except queue.Empty:
+            self.close()
+            raise TimeoutError(f"facemesh process did not finish warming up within {timeout:g}s") from None
+        if err is not None:
+            self.close()
+            raise err
+        return self
+
+    def warm_up(self):
+        pass   # start() で推論プロセス側が済ませる
+
+    def submit(self, frame: CapturedFrame) -> np.ndarray:
+        view = self.ring.begin_write()
+        self.prep(frame.image, dst=view)
+        self.ring.commit(frame.t_capture)
+        self._wake.set()
+        self.frames_submitted += 1
+        return view
+
+    def latest(self) -> FaceResult:
+        # 届いている結果をすべて読み、最新だけを残す
+        while True:
+            try:
+                seq, t_capture, mouth_open, eyes_closed, mar, ear, t_done, infer_s = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._result = FaceResult(mouth_open=mouth_open, eyes_closed=eyes_closed, mar=mar, ear=ear,
+                                      timestamp=t_done, t_capture=t_capture, seq=seq, infer_s=infer_s)
+            self.frames_inferred += 1
+        return self._result
+
+    def draw_debug(self, frame, mar: float, ear: float, lag_s: Optional[float] = None):
+        draw_debug(self.hud, frame, mar, ear, lag_s)
+
+    def close(self):
+        self._stop.set()
+        if self._proc.is_alive():
+            self._proc.join(timeout=2.0)
+        if self._proc.is_alive():
+            self._proc.terminate()
+            self._proc.join()
+        self._results.close()
+        self.ring.close()
@@ -1,37 +1,40 @@
+import atexit
 import os
-import json
-from typing import Dict
+import threading
+from typing import Dict, Optional
+
+from score_store import ScoreStore
 
 SCORES_DIR = os.path.join(os.path.dirname(__file__), "data")
-SCORES_PATH = os.path.join(SCORES_DIR, "scores.json")
+SCORES_PATH = os.path.join(SCORES_DIR, "scores.json")   # 旧形式。初回に scores.db へ取り込む
+SCORES_DB_PATH = os.path.join(SCORES_DIR, "scores.db")
+
+DIFFICULTIES = ("EASY", "NORMAL", "HARD")
+
+_store: Optional[ScoreStore] = None
+_store_lock = threading.Lock()
 
 
-def _ensure_dir():
-    os.makedirs(SCORES_DIR, exist_ok=True)
+def get_store() -> ScoreStore:
+    """プロセスで共有する ScoreStore（初回に開き、終了時に書き込みを済ませて閉じる）"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ScoreStore(SCORES_DB_PATH, json_path=SCORES_PATH)
+            atexit.register(_store.close)
+        return _store
 
 
 def load_scores() -> Dict[str, int]:
-    _ensure_dir()
-    if not os.path.exists(SCORES_PATH):
-        return {}
-    try:
-        with open(SCORES_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {}
-
-
-def save_scores(scores: Dict[str, int]):
-    _ensure_dir()
-    with open(SCORES_PATH, "w", encoding="utf-8") as f:
-        json.dump(scores, f, ensure_ascii=False, indent=2)
-
-
-def update_best(difficulty: str, score: int) -> int:
-    """Update best score for difficulty. Return previous best."""
-    scores = load_scores()
-    prev = int(scores.get(difficulty, 0))
-    if score > prev:
-        scores[difficulty] = int(score)
-        save_scores(scores)
+    """難易度ごとの最高点"""
+    store = get_store()
+    best = {d: store.best(d) for d in DIFFICULTIES}
+    return {d: v for d, v in best.items() if v > 0 or store.count(d) > 0}
+
+
+def update_best(difficulty: str, score: int, duration_s: Optional[float] = None) -> int:
+    """Record this run (duration_s: length of the run in game seconds) and return the previous best."""
+    store = get_store()
+    prev = store.best(difficulty)
+    store.add_run(difficulty, score, duration_s=duration_s)
     return prev
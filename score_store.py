@@ -0,0 +1,157 @@
+# score_store.py
+# 全プレイの記録を SQLite（WALモード）に保存する。書き込みは別スレッドでまとめて行う
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    difficulty TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    played_at REAL NOT NULL,
+    duration_s REAL
+);
+CREATE INDEX IF NOT EXISTS runs_difficulty_score ON runs (difficulty, score);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_STOP = object()
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class ScoreStore:
+    """
+    add_run() はキューに積むだけで戻る。書き込みスレッドが batch_interval 秒分を
+    1トランザクションでまとめて追記する。問い合わせは (difficulty, score) の索引を使う。
+    json_path: 旧形式（難易度ごとの最高点だけ）のファイル。初回だけ取り込む
+    """
+    def __init__(self, path: str, json_path: Optional[str] = None, batch_interval: float = 0.5,
+                 max_batch: int = 512):
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self.path = path
+        self.batch_interval = batch_interval
+        self.max_batch = max_batch
+        self._conn = _connect(path)
+        self._lock = threading.Lock()   # 問い合わせ用の接続を守る
+        self._added_best: Dict[str, int] = {}   # このプロセスで add_run した最高点（書き込み待ちを含む）
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+        if json_path is not None:
+            self._migrate_json(json_path)
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._writer = threading.Thread(target=self._run, name="score-writer", daemon=True)
+        self._writer.start()
+
+    def _migrate_json(self, json_path: str):
+        """scores.json の最高点を1件ずつの記録として取り込む（1度だけ）"""
+        with self._lock, self._conn:
+            done = self._conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_json'").fetchone()
+            if done or not os.path.exists(json_path):
+                return
+            try:
+                with open(json_path, "r", encoding="utf-8") as f:
+                    best = json.load(f)
+            except (OSError, ValueError):
+                best = {}
+            played_at = os.path.getmtime(json_path)
+            self._conn.executemany(
+                "INSERT INTO runs (difficulty, score, played_at) VALUES (?, ?, ?)",
+                [(str(k), int(v), played_at) for k, v in best.items()])
+            self._conn.execute("INSERT INTO meta (key, value) VALUES ('migrated_json', ?)", (json_path,))
+
+    def add_run(self, difficulty: str, score: int, duration_s: Optional[float] = None,
+                played_at: Optional[float] = None):
+        if played_at is None:
+            played_at = time.time()
+        with self._lock:
+            self._added_best[difficulty] = max(self._added_best.get(difficulty, 0), int(score))
+        self._queue.put((difficulty, int(score), played_at, duration_s))
+
+    def _run(self):
+        conn = _connect(self.path)
+        try:
+            while True:
+                item = self._queue.get()
+                batch = [item]
+                deadline = time.monotonic() + self.batch_interval
+                # 少し待って後続の記録もまとめる
+                while item is not _STOP and len(batch) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    batch.append(item)
+                rows = [r for r in batch if r is not _STOP]
+                if rows:
+                    with conn:
+                        conn.executemany(
+                            "INSERT INTO runs (difficulty, score, played_at, duration_s) VALUES (?, ?, ?, ?)",
+                            rows)
+                for _ in batch:
+                    self._queue.task_done()
+                if len(rows) != len(batch):
+                    return
+        finally:
+            conn.close()
+
+    def flush(self):
+        """キューに積んだ記録がすべて書き込まれるまで待つ"""
+        self._queue.join()
+
+    def _query(self, sql: str, args=()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, args).fetchall()
+
+    def best(self, difficulty: str) -> int:
+        """最高点（無ければ0）。書き込みスレッドのキューにまだある記録も含む"""
+        row = self._query("SELECT MAX(score) FROM runs WHERE difficulty = ?", (difficulty,))[0]
+        with self._lock:
+            added = self._added_best.get(difficulty, 0)
+        return max(int(row[0]) if row[0] is not None else 0, added)
+
+    def count(self, difficulty: str) -> int:
+        return int(self._query("SELECT COUNT(*) FROM runs WHERE difficulty = ?", (difficulty,))[0][0])
+
+    def top_n(self, difficulty: str, n: int = 10) -> List[Tuple[int, float]]:
+        """上位 n 件の (score, played_at)。同点は先に出した方が上"""
+        return [(int(s), float(t)) for s, t in self._query(
+            "SELECT score, played_at FROM runs WHERE difficulty = ? "
+            "ORDER BY score DESC, played_at ASC LIMIT ?", (difficulty, n))]
+
+    def percentile_rank(self, difficulty: str, score: int) -> float:
+        """score より低い記録の割合 [%]（同点は半分として数える）"""
+        below, equal, total = self._query(
+            "SELECT "
+            " (SELECT COUNT(*) FROM runs WHERE difficulty = ?1 AND score < ?2),"
+            " (SELECT COUNT(*) FROM runs WHERE difficulty = ?1 AND score = ?2),"
+            " (SELECT COUNT(*) FROM runs WHERE difficulty = ?1)", (difficulty, int(score)))[0]
+        if total == 0:
+            return 100.0
+        return 100.0 * (below + 0.5 * equal) / total
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join(timeout=5.0)
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,150 @@
+# session_replay.py
+# プレイ中の入力を保存し、カメラ無しで同じセッションを再生するための記録・読み込み
+#   <name>.npz : フレームごとの (t, mar, ear, mouth_open, eyes_closed, reset, t_input, t_resume) と乱数の種・難易度
+#   <name>.mp4 : （任意）そのフレームで使ったカメラ画像
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+
+SESSION_VERSION = 1
+
+# reset 列の値
+# フレームごとのリセットはビットの組み合わせ（同じフレームで両方起きたら RESET_MENU | RESET_KEY）
+RESET_NONE = 0
+RESET_MENU = 1   # ゲームオーバーメニューでリスタート（そのフレームは step しない）
+RESET_KEY = 2    # 'r' キー（描画の後でリセット）
+
+
+class SessionRecorder:
+    """
+    1フレームごとに add() し、close() で保存する。
+    video=True ならカメラ画像も mp4 に書く（FaceMesh を通した再生用）
+    """
+    def __init__(self, path: str, seed: int, difficulty: str, t0: float,
+                 video: bool = False, fps: float = 30.0, step_hz: float = 0.0):
+        base = os.path.splitext(path)[0]
+        self.path = base + ".npz"
+        self.video_path = base + ".mp4" if video else None
+        d = os.path.dirname(self.path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self.seed = seed
+        self.difficulty = difficulty
+        self.t0 = t0
+        self.fps = fps
+        self.step_hz = step_hz   # 物理の固定刻み（0 はフレームの dt で進めた）
+        self._writer: Optional[cv2.VideoWriter] = None
+        self._t, self._mar, self._ear = [], [], []
+        self._mouth, self._eyes, self._reset = [], [], []
+        self._t_input = []
+        self._t_resume = []
+
+    def add(self, t: float, mar: float, ear: float, mouth_open: bool, eyes_closed: bool,
+            reset: int = RESET_NONE, image: Optional[np.ndarray] = None, t_input: Optional[float] = None,
+            t_resume: Optional[float] = None):
+        """
+        mar/ear は検出器の値、mouth_open/eyes_closed はゲームに渡した入力（予測後）。
+        t_input: mar/ear を出したカメラ画像の取得時刻（分からなければ None）
+        t_resume: リセットの後、次のフレームの dt を数え始めた時刻（メニューにいた時間を dt に入れないため）
+        """
+        self._t.append(t)
+        self._mar.append(mar)
+        self._ear.append(ear)
+        self._mouth.append(mouth_open)
+        self._eyes.append(eyes_closed)
+        self._reset.append(reset)
+        self._t_input.append(np.nan if t_input is None else t_input)
+        self._t_resume.append(np.nan if t_resume is None else t_resume)
+        if self.video_path is not None and image is not None:
+            if self._writer is None:
+                h, w = image.shape[:2]
+                self._writer = cv2.VideoWriter(self.video_path, cv2.VideoWriter_fourcc(*"mp4v"),
+                                               self.fps, (w, h))
+            self._writer.write(image)
+
+    def __len__(self) -> int:
+        return len(self._t)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+        np.savez_compressed(
+            self.path,
+            version=SESSION_VERSION,
+            seed=self.seed,
+            difficulty=self.difficulty,
+            t0=self.t0,
+            step_hz=self.step_hz,
+            t=np.asarray(self._t, dtype=np.float64),
+            mar=np.asarray(self._mar, dtype=np.float32),
+            ear=np.asarray(self._ear, dtype=np.float32),
+            mouth_open=np.asarray(self._mouth, dtype=bool),
+            eyes_closed=np.asarray(self._eyes, dtype=bool),
+            reset=np.asarray(self._reset, dtype=np.int8),
+            t_input=np.asarray(self._t_input, dtype=np.float64),
+            t_resume=np.asarray(self._t_resume, dtype=np.float64),
+            video=os.path.basename(self.video_path) if self.video_path else "",
+        )
+
+
+@dataclass
+class Session:
+    seed: int
+    difficulty: str
+    t0: float
+    t: np.ndarray
+    mar: np.ndarray
+    ear: np.ndarray
+    mouth_open: np.ndarray
+    eyes_closed: np.ndarray
+    reset: np.ndarray
+    t_input: np.ndarray              # 取得時刻（古い記録・不明なフレームは nan）
+    t_resume: np.ndarray             # リセット後に dt を数え始めた時刻（リセットの無いフレーム・古い記録は nan）
+    video_path: Optional[str] = None
+    step_hz: float = 0.0             # 物理の固定刻み（古い記録は 0 = フレームの dt）
+
+    def __len__(self) -> int:
+        return len(self.t)
+
+
+def load_session(path: str) -> Session:
+    path = os.path.splitext(path)[0] + ".npz"
+    with np.load(path) as z:
+        version = int(z["version"])
+        if version != SESSION_VERSION:
+            raise ValueError(f"{path}: unsupported session version {version}")
+        video = str(z["video"])
+        return Session(
+            seed=int(z["seed"]),
+            difficulty=str(z["difficulty"]),
+            t0=float(z["t0"]),
+            t=z["t"],
+            mar=z["mar"],
+            ear=z["ear"],
+            mouth_open=z["mouth_open"],
+            eyes_closed=z["eyes_closed"],
+            reset=z["reset"],
+            t_input=z["t_input"] if "t_input" in z.files else np.full(len(z["t"]), np.nan),
+            t_resume=z["t_resume"] if "t_resume" in z.files else np.full(len(z["t"]), np.nan),
+            video_path=os.path.join(os.path.dirname(path), video) if video else None,
+            step_hz=float(z["step_hz"]) if "step_hz" in z.files else 0.0,
+        )
+
+
+def frame_time_stats(frame_s) -> Dict[str, float]:
+    """1フレームの処理時間 [s] の列 → 統計 [ms]"""
+    a = np.asarray(frame_s, dtype=np.float64) * 1000.0
+    if a.size == 0:
+        return {"frames": 0}
+    return {
+        "frames": int(a.size),
+        "mean_ms": float(a.mean()),
+        "p50_ms": float(np.percentile(a, 50)),
+        "p95_ms": float(np.percentile(a, 95)),
+        "p99_ms": float(np.percentile(a, 99)),
+        "max_ms": float(a.max()),
+    }
@@ -0,0 +1,115 @@
+# shm_ring.py
+# 共有メモリ上のフレームリング。書き手1プロセス・読み手は別プロセスで、フレームはコピーせずビューで読む
+from multiprocessing.shared_memory import SharedMemory
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+
+_ALIGN = 64   # 各枠の先頭をキャッシュラインにそろえる
+
+
+def _align(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+class RingSpec(NamedTuple):
+    """別プロセスで attach するのに必要な情報（pickle できる）"""
+    name: str
+    shape: Tuple[int, ...]
+    slots: int
+
+
+class SharedFrameRing:
+    """
+    uint8 フレーム slots 枠のリング。ロックは使わない（seqlock 方式）：
+      書き手: 枠の通し番号を -1 にする → 画素と時刻を書く → 通し番号を入れる → latest を進める
+      読み手: latest の枠をビューで読み、使い終えたら is_current() で上書きされていないか確かめる
+    枠は書き込み順に回るので、読み手が1枚を使える時間は約 (slots - 1) フレーム分。
+    作った側（create=True）が unlink する。
+    """
+    def __init__(self, shape, slots: int = 4, name: Optional[str] = None):
+        self.shape = tuple(int(v) for v in shape)
+        self.slots = int(slots)
+        self.owner = name is None
+        frame_bytes = int(np.prod(self.shape))
+        header = _align(8 * (1 + 2 * self.slots))
+        stride = _align(frame_bytes)
+        if self.owner:
+            self._shm = SharedMemory(create=True, size=header + stride * self.slots)
+        else:
+            self._shm = SharedMemory(name=name)
+
+        buf = self._shm.buf
+        self._latest = np.ndarray((1,), dtype=np.int64, buffer=buf, offset=0)
+        self._seq = np.ndarray((self.slots,), dtype=np.int64, buffer=buf, offset=8)
+        self._t = np.ndarray((self.slots,), dtype=np.float64, buffer=buf, offset=8 + 8 * self.slots)
+        inner = tuple(int(np.prod(self.shape[i + 1:])) for i in range(len(self.shape)))
+        self.frames = np.ndarray((self.slots,) + self.shape, dtype=np.uint8, buffer=buf,
+                                 offset=header, strides=(stride,) + inner)
+        if self.owner:
+            self._latest[0] = -1
+            self._seq[:] = -1
+        self._next = 0      # 書き手が次に使う通し番号
+        self._writing = -1  # begin_write 中の枠
+
+    @property
+    def spec(self) -> RingSpec:
+        return RingSpec(self._shm.name, self.shape, self.slots)
+
+    @classmethod
+    def attach(cls, spec: RingSpec) -> "SharedFrameRing":
+        return cls(spec.shape, slots=spec.slots, name=spec.name)
+
+    # ---- 書き手 ----
+    def begin_write(self) -> np.ndarray:
+        """次の枠を書き込み中にしてそのビューを返す（ここへ直接 resize などで書く）"""
+        slot = self._next % self.slots
+        self._seq[slot] = -1
+        self._writing = slot
+        return self.frames[slot]
+
+    def commit(self, t_capture: float) -> int:
+        """begin_write した枠を公開し、その通し番号を返す"""
+        slot = self._writing
+        seq = self._next
+        self._t[slot] = t_capture
+        self._seq[slot] = seq
+        self._latest[0] = seq
+        self._next += 1
+        self._writing = -1
+        return seq
+
+    def write(self, image: np.ndarray, t_capture: float) -> int:
+        np.copyto(self.begin_write(), image)
+        return self.commit(t_capture)
+
+    # ---- 読み手 ----
+    def latest_seq(self) -> int:
+        """最後に公開された通し番号（まだ無ければ -1）"""
+        return int(self._latest[0])
+
+    def read(self, seq: Optional[int] = None) -> Optional[Tuple[int, float, np.ndarray]]:
+        """
+        (seq, t_capture, frame) を返す。frame は共有メモリのビュー（コピーしない）。
+        seq 省略時は最新。既に上書きされていれば None
+        """
+        if seq is None:
+            seq = self.latest_seq()
+        if seq < 0:
+            return None
+        slot = seq % self.slots
+        t_capture = float(self._t[slot])
+        if self._seq[slot] != seq:
+            return None
+        return seq, t_capture, self.frames[slot]
+
+    def is_current(self, seq: int) -> bool:
+        """read() で得たビューがまだ seq のフレームのままか（読み終えてから確かめる）"""
+        return bool(self._seq[seq % self.slots] == seq)
+
+    def close(self):
+        # ビューが残っていると共有メモリを閉じられない
+        self._latest = self._seq = self._t = self.frames = None
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
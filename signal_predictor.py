@@ -0,0 +1,113 @@
+# signal_predictor.py
+# FaceMesh の MAR/EAR を1€フィルタで平滑化し、カメラ取得→表示の遅れの分だけ先を予測して
+# 口・目の状態を決める（検出器とゲームループの間に挟む）
+import math
+from typing import Optional, Tuple
+
+from config import (EAR_CLOSE_THRESH, EAR_OPEN_THRESH, MAR_OPEN_THRESH, PREDICT_MIN_CUTOFF,
+                    PREDICT_BETA, PREDICT_D_CUTOFF, PREDICT_MAX_LEAD)
+
+
+def _alpha(cutoff: float, dt: float) -> float:
+    return 1.0 / (1.0 + 1.0 / (2.0 * math.pi * cutoff * dt))
+
+
+class OneEuroFilter:
+    """
+    1€フィルタ（Casiez et al. 2012）。変化率が大きいほどカットオフを上げるので、
+    静止時は揺れを抑え、速い動きでは遅れにくい。1サンプルあたり O(1)。
+    平滑化した値 x と変化率 dx [1/s] を持ち、predict() で先の値を直線で出す
+    """
+    def __init__(self, min_cutoff: float = PREDICT_MIN_CUTOFF, beta: float = PREDICT_BETA,
+                 d_cutoff: float = PREDICT_D_CUTOFF):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self.x: Optional[float] = None
+        self.dx = 0.0
+        self.t: Optional[float] = None
+
+    def __call__(self, x: float, t: float) -> float:
+        if self.t is None:
+            self.x, self.dx, self.t = x, 0.0, t
+            return x
+        dt = t - self.t
+        if dt <= 0:
+            return self.x
+        self.t = t
+        self.dx += _alpha(self.d_cutoff, dt) * ((x - self.x) / dt - self.dx)
+        cutoff = self.min_cutoff + self.beta * abs(self.dx)
+        self.x += _alpha(cutoff, dt) * (x - self.x)
+        return self.x
+
+    def predict(self, lead: float) -> float:
+        """lead 秒先の値（まだ値が無ければ 0）"""
+        if self.x is None:
+            return 0.0
+        return self.x + self.dx * lead
+
+
+class InputPredictor:
+    """
+    update() で検出結果を取得時刻つきで入れ、predict(now) で表示される時刻の状態を返す。
+    先読みする時間 = (now - 取得時刻) + 直近の「判定→表示」の時間（displayed() で測る）。
+    口は予測した MAR で、目は予測した EAR に検出器と同じヒステリシスをかけて決める
+    """
+    def __init__(self, mar_thresh: float = MAR_OPEN_THRESH, max_lead: float = PREDICT_MAX_LEAD,
+                 min_cutoff: float = PREDICT_MIN_CUTOFF, beta: float = PREDICT_BETA,
+                 d_cutoff: float = PREDICT_D_CUTOFF):
+        self.mar_thresh = mar_thresh
+        self.max_lead = max_lead
+        self.mar = OneEuroFilter(min_cutoff, beta, d_cutoff)
+        self.ear = OneEuroFilter(min_cutoff, beta, d_cutoff)
+        self.eyes_closed = False
+        self.t_capture: Optional[float] = None   # 最後に入れたサンプルの取得時刻
+        self.tail_ema = 0.0                      # 判定してから画面に出るまで [s]
+        self._t_decided: Optional[float] = None
+        self.lead = 0.0                          # 直近の predict() で使った先読み時間 [s]
+
+    def reset(self):
+        self.mar.reset()
+        self.ear.reset()
+        self.t_capture = None
+
+    def update(self, mar: float, ear: float, t_capture: float):
+        """新しい検出結果（同じ取得時刻の結果は無視する。顔が無い結果 ear<=0 ではフィルタを捨てる）"""
+        if self.t_capture is not None and t_capture <= self.t_capture:
+            return
+        self.t_capture = t_capture
+        if ear <= 0.0:
+            self.mar.reset()
+            self.ear.reset()
+            return
+        self.mar(mar, t_capture)
+        self.ear(ear, t_capture)
+
+    def predict(self, now: float) -> Tuple[bool, bool, float, float]:
+        """(mouth_open, eyes_closed, mar, ear)：now に判定した結果が表示される時刻の予測"""
+        self._t_decided = now
+        if self.t_capture is None or self.mar.x is None:
+            self.lead = 0.0
+            return False, self.eyes_closed, 0.0, 0.0
+        self.lead = min(self.max_lead, max(0.0, now - self.t_capture + self.tail_ema))
+        mar = max(0.0, self.mar.predict(self.lead))
+        ear = max(0.0, self.ear.predict(self.lead))
+        if not self.eyes_closed and ear < EAR_CLOSE_THRESH:
+            self.eyes_closed = True
+        elif self.eyes_closed and ear > EAR_OPEN_THRESH:
+            self.eyes_closed = False
+        return mar > self.mar_thresh, self.eyes_closed, mar, ear
+
+    def __call__(self, mar: float, ear: float, t_capture: float, now: float) -> Tuple[bool, bool, float, float]:
+        self.update(mar, ear, t_capture)
+        return self.predict(now)
+
+    def displayed(self, t: float):
+        """フレームを画面に出した時刻（waitKey の後）。判定→表示の時間を平滑化して覚える"""
+        if self._t_decided is None:
+            return
+        self.tail_ema += 0.1 * ((t - self._t_decided) - self.tail_ema)
+        self._t_decided = None
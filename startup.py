@@ -0,0 +1,104 @@
+# startup.py
+# 難易度メニューを出している間に、MediaPipe の読み込み・FaceMesh の構築とウォームアップ・
+# カメラのオープンを別スレッドで済ませておく
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from config import WIN_W, WIN_H, CAPTURE_FOURCC, PERF_EXPORT_DIR
+
+
+class BackgroundStartup:
+    """
+    t0: 計測の基準時刻 [perf_counter]（プロセスの起動にできるだけ近い時刻を渡す）
+    players: 2以上なら複数人用の MultiFaceInputDetector を作る
+    process: FaceMesh を別プロセスで回す ProcessFaceInputDetector を作る（mediapipe はそちらで読む）
+    start() 後、wait() でカメラと検出器を受け取る。
+    """
+    def __init__(self, t0: float, adaptive: bool = False, camera_source=0, players: int = 1,
+                 process: bool = False):
+        self.t0 = t0
+        self.adaptive = adaptive
+        self.players = players
+        self.process = process
+        self.camera_source = camera_source
+        self.cap = None
+        self.detector = None
+        self.error: Optional[BaseException] = None
+        self.metrics: Dict[str, float] = {}   # 各段階の所要時間 / t0 からの経過 [ms]
+        self._threads = []
+
+    def _ms_since(self, t: float) -> float:
+        return (time.perf_counter() - t) * 1000.0
+
+    def start(self) -> "BackgroundStartup":
+        for target, name in ((self._load_detector, "startup-detector"), (self._open_camera, "startup-camera")):
+            th = threading.Thread(target=target, name=name, daemon=True)
+            th.start()
+            self._threads.append(th)
+        return self
+
+    def _load_detector(self):
+        try:
+            t = time.perf_counter()
+            if self.process:
+                from process_detector import ProcessFaceInputDetector
+                # 推論プロセスの起動・mediapipe の読み込み・ウォームアップまで
+                self.detector = ProcessFaceInputDetector(adaptive=self.adaptive).start()
+                self.metrics["facemesh_process_ms"] = self._ms_since(t)
+            else:
+                self.detector = self._build_detector(t)
+        except BaseException as e:
+            self.error = e
+        self.metrics["detector_ready_ms"] = self._ms_since(self.t0)
+
+    def _build_detector(self, t: float):
+        if self.players > 1:
+            from multi_face import MultiFaceInputDetector
+        else:
+            from detector_facemesh import FaceInputDetector
+        self.metrics["import_mediapipe_ms"] = self._ms_since(t)
+        t = time.perf_counter()
+        if self.players > 1:
+            detector = MultiFaceInputDetector(n_players=self.players)
+        else:
+            detector = FaceInputDetector(draw_mesh=False, adaptive=self.adaptive)
+        self.metrics["facemesh_init_ms"] = self._ms_since(t)
+        t = time.perf_counter()
+        detector.warm_up()
+        self.metrics["warmup_ms"] = self._ms_since(t)
+        return detector
+
+    def _open_camera(self):
+        try:
+            from camera_capture import LatestFrameCapture
+            t = time.perf_counter()
+            # 表示サイズで取れれば前処理は鏡像にするだけで済む
+            self.cap = LatestFrameCapture(self.camera_source, width=WIN_W, height=WIN_H,
+                                          fourcc=CAPTURE_FOURCC).start()
+            self.metrics["camera_open_ms"] = self._ms_since(t)
+        except BaseException as e:
+            self.error = e
+
+    def mark(self, name: str):
+        """t0 からの経過を name_ms として記録する"""
+        self.metrics[f"{name}_ms"] = self._ms_since(self.t0)
+
+    def wait(self):
+        """バックグラウンドの準備が終わるまで待ち、(cap, detector) を返す"""
+        t = time.perf_counter()
+        for th in self._threads:
+            th.join()
+        self.metrics["wait_after_menu_ms"] = self._ms_since(t)
+        if self.error is not None:
+            raise self.error
+        return self.cap, self.detector
+
+    def report(self, export: bool = False):
+        print("startup: " + ", ".join(f"{k[:-3]} {v:.0f}ms" for k, v in self.metrics.items()))
+        if export:
+            os.makedirs(PERF_EXPORT_DIR, exist_ok=True)
+            with open(os.path.join(PERF_EXPORT_DIR, "startup.jsonl"), "a") as f:
+                f.write(json.dumps({"time": time.time(), **self.metrics}) + "\n")